@@ -0,0 +1,80 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Pattern, Tuple
+from .models.models import ExecuteResponse
+from .config import CACHE_MAX_ENTRIES, CACHE_STATIC_TTL, CACHE_SHORT_TTL
+
+# 커맨드 분류별 TTL (먼저 일치하는 규칙 적용, 일치하지 않으면 캐시하지 않음)
+CACHE_RULES: List[Tuple[Pattern, float]] = [
+    # 정적 정보: 하드웨어/OS 사양
+    (re.compile(r"^(lscpu|nproc|uname|hostname|lsblk|dmidecode|cat /proc/cpuinfo|cat /etc/os-release)\b"),
+     CACHE_STATIC_TTL),
+    # 천천히 변하는 정보: 디스크/메모리 사용량, 가동 시간
+    (re.compile(r"^(df|free|uptime|du|cat /proc/meminfo|cat /proc/loadavg)\b"), CACHE_SHORT_TTL),
+    # 실시간 샘플링 (sar, top, ps, vmstat, iostat 등)은 캐시하지 않음
+]
+
+# 리다이렉션(>, <)과 커맨드 치환($(...), `...`)
+UNCACHEABLE_PATTERN = re.compile(r"[<>`]|\$\(")
+
+
+def normalize_command(command: str) -> str:
+    """공백 차이를 제거한 캐시 키."""
+    return " ".join(command.split())
+
+
+def ttl_for(command: str) -> float:
+    """커맨드 분류에 따른 TTL(초), 캐시 대상이 아니면 0."""
+    # 리다이렉션/커맨드 치환은 부수 효과나 가변 입력이 있으므로 캐시하지 않음
+    if UNCACHEABLE_PATTERN.search(command):
+        return 0
+    # 파이프라인/명령 연결은 각 구간이 모두 캐시 가능한 경우에만 최소 TTL 적용
+    parts = [part.strip() for part in re.split(r"\||;|&&", command) if part.strip()]
+    ttls = []
+    for part in parts:
+        ttl = next((ttl for pattern, ttl in CACHE_RULES if pattern.match(part)), 0)
+        if part.split()[0] in ("head", "tail", "grep", "sort", "awk", "wc", "cut"):
+            continue  # 출력 가공 필터는 TTL에 영향 없음
+        ttls.append(ttl)
+    return min(ttls) if ttls else 0
+
+
+class CommandCache:
+    """TTL + LRU 기반 커맨드 실행 결과 캐시."""
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[float, ExecuteResponse]]" = OrderedDict()
+        self.stats: Dict[str, int] = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def get(self, command: str) -> Optional[ExecuteResponse]:
+        key = normalize_command(command)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return entry[1].model_copy(update={"command": command})
+
+    def put(self, command: str, result: ExecuteResponse) -> None:
+        """성공한 결과만 커맨드 분류별 TTL로 저장."""
+        ttl = ttl_for(normalize_command(command))
+        if ttl <= 0 or result.returncode != 0:
+            return
+        key = normalize_command(command)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats["evictions"] += 1
+
+
+command_cache = CommandCache()
@@ -8,4 +8,27 @@ API_TOKEN = os.getenv("API_TOKEN", "your-secret-token")
 # Agent 실행 포트
 AGENT_PORT = int(os.getenv("AGENT_PORT", 9917))
 # EC2 인스턴스 ID
-INSTANCE_ID = os.getenv("INSTANCE_ID", "i-unknown")
\ No newline at end of file
+INSTANCE_ID = os.getenv("INSTANCE_ID", "i-unknown")
+# 커맨드 동시 실행 개수 제한
+MAX_CONCURRENCY = int(os.getenv("MAX_CONCURRENCY", 4))
+# 요청 단위 전체 실행 제한 시간(초)
+EXECUTE_DEADLINE = int(os.getenv("EXECUTE_DEADLINE", 60))
+# 스트리밍 실행 시 커맨드별 출력 최대 바이트
+MAX_OUTPUT_BYTES = int(os.getenv("MAX_OUTPUT_BYTES", 256 * 1024))
+# 커맨드 결과 캐시 (최대 항목 수, 정적 정보/단기 정보 TTL(초))
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", 256))
+CACHE_STATIC_TTL = float(os.getenv("CACHE_STATIC_TTL", 3600))
+CACHE_SHORT_TTL = float(os.getenv("CACHE_SHORT_TTL", 5))
+# 서버 Agent 레지스트리 (SERVER_URL을 비우면 자가 등록/하트비트 미사용)
+SERVER_URL = os.getenv("SERVER_URL", "")
+HEARTBEAT_INTERVAL = float(os.getenv("HEARTBEAT_INTERVAL", 10))
+AGENT_VERSION = os.getenv("AGENT_VERSION", "0.1.0")
+AGENT_GROUP = os.getenv("AGENT_GROUP", "") or None
+# 서버가 Agent에 접속할 URL (미지정 시 서버가 요청 IP와 AGENT_PORT로 구성)
+AGENT_ADVERTISE_URL = os.getenv("AGENT_ADVERTISE_URL", "") or None
+# 메트릭 스냅샷 CPU 사용률 측정 구간(초), 상위 프로세스 개수
+SNAPSHOT_CPU_INTERVAL = float(os.getenv("SNAPSHOT_CPU_INTERVAL", 0.1))
+SNAPSHOT_TOP_PROCESSES = int(os.getenv("SNAPSHOT_TOP_PROCESSES", 5))
+# 백그라운드 메트릭 샘플러 간격(초), 링 버퍼 보관 구간(초) (SAMPLER_INTERVAL=0이면 미사용)
+SAMPLER_INTERVAL = float(os.getenv("SAMPLER_INTERVAL", 1))
+SAMPLER_WINDOW = float(os.getenv("SAMPLER_WINDOW", 600))
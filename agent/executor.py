@@ -1,48 +1,229 @@
+import asyncio
+import codecs
+import os
+import signal
 import subprocess
-from typing import Dict, List
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Optional
 from .models.models import ExecuteResponse
+from .config import MAX_CONCURRENCY, EXECUTE_DEADLINE, MAX_OUTPUT_BYTES
+from .cache import command_cache
+from .telemetry import COMMAND_DURATION, program_label
 
+# 커맨드 실행 워커 풀
+_pool = ThreadPoolExecutor(max_workers=MAX_CONCURRENCY, thread_name_prefix="executor")
+# Agent 전체에서 동시에 fork되는 셸 개수 제한 (/execute 워커와 /execute/stream 요청이 공유)
+_shell_slots = threading.BoundedSemaphore(MAX_CONCURRENCY)
+# 스트리밍 요청의 슬롯 대기 재시도 간격(초)
+SLOT_POLL_INTERVAL = 0.05
 
-def execute_command(command: List[str], timeout: int = 60) -> List[ExecuteResponse]:
+
+@asynccontextmanager
+async def _shell_slot() -> AsyncIterator[None]:
+    """이벤트 루프를 막지 않고 셸 슬롯 확보 (대기 중 취소되어도 슬롯이 새지 않음)."""
+    while not _shell_slots.acquire(blocking=False):
+        await asyncio.sleep(SLOT_POLL_INTERVAL)
+    try:
+        yield
+    finally:
+        _shell_slots.release()
+
+
+def _kill(process: subprocess.Popen) -> None:
+    """셸과 파이프라인 자식 프로세스를 함께 종료."""
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        process.kill()
+
+
+def _run_one(cmd: str, deadline: float, timeout: int, use_cache: bool) -> ExecuteResponse:
+    """단일 커맨드를 공유 마감 시간 내에서 실행 (읽기 전용 진단 커맨드는 캐시 결과 재사용)."""
+    if use_cache:
+        cached = command_cache.get(cmd)
+        if cached is not None:
+            return cached
+
+    # 스트리밍 요청이 슬롯을 점유 중이면 마감 시간까지만 대기
+    if not _shell_slots.acquire(timeout=max(deadline - time.monotonic(), 0)):
+        return ExecuteResponse(command=cmd, stdout=None, stderr=f"{timeout}s timeout", returncode=1)
+    try:
+        return _run_shell(cmd, deadline, timeout)
+    finally:
+        _shell_slots.release()
+
+
+def _run_shell(cmd: str, deadline: float, timeout: int) -> ExecuteResponse:
+    """셸 슬롯을 확보한 상태에서 커맨드 실행 (성공 결과는 캐시에 저장)."""
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        return ExecuteResponse(command=cmd, stdout=None, stderr=f"{timeout}s timeout", returncode=1)
+
+    started = time.monotonic()
+    try:
+        process = subprocess.Popen(
+            cmd,
+            shell=True,  # 주의: 화이트리스트 검증 필수
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            start_new_session=True
+        )
+    except (OSError, subprocess.SubprocessError) as e:
+        COMMAND_DURATION.observe(time.monotonic() - started, program=program_label(cmd), outcome="error")
+        return ExecuteResponse(command=cmd, stdout=None, stderr=str(e), returncode=1)
+
+    try:
+        stdout, _ = process.communicate(timeout=remaining)
+    except subprocess.TimeoutExpired:
+        _kill(process)
+        process.communicate()
+        COMMAND_DURATION.observe(time.monotonic() - started, program=program_label(cmd), outcome="timeout")
+        return ExecuteResponse(command=cmd, stdout=None, stderr=f"{timeout}s timeout", returncode=1)
+
+    COMMAND_DURATION.observe(time.monotonic() - started, program=program_label(cmd),
+                             outcome="ok" if process.returncode == 0 else "failed")
+
+    result = ExecuteResponse(
+        command=cmd,
+        stdout=stdout,
+        stderr=None,
+        returncode=process.returncode
+    )
+    command_cache.put(cmd, result)
+    return result
+
+
+def execute_command(command: List[str], timeout: Optional[int] = None,
+                    bypass_cache: bool = False) -> List[ExecuteResponse]:
     """
-    subprocess.run을 사용해 커맨드를 실행하고 결과를 반환
+    커맨드 리스트를 동시에 실행하고 요청 순서대로 결과를 반환
     Args:
-        command: 실행할 커맨드 문자열
-        timeout: 실행 제한 시간(초)
+        command: 실행할 커맨드 리스트
+        timeout: 요청 전체 실행 제한 시간(초), 모든 커맨드가 공유
+        bypass_cache: True면 캐시된 결과를 사용하지 않고 항상 실행
     Returns:
-        stdout, stderr, returncode 또는 에러 메시지를 포함한 딕셔너리
+        stdout, stderr, returncode 또는 에러 메시지를 포함한 결과 리스트
     """
     print(f"agent.executor.execute_command input command: {command}")
-    results: List[ExecuteResponse] = []
-    for cmd in command:
+    timeout = timeout or EXECUTE_DEADLINE
+    deadline = time.monotonic() + timeout
+
+    futures = [_pool.submit(_run_one, cmd, deadline, timeout, not bypass_cache) for cmd in command]
+    results: List[ExecuteResponse] = [future.result() for future in futures]
+
+    print(f"agent.executor.execute_command output: {results}")
+    return results
+
+
+async def _pump(stream: asyncio.StreamReader, name: str, index: int,
+                queue: asyncio.Queue, budget: Dict[str, int]) -> None:
+    """stdout/stderr를 청크 단위로 읽어 이벤트 큐에 전달 (바이트 상한 초과분은 폐기)."""
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    while True:
+        chunk = await stream.read(4096)
+        if not chunk:
+            break
+        if budget["remaining"] <= 0:
+            budget["truncated"] = 1
+            continue  # 파이프가 막히지 않도록 계속 읽어서 버림
+        if len(chunk) > budget["remaining"]:
+            chunk = chunk[:budget["remaining"]]
+            budget["truncated"] = 1
+        budget["remaining"] -= len(chunk)
+        data = decoder.decode(chunk)
+        if data:
+            await queue.put({"event": name, "index": index, "data": data})
+    tail = decoder.decode(b"", final=True)
+    if tail:
+        await queue.put({"event": name, "index": index, "data": tail})
+
+
+async def _stream_one(index: int, cmd: str, deadline: float, timeout: int, max_bytes: int,
+                      queue: asyncio.Queue) -> None:
+    """단일 커맨드를 실행하며 출력 청크와 종료 코드를 이벤트로 전달."""
+    async with _shell_slot():
+        await queue.put({"event": "start", "index": index, "command": cmd})
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            await queue.put({"event": "exit", "index": index, "command": cmd, "returncode": 1,
+                             "truncated": False, "error": f"{timeout}s timeout"})
+            return
+
+        started = time.monotonic()
         try:
-            result = subprocess.run(
-                cmd,
-                shell=True,  # 주의: 화이트리스트 검증 필수
-                capture_output=True,
-                text=True,
-                timeout=timeout
+            process = await asyncio.create_subprocess_shell(
+                cmd,  # 주의: 화이트리스트 검증 필수
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                start_new_session=True
             )
-            results.append(ExecuteResponse(
-                command=cmd,
-                stdout=result.stdout,
-                stderr=None,
-                returncode=result.returncode
-            ))
-
-        except subprocess.TimeoutExpired:
-            results.append(ExecuteResponse(
-                command=cmd,
-                stdout=None,
-                stderr=f"{timeout}s timeout",
-                returncode=1
-            ))
-        except subprocess.SubprocessError as e:
-            results.append(ExecuteResponse(
-                command=cmd,
-                stdout=None,
-                stderr=str(e),
-                returncode=1))
+        except (OSError, subprocess.SubprocessError) as e:
+            COMMAND_DURATION.observe(time.monotonic() - started, program=program_label(cmd), outcome="error")
+            await queue.put({"event": "exit", "index": index, "command": cmd, "returncode": 1,
+                             "truncated": False, "error": str(e)})
+            return
 
-    print(f"agent.executor.execute_command output: {results}")
-    return results
\ No newline at end of file
+        budget = {"remaining": max_bytes, "truncated": 0}
+        error = None
+        try:
+            await asyncio.wait_for(asyncio.gather(
+                _pump(process.stdout, "stdout", index, queue, budget),
+                _pump(process.stderr, "stderr", index, queue, budget),
+                process.wait()
+            ), timeout=remaining)
+            returncode = process.returncode
+        except asyncio.TimeoutError:
+            _kill(process)
+            await process.wait()
+            returncode = 1
+            error = f"{timeout}s timeout"
+        except asyncio.CancelledError:
+            _kill(process)
+            raise
+
+        outcome = "timeout" if error else "ok" if returncode == 0 else "failed"
+        COMMAND_DURATION.observe(time.monotonic() - started, program=program_label(cmd), outcome=outcome)
+        event = {"event": "exit", "index": index, "command": cmd, "returncode": returncode,
+                 "truncated": bool(budget["truncated"])}
+        if error:
+            event["error"] = error
+        await queue.put(event)
+
+
+async def stream_commands(command: List[str], timeout: Optional[int] = None,
+                          max_bytes: Optional[int] = None) -> AsyncIterator[Dict]:
+    """
+    커맨드 리스트를 동시에 실행하며 출력 청크/종료 코드 이벤트를 발생 순서대로 반환
+    Args:
+        command: 실행할 커맨드 리스트
+        timeout: 요청 전체 실행 제한 시간(초), 모든 커맨드가 공유
+        max_bytes: 커맨드별 출력(stdout+stderr) 최대 바이트
+    Returns:
+        start/stdout/stderr/exit 이벤트, 마지막에 done 이벤트
+    """
+    print(f"agent.executor.stream_commands input command: {command}")
+    timeout = timeout or EXECUTE_DEADLINE
+    max_bytes = max_bytes or MAX_OUTPUT_BYTES
+    deadline = time.monotonic() + timeout
+    queue: asyncio.Queue = asyncio.Queue()
+
+    tasks = [
+        asyncio.create_task(_stream_one(index, cmd, deadline, timeout, max_bytes, queue))
+        for index, cmd in enumerate(command)
+    ]
+    try:
+        pending = len(tasks)
+        while pending:
+            event = await queue.get()
+            if event["event"] == "exit":
+                pending -= 1
+            yield event
+        yield {"event": "done"}
+    finally:
+        # 클라이언트 연결 종료 시 남은 커맨드 정리
+        for task in tasks:
+            task.cancel()
@@ -0,0 +1,67 @@
+import os
+import threading
+import requests
+from .config import (
+    API_TOKEN,
+    AGENT_PORT,
+    INSTANCE_ID,
+    SERVER_URL,
+    HEARTBEAT_INTERVAL,
+    AGENT_VERSION,
+    AGENT_GROUP,
+    AGENT_ADVERTISE_URL,
+)
+from .models.models import AgentHeartbeat
+
+
+def current_heartbeat() -> AgentHeartbeat:
+    """현재 부하와 Agent 정보를 담은 하트비트."""
+    load1, load5, load15 = os.getloadavg()
+    return AgentHeartbeat(
+        instance_id=INSTANCE_ID,
+        port=AGENT_PORT,
+        url=AGENT_ADVERTISE_URL,
+        version=AGENT_VERSION,
+        group=AGENT_GROUP,
+        load={"load1": load1, "load5": load5, "load15": load15, "cpus": os.cpu_count()}
+    )
+
+
+class HeartbeatSender:
+    """기동 시 서버 레지스트리에 자가 등록 후 주기적으로 하트비트 전송 (백그라운드 스레드)."""
+
+    def __init__(self, server_url: str = SERVER_URL, interval: float = HEARTBEAT_INTERVAL):
+        self.server_url = server_url.rstrip("/")
+        self.interval = interval
+        self._session = requests.Session()
+        self._session.headers["Authorization"] = f"Bearer {API_TOKEN}"
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="agent-heartbeat", daemon=True)
+
+    def _send(self, path: str) -> bool:
+        try:
+            response = self._session.post(f"{self.server_url}{path}", json=current_heartbeat().dict(),
+                                          timeout=(3, 5))
+            response.raise_for_status()
+            return True
+        except requests.RequestException as e:
+            print(f"agent.heartbeat {path} failed: {e}")
+            return False
+
+    def _run(self) -> None:
+        registered = False
+        while not self._stop.is_set():
+            if not registered:
+                registered = self._send("/agents/register")
+                if registered:
+                    print(f"agent.heartbeat registered {INSTANCE_ID} to {self.server_url}")
+            else:
+                self._send("/agents/heartbeat")
+            self._stop.wait(self.interval)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join(timeout=self.interval)
@@ -1,17 +1,73 @@
-from fastapi import FastAPI, HTTPException, Header
-from .executor import execute_command
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Header, Query, Request
+from fastapi.responses import StreamingResponse, PlainTextResponse
+from .executor import execute_command, stream_commands
+from .cache import command_cache
+from .metrics import snapshot
+from .sampler import MetricSampler
 from .security import validate_command, verify_token
-from .config import API_TOKEN, AGENT_PORT
+from .config import API_TOKEN, AGENT_PORT, SERVER_URL, SAMPLER_INTERVAL
+from .heartbeat import HeartbeatSender
+from .telemetry import registry, HTTP_DURATION
+import json
+import time
 import uvicorn
 from .models.models import ExecuteRequest, ExecuteResponse
-from typing import List
+from typing import Dict, List, Optional
 
 
-app = FastAPI()
+# 알람 발생 전 구간 조회용 메트릭 링 버퍼 (SAMPLER_INTERVAL=0이면 미사용)
+sampler = MetricSampler() if SAMPLER_INTERVAL > 0 else None
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """메트릭 샘플러 시작, SERVER_URL 설정 시 서버 레지스트리에 자가 등록 및 하트비트 전송."""
+    sender = HeartbeatSender() if SERVER_URL else None
+    if sampler is not None:
+        sampler.start()
+    if sender is not None:
+        sender.start()
+    yield
+    if sender is not None:
+        sender.stop()
+    if sampler is not None:
+        sampler.stop()
+
+
+app = FastAPI(lifespan=lifespan)
+
+
+@app.middleware("http")
+async def record_request_duration(request: Request, call_next):
+    """API별 처리 시간 기록 (스트리밍 응답은 헤더 전송까지, 경로는 라우트 템플릿 기준)."""
+    started = time.perf_counter()
+    response = await call_next(request)
+    route = request.scope.get("route")
+    HTTP_DURATION.observe(time.perf_counter() - started, method=request.method,
+                          path=route.path if route is not None else "unmatched", status=response.status_code)
+    return response
+
+
+def authenticate(authorization: str) -> None:
+    """API 토큰 검증 (실패 시 HTTPException)."""
+    token = authorization.replace("Bearer ", "") if authorization.startswith("Bearer ") else ""
+    if not verify_token(token, API_TOKEN):
+        raise HTTPException(status_code=401, detail="유효하지 않은 토큰")
+
+
+def authorize(request: ExecuteRequest, authorization: str) -> None:
+    """토큰과 커맨드 검증 (실패 시 HTTPException)."""
+    # 토큰 검증
+    authenticate(authorization)
+
+    # 커맨드 검증
+    if not validate_command(request.command):
+        raise HTTPException(status_code=403, detail="허용되지 않은 커맨드")
 
 
 @app.post("/execute", response_model=List[ExecuteResponse])
-def execute_command_endpoint(request: ExecuteRequest, 
+def execute_command_endpoint(request: ExecuteRequest,
                              authorization: str = Header(default="")) -> List[ExecuteResponse]:
     """
     서버로부터 커맨드를 수신하고 실행
@@ -22,21 +78,83 @@ def execute_command_endpoint(request: ExecuteRequest,
         실행 결과
     """
     print(f"agent.main.execute_command_endpoint input: {request}")
-    # 토큰 검증
-    token = authorization.replace("Bearer ", "") if authorization.startswith("Bearer ") else ""
-    if not verify_token(token, API_TOKEN):
-        raise HTTPException(status_code=401, detail="유효하지 않은 토큰")
-    
-    # 커맨드 검증
-    if not validate_command(request.command):
-        raise HTTPException(status_code=403, detail="허용되지 않은 커맨드")
-    
+    authorize(request, authorization)
+
     # 커맨드 실행
-    result = execute_command(request.command)
+    result = execute_command(request.command, request.timeout, request.bypass_cache)
     # ExecuteResponse로 반환
     print(f"agent.main.execute_command_endpoint output: {result}")
     return result
 
+
+@app.post("/execute/stream")
+async def stream_command_endpoint(request: ExecuteRequest,
+                                  authorization: str = Header(default="")) -> StreamingResponse:
+    """
+    서버로부터 커맨드를 수신하고 실행하며 출력을 NDJSON 청크로 스트리밍
+    Args:
+        request: 커맨드와 instance_id 포함
+        authorization: API 토큰 헤더
+    Returns:
+        커맨드별 start/stdout/stderr/exit 이벤트 스트림 (한 줄에 JSON 1개)
+    """
+    print(f"agent.main.stream_command_endpoint input: {request}")
+    authorize(request, authorization)
+
+    async def events():
+        async for event in stream_commands(request.command, request.timeout, request.max_bytes):
+            yield json.dumps(event, ensure_ascii=False) + "\n"
+
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
+
+@app.get("/metrics/snapshot")
+def metrics_snapshot_endpoint(top: Optional[int] = Query(None, ge=1, le=50),
+                              authorization: str = Header(default="")) -> Dict:
+    """
+    셸 커맨드 없이 /proc와 statvfs에서 CPU, 메모리, 부하, 디스크, 상위 프로세스 수집
+    Args:
+        top: 상위 프로세스 개수
+        authorization: API 토큰 헤더
+    Returns:
+        구조화된 시스템 상태 스냅샷
+    """
+    authenticate(authorization)
+    return snapshot(top)
+
+
+@app.get("/metrics/history")
+def metrics_history_endpoint(since: Optional[float] = None, until: Optional[float] = None,
+                             max_points: Optional[int] = Query(None, ge=1),
+                             authorization: str = Header(default="")) -> Dict:
+    """
+    백그라운드 샘플러 링 버퍼에서 시간 구간의 메트릭 샘플 조회 (대기 없음)
+    Args:
+        since: 시작 시각 (epoch 초), 미지정 시 보관 구간 처음부터
+        until: 종료 시각 (epoch 초), 미지정 시 최신 샘플까지
+        max_points: 반환할 최대 샘플 수 (초과 시 구간 평균으로 축소)
+        authorization: API 토큰 헤더
+    Returns:
+        필드별 요약과 샘플 (CPU, 메모리, 부하, 디스크 IO, CPU 상위 프로세스)
+    """
+    authenticate(authorization)
+    if sampler is None:
+        raise HTTPException(status_code=404, detail="메트릭 샘플러 비활성화 (SAMPLER_INTERVAL=0)")
+    return sampler.history(since, until, max_points)
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics() -> PlainTextResponse:
+    """API 처리 시간, 커맨드 실행 시간, 샘플러 수집 시간 히스토그램 (Prometheus 텍스트 포맷)."""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/cache/stats")
+def cache_stats() -> Dict:
+    """커맨드 결과 캐시 적중/미적중 통계."""
+    return command_cache.stats
+
+
 if __name__ == "__main__":
     # Agent 서버 실행
-    uvicorn.run(app, host="0.0.0.0", port=AGENT_PORT)
\ No newline at end of file
+    uvicorn.run(app, host="0.0.0.0", port=AGENT_PORT)
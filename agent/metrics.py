@@ -0,0 +1,166 @@
+import os
+import time
+from typing import Dict, List, Optional, Tuple
+from .config import SNAPSHOT_CPU_INTERVAL, SNAPSHOT_TOP_PROCESSES
+
+PROC = "/proc"
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK")
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+# 용량 확인 대상이 아닌 가상 파일 시스템
+PSEUDO_FILESYSTEMS = {
+    "proc", "sysfs", "devtmpfs", "devpts", "tmpfs", "cgroup", "cgroup2", "pstore", "bpf", "debugfs",
+    "tracefs", "securityfs", "configfs", "fusectl", "mqueue", "hugetlbfs", "autofs", "binfmt_misc",
+    "overlay", "squashfs", "nsfs", "ramfs", "rpc_pipefs", "selinuxfs", "efivarfs",
+}
+
+
+def _read(path: str) -> str:
+    with open(path) as f:
+        return f.read()
+
+
+def read_cpu_times() -> List[int]:
+    """/proc/stat 전체 CPU 누적 시간 (user, nice, system, idle, iowait, irq, softirq, steal)."""
+    fields = _read(f"{PROC}/stat").split("\n", 1)[0].split()[1:9]
+    return [int(value) for value in fields]
+
+
+def cpu_percent(before: List[int], after: List[int]) -> Dict[str, float]:
+    """두 시점의 CPU 누적 시간으로 구간 사용률(%) 계산."""
+    delta = [b - a for a, b in zip(before, after)]
+    total = sum(delta) or 1
+    user, nice, system, idle, iowait, irq, softirq, steal = delta
+    busy = user + nice + system + irq + softirq + steal  # 구간 틱이 0이면 total만 1로 보정되므로 별도 계산
+    return {
+        "user": round(100 * (user + nice) / total, 1),
+        "system": round(100 * (system + irq + softirq) / total, 1),
+        "iowait": round(100 * iowait / total, 1),
+        "steal": round(100 * steal / total, 1),
+        "idle": round(100 * idle / total, 1),
+        "used": round(100 * busy / total, 1),
+    }
+
+
+def read_memory() -> Dict[str, int]:
+    """/proc/meminfo 기반 메모리/스왑 사용량 (KB)."""
+    info = {}
+    for line in _read(f"{PROC}/meminfo").splitlines():
+        key, _, value = line.partition(":")
+        info[key] = int(value.split()[0])
+    total, available = info["MemTotal"], info.get("MemAvailable", info["MemFree"])
+    swap_total, swap_free = info.get("SwapTotal", 0), info.get("SwapFree", 0)
+    return {
+        "total_kb": total,
+        "available_kb": available,
+        "used_kb": total - available,
+        "used_percent": round(100 * (total - available) / total, 1) if total else 0.0,
+        "buffers_kb": info.get("Buffers", 0),
+        "cached_kb": info.get("Cached", 0),
+        "swap_total_kb": swap_total,
+        "swap_used_kb": swap_total - swap_free,
+    }
+
+
+def read_load() -> Dict[str, float]:
+    """/proc/loadavg 부하 평균과 실행 중/전체 태스크 수."""
+    load1, load5, load15, tasks, _ = _read(f"{PROC}/loadavg").split()
+    running, total = tasks.split("/")
+    return {
+        "load1": float(load1), "load5": float(load5), "load15": float(load15),
+        "running": int(running), "tasks": int(total), "cpus": os.cpu_count(),
+    }
+
+
+def read_disks() -> List[Dict]:
+    """/proc/mounts의 실제 파일 시스템별 statvfs 용량."""
+    disks, seen = [], set()
+    for line in _read(f"{PROC}/mounts").splitlines():
+        device, mount, fstype = line.split()[:3]
+        if fstype in PSEUDO_FILESYSTEMS or device in seen:
+            continue
+        try:
+            stat = os.statvfs(mount)
+        except OSError:
+            continue
+        seen.add(device)
+        total = stat.f_blocks * stat.f_frsize
+        if not total:
+            continue
+        free = stat.f_bavail * stat.f_frsize
+        used = total - stat.f_bfree * stat.f_frsize
+        disks.append({
+            "mount": mount,
+            "device": device,
+            "fstype": fstype,
+            "total_bytes": total,
+            "used_bytes": used,
+            "used_percent": round(100 * used / (used + free), 1) if used + free else 0.0,
+            "inodes_used_percent": round(100 * (1 - stat.f_ffree / stat.f_files), 1) if stat.f_files else 0.0,
+        })
+    return disks
+
+
+def read_processes() -> Dict[int, Tuple[str, int, int]]:
+    """프로세스별 (이름, 누적 CPU 틱, RSS 바이트)."""
+    processes = {}
+    for entry in os.listdir(PROC):
+        if not entry.isdigit():
+            continue
+        try:
+            stat = _read(f"{PROC}/{entry}/stat")
+        except OSError:
+            continue  # 읽는 중 종료된 프로세스
+        # comm에 공백/괄호가 있을 수 있으므로 마지막 ')' 기준으로 분리
+        name = stat[stat.index("(") + 1:stat.rindex(")")]
+        fields = stat[stat.rindex(")") + 2:].split()
+        ticks = int(fields[11]) + int(fields[12])  # utime + stime
+        rss = int(fields[21]) * PAGE_SIZE
+        processes[int(entry)] = (name, ticks, rss)
+    return processes
+
+
+def top_processes(before: Dict[int, Tuple[str, int, int]], after: Dict[int, Tuple[str, int, int]],
+                  elapsed: float, limit: int) -> Dict[str, List[Dict]]:
+    """구간 CPU 사용률 상위, RSS 상위 프로세스."""
+    rows = []
+    for pid, (name, ticks, rss) in after.items():
+        previous = before.get(pid)
+        used = ticks - previous[1] if previous else 0
+        rows.append({
+            "pid": pid,
+            "name": name,
+            "cpu_percent": round(100 * used / CLOCK_TICKS / elapsed, 1) if elapsed > 0 else 0.0,
+            "rss_kb": rss // 1024,
+        })
+    return {
+        "by_cpu": sorted(rows, key=lambda row: row["cpu_percent"], reverse=True)[:limit],
+        "by_memory": sorted(rows, key=lambda row: row["rss_kb"], reverse=True)[:limit],
+    }
+
+
+def snapshot(top: Optional[int] = None, interval: float = SNAPSHOT_CPU_INTERVAL) -> Dict:
+    """
+    셸 커맨드 실행 없이 /proc와 statvfs로 시스템 상태 수집.
+
+    Args:
+        top: 상위 프로세스 개수 (기본 SNAPSHOT_TOP_PROCESSES)
+        interval: CPU/프로세스 사용률 측정 구간(초)
+    Returns:
+        cpu, memory, load, disks, processes, uptime_seconds를 담은 문서
+    """
+    started = time.monotonic()
+    cpu_before, processes_before = read_cpu_times(), read_processes()
+    time.sleep(interval)
+    cpu_after, processes_after = read_cpu_times(), read_processes()
+    elapsed = time.monotonic() - started
+
+    return {
+        "timestamp": time.time(),
+        "uptime_seconds": float(_read(f"{PROC}/uptime").split()[0]),
+        "cpu": cpu_percent(cpu_before, cpu_after),
+        "load": read_load(),
+        "memory": read_memory(),
+        "disks": read_disks(),
+        "processes": top_processes(processes_before, processes_after, elapsed, top or SNAPSHOT_TOP_PROCESSES),
+        "collect_ms": round((time.monotonic() - started) * 1000, 1),
+    }
@@ -0,0 +1,232 @@
+import os
+import threading
+import time
+from array import array
+from typing import Dict, List, Optional, Tuple
+from .config import SAMPLER_INTERVAL, SAMPLER_WINDOW
+from .telemetry import SAMPLE_DURATION
+from .metrics import PROC, _read, read_cpu_times, cpu_percent, read_memory, read_processes, CLOCK_TICKS
+
+SECTOR_SIZE = 512
+# 샘플 필드 (필드별 고정 크기 array('d')에 저장)
+FIELDS = (
+    "timestamp",
+    "cpu_used", "cpu_iowait", "cpu_steal",
+    "mem_used_percent", "mem_available_kb", "swap_used_kb",
+    "load1",
+    "disk_read_bps", "disk_write_bps",
+    "top_pid", "top_cpu_percent",
+)
+
+
+def _is_disk(name: str) -> bool:
+    """파티션, loop/ram 장치를 제외한 물리 디스크 여부 (/sys/block 기준)."""
+    return not name.startswith(("loop", "ram", "zram")) and os.path.exists(f"/sys/block/{name}")
+
+
+def read_disk_sectors() -> Tuple[int, int]:
+    """/proc/diskstats 디스크 전체 누적 읽기/쓰기 섹터 수."""
+    read = written = 0
+    for line in _read(f"{PROC}/diskstats").splitlines():
+        fields = line.split()
+        if len(fields) >= 10 and _is_disk(fields[2]):
+            read += int(fields[5])
+            written += int(fields[9])
+    return read, written
+
+
+class RingBuffer:
+    """필드별 array('d') 기반 고정 크기 링 버퍼 (가장 오래된 샘플부터 덮어씀)."""
+
+    def __init__(self, capacity: int, fields=FIELDS):
+        self.capacity = capacity
+        self.fields = fields
+        self._columns = {field: array("d", bytes(8 * capacity)) for field in fields}
+        # 필드 외 문자열 값 (상위 프로세스 이름)은 같은 크기의 리스트에 저장
+        self._names: List[Optional[str]] = [None] * capacity
+        self._next = 0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def append(self, sample: Dict[str, float], name: Optional[str] = None) -> None:
+        with self._lock:
+            index = self._next
+            for field in self.fields:
+                self._columns[field][index] = sample.get(field, 0.0)
+            self._names[index] = name
+            self._next = (index + 1) % self.capacity
+            self.count = min(self.count + 1, self.capacity)
+
+    def _indexes(self) -> List[int]:
+        """오래된 순서의 저장 위치."""
+        start = (self._next - self.count) % self.capacity
+        return [(start + i) % self.capacity for i in range(self.count)]
+
+    def range(self, since: Optional[float] = None, until: Optional[float] = None) -> Dict[str, List]:
+        """
+        시간 구간 [since, until)의 샘플을 필드별 리스트로 반환.
+
+        Args:
+            since: 시작 시각 (epoch 초), 미지정 시 버퍼 처음부터
+            until: 종료 시각 (epoch 초), 미지정 시 최신 샘플까지
+        Returns:
+            필드별 값 리스트와 top_name 리스트 (오래된 순)
+        """
+        with self._lock:
+            timestamps = self._columns["timestamp"]
+            indexes = [
+                i for i in self._indexes()
+                if (since is None or timestamps[i] >= since) and (until is None or timestamps[i] < until)
+            ]
+            result = {field: [self._columns[field][i] for i in indexes] for field in self.fields}
+            result["timestamp"] = [round(timestamp, 1) for timestamp in result["timestamp"]]
+            result["top_pid"] = [int(pid) for pid in result["top_pid"]]
+            result["top_name"] = [self._names[i] for i in indexes]
+        return result
+
+    @property
+    def memory_bytes(self) -> int:
+        return sum(column.itemsize * len(column) for column in self._columns.values())
+
+
+def downsample(columns: Dict[str, List], max_points: int) -> Dict[str, List]:
+    """샘플을 max_points개 구간으로 묶어 구간 평균으로 축소 (상위 프로세스는 구간 내 CPU 최대 샘플 기준)."""
+    count = len(columns["timestamp"])
+    if count <= max_points:
+        return columns
+    result = {field: [] for field in columns}
+    for bucket in range(max_points):
+        start, end = bucket * count // max_points, (bucket + 1) * count // max_points
+        peak = max(range(start, end), key=lambda i: columns["top_cpu_percent"][i])
+        for field, values in columns.items():
+            if field in ("top_pid", "top_cpu_percent", "top_name"):
+                result[field].append(values[peak])
+            elif field == "timestamp":
+                result[field].append(values[start])
+            else:
+                result[field].append(round(sum(values[start:end]) / (end - start), 1))
+    return result
+
+
+def summarize(columns: Dict[str, List]) -> Dict[str, Dict]:
+    """필드별 최소/평균/최대와 최대값 시각 (원본 샘플 기준)."""
+    timestamps = columns["timestamp"]
+    summary = {}
+    for field in FIELDS:
+        values = columns[field]
+        if field in ("timestamp", "top_pid") or not values:
+            continue
+        peak = max(range(len(values)), key=values.__getitem__)
+        summary[field] = {
+            "min": round(min(values), 1),
+            "avg": round(sum(values) / len(values), 1),
+            "max": round(values[peak], 1),
+            "max_at": timestamps[peak],
+        }
+    return summary
+
+
+class MetricSampler:
+    """CPU, 메모리, 부하, 디스크 IO, CPU 상위 프로세스를 주기적으로 링 버퍼에 기록 (백그라운드 스레드).
+
+    메모리 사용량은 window / interval 개 샘플로 고정되며, 알람 발생 전 구간을 대기 없이 조회할 수 있다.
+    """
+
+    def __init__(self, interval: float = SAMPLER_INTERVAL, window: float = SAMPLER_WINDOW):
+        self.interval = interval
+        self.window = window
+        self.buffer = RingBuffer(max(int(window / interval), 1))
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="agent-sampler", daemon=True)
+        self._previous = None
+
+    def _measure(self) -> Tuple[float, List[int], Tuple[int, int], Dict]:
+        return time.monotonic(), read_cpu_times(), read_disk_sectors(), read_processes()
+
+    def sample_once(self) -> None:
+        """직전 측정 대비 구간 값으로 샘플 1개 기록 (첫 호출은 기준값만 측정)."""
+        current = self._measure()
+        previous, self._previous = self._previous, current
+        if previous is None:
+            return
+        started, cpu_before, (read_before, written_before), processes_before = previous
+        now, cpu_after, (read_after, written_after), processes_after = current
+        elapsed = (now - started) or self.interval
+
+        top_pid, top_name, top_ticks = 0, None, -1
+        for pid, (name, ticks, _) in processes_after.items():
+            before = processes_before.get(pid)
+            used = ticks - before[1] if before else 0
+            if used > top_ticks:
+                top_pid, top_name, top_ticks = pid, name, used
+
+        cpu = cpu_percent(cpu_before, cpu_after)
+        memory = read_memory()
+        self.buffer.append({
+            "timestamp": time.time(),
+            "cpu_used": cpu["used"],
+            "cpu_iowait": cpu["iowait"],
+            "cpu_steal": cpu["steal"],
+            "mem_used_percent": memory["used_percent"],
+            "mem_available_kb": memory["available_kb"],
+            "swap_used_kb": memory["swap_used_kb"],
+            "load1": os.getloadavg()[0],
+            "disk_read_bps": round((read_after - read_before) * SECTOR_SIZE / elapsed, 1),
+            "disk_write_bps": round((written_after - written_before) * SECTOR_SIZE / elapsed, 1),
+            "top_pid": top_pid,
+            "top_cpu_percent": round(100 * max(top_ticks, 0) / CLOCK_TICKS / elapsed, 1),
+        }, top_name)
+
+    def _run(self) -> None:
+        # 샘플링 소요 시간과 무관하게 일정 간격 유지
+        deadline = time.monotonic()
+        while not self._stop.is_set():
+            try:
+                with SAMPLE_DURATION.time():
+                    self.sample_once()
+            except (OSError, ValueError) as e:
+                print(f"agent.sampler sample failed: {e}")
+            deadline += self.interval
+            self._stop.wait(max(deadline - time.monotonic(), 0))
+
+    def history(self, since: Optional[float] = None, until: Optional[float] = None,
+                max_points: Optional[int] = None) -> Dict:
+        """
+        시간 구간의 샘플 조회.
+
+        Args:
+            since: 시작 시각 (epoch 초), 미지정 시 버퍼 처음부터
+            until: 종료 시각 (epoch 초), 미지정 시 최신 샘플까지
+            max_points: 반환할 최대 샘플 수 (초과 시 구간 평균으로 축소)
+        Returns:
+            요약(필드별 최소/평균/최대)과 필드별 샘플 리스트
+        """
+        columns = self.buffer.range(since, until)
+        count = len(columns["timestamp"])
+        summary = summarize(columns)
+        if max_points:
+            columns = downsample(columns, max_points)
+        return {
+            "interval": self.interval,
+            "window": self.window,
+            "count": count,
+            "points": len(columns["timestamp"]),
+            "summary": summary,
+            "samples": columns,
+        }
+
+    def get_stats(self) -> Dict:
+        return {
+            "interval": self.interval,
+            "window": self.window,
+            "capacity": self.buffer.capacity,
+            "samples": self.buffer.count,
+            "memory_bytes": self.buffer.memory_bytes,
+        }
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join(timeout=self.interval)
@@ -0,0 +1,120 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Tuple
+
+# 지연 시간 히스토그램 버킷 상한(초) (서버 server/utils/telemetry.py와 같은 포맷, Agent는 단독 배포)
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+INF_BUCKET = 'le="+Inf"'
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Histogram:
+    """레이블별 누적 버킷 히스토그램 (Prometheus histogram)."""
+
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labels: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.buckets = tuple(sorted(buckets))
+        # 레이블 값 -> [버킷별 관측 수..., 합계, 개수]
+        self._series: Dict[Tuple[str, ...], List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels) -> None:
+        key = tuple(str(labels.get(name, "")) for name in self.labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 2)
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[index] += 1
+                    break
+            series[-2] += value
+            series[-1] += 1
+
+    @contextmanager
+    def time(self, **labels) -> Iterator[Dict]:
+        """블록 실행 시간 관측 (블록에서 예외 발생 시 outcome="error", 블록에서 레이블 변경 가능)."""
+        labels.setdefault("outcome", "ok")
+        started = time.perf_counter()
+        try:
+            yield labels
+        except BaseException:
+            labels["outcome"] = "error"
+            raise
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            series = sorted((key, list(values)) for key, values in self._series.items())
+        lines = []
+        for key, values in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets, values):
+                cumulative += count
+                le = _format_labels(self.labels, key, f'le="{_format_value(bound)}"')
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            lines.append(f"{self.name}_bucket{_format_labels(self.labels, key, INF_BUCKET)} {values[-1]}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, key)} {_format_value(values[-2])}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, key)} {values[-1]}")
+        return lines
+
+
+class MetricsRegistry:
+    """메트릭 등록과 Prometheus 텍스트 포맷 출력."""
+
+    def __init__(self):
+        self._metrics: Dict[str, Histogram] = {}
+
+    def histogram(self, name: str, documentation: str, labels: Tuple[str, ...] = (),
+                  buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        if name in self._metrics:
+            raise ValueError(f"Duplicate metric: {name}")
+        metric = self._metrics[name] = Histogram(name, documentation, labels, buckets)
+        return metric
+
+    def render(self) -> str:
+        """Prometheus 텍스트 노출 포맷 (text/plain; version=0.0.4)."""
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+HTTP_DURATION = registry.histogram(
+    "agent_http_request_duration_seconds", "Agent API request handling time", ("method", "path", "status"))
+COMMAND_DURATION = registry.histogram(
+    "agent_command_duration_seconds", "Shell command run time (cache hits excluded)", ("program", "outcome"))
+SAMPLE_DURATION = registry.histogram(
+    "agent_sampler_duration_seconds", "Background metric sampler collection time")
+
+
+def program_label(command: str) -> str:
+    """커맨드의 실행 파일 이름 (레이블 수 제한을 위해 인자 제외)."""
+    parts = command.split()
+    return os.path.basename(parts[0]) if parts else ""
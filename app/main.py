@@ -1,9 +1,32 @@
 import streamlit as st
 import requests
+import json
 from config import FASTAPI_HOST, FASTAPI_PORT
 
 
-chat_url = f"http://{FASTAPI_HOST}:{FASTAPI_PORT}/chat"
+chat_url = f"http://{FASTAPI_HOST}:{FASTAPI_PORT}/chat/stream"
+
+# 노드 완료 시 표시할 진행 상태
+NODE_STATUS = {
+    "receive": "요청 유형 확인 완료",
+    "generate": "커맨드 생성 완료",
+    "execute": "커맨드 실행 완료",
+    "compact": "실행 결과 정리 완료",
+    "fetch": "알람 조회 완료",
+}
+
+
+def stream_chat(user_input: str, session_id):
+    """서버 SSE 응답을 (event, data) 단위로 읽음."""
+    with requests.post(chat_url, json={"user_input": user_input, "session_id": session_id},
+                       stream=True, timeout=(5, None)) as response:
+        response.raise_for_status()
+        event = None
+        for line in response.iter_lines(decode_unicode=True):
+            if line.startswith("event: "):
+                event = line[len("event: "):]
+            elif line.startswith("data: "):
+                yield event, json.loads(line[len("data: "):])
 
 st.title("ATL")
 st.caption("EC2 모니터링 챗봇")
@@ -11,6 +34,9 @@ st.caption("EC2 모니터링 챗봇")
 # 초기 상태 설정
 if 'session_history' not in st.session_state:
     st.session_state.session_history = []
+# 서버 세션 ID (첫 응답에서 발급, 대화 기록은 서버에 누적)
+if 'session_id' not in st.session_state:
+    st.session_state.session_id = None
 
 print(f"session_history: {st.session_state.session_history}")
 
@@ -19,29 +45,38 @@ if user_question := st.chat_input(placeholder="질문 내용 입력"):
     with st.chat_message("user"):
         st.write(user_question)
 
-    with st.spinner("답변을 생성하는 중"):
+    with st.chat_message("ai"):
+        placeholder = st.empty()
+        placeholder.markdown("답변을 생성하는 중...")
+        ai_message = ""
         try:
             print(f"Sending request to server: {user_question}")
-            response = requests.post(chat_url, json={"user_input": user_question, "chat_history": st.session_state.session_history})
-            response.raise_for_status()
-            ai_message = response.json()
+            # 새 입력만 전송, analyze 토큰을 받는 대로 표시
+            for event, data in stream_chat(user_question, st.session_state.session_id):
+                if event == "session":
+                    st.session_state.session_id = data["session_id"]
+                elif event == "status" and not ai_message:
+                    placeholder.markdown(f"{NODE_STATUS.get(data['node'], data['node'])}...")
+                elif event == "token":
+                    ai_message += data["content"]
+                    placeholder.markdown(ai_message + "▌")
+                elif event in ("answer", "error"):
+                    ai_message = data["content"] or ""
+            placeholder.markdown(ai_message)
         except requests.RequestException as e:
             ai_message = {"error": f"Failed to get response: {str(e)}"}
+            placeholder.markdown(ai_message)
 
-        # AI 응답 표시
-        with st.chat_message("ai"):
-            st.markdown(ai_message)
-
-        # session_history에 딕셔너리 형태로 추가
-        st.session_state.session_history.append(
-            {
-                "user": {
-                    "content": user_question,
-                },
-                "assistant": {
-                    "content": ai_message,
-                },
+    # session_history에 딕셔너리 형태로 추가
+    st.session_state.session_history.append(
+        {
+            "user": {
+                "content": user_question,
+            },
+            "assistant": {
+                "content": ai_message,
             },
-        )
+        },
+    )
 
-        print(f"Conversation response: {ai_message}")
\ No newline at end of file
+    print(f"Conversation response: {ai_message}")
\ No newline at end of file
@@ -8,10 +8,96 @@ AWS_ACCESS_KEY_ID = os.getenv("AWS_ACCESS_KEY_ID", "")
 AWS_SECRET_ACCESS_KEY = os.getenv("AWS_SECRET_ACCESS_KEY", "")
 AWS_REGION = os.getenv("AWS_REGION", "us-east-1")
 AWS_SQS_QUEUE_URL = os.getenv("AWS_SQS_QUEUE_URL", "")
+# 로컬 SQS 호환 서버(ElasticMQ, moto 등) 사용 시 엔드포인트
+AWS_SQS_ENDPOINT_URL = os.getenv("AWS_SQS_ENDPOINT_URL") or None
 
 # FastAPI 설정
 FASTAPI_HOST = os.getenv("FASTAPI_HOST", "localhost")
 FASTAPI_PORT = int(os.getenv("FASTAPI_PORT", 8000))
 API_TOKEN = os.getenv("API_TOKEN", "your-secret-token")
 
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
\ No newline at end of file
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
+
+# LLM 클라이언트 커넥션 풀 설정
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", 30.0))
+LLM_CONNECT_TIMEOUT = float(os.getenv("LLM_CONNECT_TIMEOUT", 5.0))
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", 100))
+LLM_MAX_KEEPALIVE = int(os.getenv("LLM_MAX_KEEPALIVE", 20))
+LLM_KEEPALIVE_EXPIRY = float(os.getenv("LLM_KEEPALIVE_EXPIRY", 60.0))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", 2))
+
+# analyze 프롬프트에 들어가는 실행 결과 토큰 예산
+ANALYZE_TOKEN_BUDGET = int(os.getenv("ANALYZE_TOKEN_BUDGET", 3000))
+
+# 동일 알람 (인스턴스, 메트릭, 알람 이름) 병합 윈도우(초)
+ALARM_COALESCE_WINDOW = float(os.getenv("ALARM_COALESCE_WINDOW", 120))
+
+# 알람 결과 저장소 (SQLite 경로, 메모리 보관 개수)
+ALARM_DB_PATH = os.getenv("ALARM_DB_PATH", "alarm_results.db")
+ALARM_MEMORY_SIZE = int(os.getenv("ALARM_MEMORY_SIZE", 200))
+
+# SQS 컨슈머 설정 (워커 수, 동시 처리 한도, 가시성 타임아웃(초))
+SQS_MAX_WORKERS = int(os.getenv("SQS_MAX_WORKERS", 8))
+SQS_MAX_IN_FLIGHT = int(os.getenv("SQS_MAX_IN_FLIGHT", 16))
+SQS_VISIBILITY_TIMEOUT = int(os.getenv("SQS_VISIBILITY_TIMEOUT", 60))
+# /sqs_trigger 전송 타임아웃(초), 응답은 알람 워크플로우 완료 후 반환되므로 워크플로우 최대 실행 시간 이상
+SQS_FORWARD_TIMEOUT = float(os.getenv("SQS_FORWARD_TIMEOUT", 300))
+
+# 알람 수집 방식: "poller" (별도 sqs_puller 프로세스 → /sqs_trigger) 또는 "inprocess" (서버 내부 수신)
+SQS_INGEST_MODE = os.getenv("SQS_INGEST_MODE", "poller")
+INGEST_QUEUE_SIZE = int(os.getenv("INGEST_QUEUE_SIZE", 32))
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", 8))
+
+# LLM 응답 캐시 (generate/receive), DB 경로를 비우면 디스크 계층 미사용
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+LLM_CACHE_SIZE = int(os.getenv("LLM_CACHE_SIZE", 512))
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", 3600))
+LLM_CACHE_DB_PATH = os.getenv("LLM_CACHE_DB_PATH", "")
+
+# 채팅 워크플로우 체크포인트 저장소 (승인 대기 중인 그래프 상태, 대화별 thread_id)
+CHECKPOINT_DB_PATH = os.getenv("CHECKPOINT_DB_PATH", "checkpoints.db")
+
+# 채팅 세션 저장소 (최대 세션 수, 유휴 만료(초), 세션당 보관 턴 수)
+SESSION_MAX = int(os.getenv("SESSION_MAX", 1000))
+SESSION_TTL = float(os.getenv("SESSION_TTL", 3600))
+SESSION_MAX_TURNS = int(os.getenv("SESSION_MAX_TURNS", 100))
+
+# 프롬프트용 대화 기록 관리 (최근 K턴 원문 유지, 이전 턴은 롤링 요약)
+HISTORY_RECENT_TURNS = int(os.getenv("HISTORY_RECENT_TURNS", 3))
+HISTORY_TURN_MAX_TOKENS = int(os.getenv("HISTORY_TURN_MAX_TOKENS", 400))
+HISTORY_SUMMARY_MAX_TOKENS = int(os.getenv("HISTORY_SUMMARY_MAX_TOKENS", 300))
+# 노드별 대화 기록 토큰 예산
+HISTORY_TOKEN_BUDGETS = {
+    "receive": int(os.getenv("HISTORY_TOKEN_BUDGET_RECEIVE", 400)),
+    "generate": int(os.getenv("HISTORY_TOKEN_BUDGET_GENERATE", 1500)),
+}
+
+# receive 규칙 기반 라우팅 최소 신뢰도 (미만이면 LLM 분류)
+ROUTER_CONFIDENCE_THRESHOLD = float(os.getenv("ROUTER_CONFIDENCE_THRESHOLD", 0.8))
+
+# Agent RPC 클라이언트 (연결 타임아웃, 커맨드 기본 제한 시간(Agent EXECUTE_DEADLINE과 동일), 읽기 타임아웃 여유분(초))
+AGENT_CONNECT_TIMEOUT = float(os.getenv("AGENT_CONNECT_TIMEOUT", 3.0))
+AGENT_EXECUTE_TIMEOUT = int(os.getenv("AGENT_EXECUTE_TIMEOUT", 60))
+AGENT_TIMEOUT_MARGIN = float(os.getenv("AGENT_TIMEOUT_MARGIN", 5.0))
+# Agent별 커넥션 풀 크기
+AGENT_MAX_CONNECTIONS = int(os.getenv("AGENT_MAX_CONNECTIONS", 20))
+AGENT_MAX_KEEPALIVE = int(os.getenv("AGENT_MAX_KEEPALIVE", 10))
+# 연결 실패/5xx 재시도 (최대 횟수, 기본 백오프(초), 지터 포함 지수 증가)
+AGENT_MAX_RETRIES = int(os.getenv("AGENT_MAX_RETRIES", 2))
+AGENT_RETRY_BACKOFF = float(os.getenv("AGENT_RETRY_BACKOFF", 0.2))
+# Agent별 서킷 브레이커 (연속 실패 횟수, 차단 유지 시간(초))
+AGENT_BREAKER_THRESHOLD = int(os.getenv("AGENT_BREAKER_THRESHOLD", 5))
+AGENT_BREAKER_RESET = float(os.getenv("AGENT_BREAKER_RESET", 30.0))
+
+# 다중 인스턴스 동시 실행 (동시 Agent 호출 수, Agent별 실행 제한 시간(초))
+FANOUT_CONCURRENCY = int(os.getenv("FANOUT_CONCURRENCY", 16))
+FANOUT_AGENT_DEADLINE = int(os.getenv("FANOUT_AGENT_DEADLINE", 30))
+# Agent /metrics/snapshot 조회 (셸 커맨드 없이 /proc 기반 시스템 상태 수집)
+SNAPSHOT_TIMEOUT = float(os.getenv("SNAPSHOT_TIMEOUT", 5))
+SNAPSHOT_TOP_PROCESSES = int(os.getenv("SNAPSHOT_TOP_PROCESSES", 5))
+# Agent /metrics/history 조회 (알람 발생 시각 기준 이전 구간(초), 반환 최대 샘플 수)
+METRICS_HISTORY_LOOKBACK = float(os.getenv("METRICS_HISTORY_LOOKBACK", 300))
+METRICS_HISTORY_POINTS = int(os.getenv("METRICS_HISTORY_POINTS", 30))
+
+# Agent 레지스트리 (하트비트가 끊긴 Agent를 비정상으로 판단하는 시간(초))
+AGENT_HEARTBEAT_TTL = float(os.getenv("AGENT_HEARTBEAT_TTL", 30))
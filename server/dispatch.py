@@ -0,0 +1,260 @@
+# server/dispatch.py
+from typing import AsyncIterator, Dict, List, Optional
+import asyncio
+import json
+import httpx
+from server.config import (
+    ALARM_DB_PATH,
+    ALARM_MEMORY_SIZE,
+    AGENT_TIMEOUT_MARGIN,
+    FANOUT_CONCURRENCY,
+    FANOUT_AGENT_DEADLINE,
+    SNAPSHOT_TIMEOUT,
+    SNAPSHOT_TOP_PROCESSES,
+    METRICS_HISTORY_POINTS,
+)
+from server.models.models import ExecuteRequest, ExecuteResponse
+from server.utils.agent_client import get_agent_client
+from server.utils.alarm_store import AlarmStore
+from server.utils.coalesce import alarm_key
+from server.utils.logging import setup_logger
+from server.utils.server_info import get_agent_url
+
+logger = setup_logger(__name__)
+
+# 실행 결과에서 Agent 메트릭 스냅샷/이력 항목의 command 값
+SNAPSHOT_COMMAND = "metrics_snapshot"
+HISTORY_COMMAND = "metrics_history"
+
+_alarm_store: Optional[AlarmStore] = None
+
+
+def get_alarm_store() -> AlarmStore:
+    """알람 워크플로우 결과 저장소 반환 (최초 호출 시 생성)."""
+    global _alarm_store
+    if _alarm_store is None:
+        _alarm_store = AlarmStore(ALARM_DB_PATH, ALARM_MEMORY_SIZE)
+    return _alarm_store
+
+
+def close_alarm_store() -> None:
+    """알람 결과 저장소 연결 종료 (서버 종료 시 호출)."""
+    global _alarm_store
+    store, _alarm_store = _alarm_store, None
+    if store is not None:
+        store.close()
+
+
+def record_alarm_result(result: Dict) -> int:
+    """알람 워크플로우 최종 상태 저장 후 ID 반환."""
+    raw_data = (result.get("raw_input") or {}).get("raw_data") or {}
+    instance_id, metric_name, alarm_name = alarm_key(raw_data)
+    return get_alarm_store().add(result, instance_id or result.get("target"), alarm_name, metric_name)
+
+
+def update_alarm_result(record_id: int, fields: Dict) -> None:
+    """저장된 알람 워크플로우 결과 일부 갱신."""
+    get_alarm_store().update(record_id, fields)
+
+
+def list_alarm_results(instance_id: Optional[str] = None, alarm_name: Optional[str] = None,
+                       since: Optional[float] = None, until: Optional[float] = None,
+                       limit: int = 50, offset: int = 0) -> List[Dict]:
+    """저장된 알람 워크플로우 결과를 최신순으로 조회."""
+    return get_alarm_store().query(instance_id, alarm_name, since, until, limit, offset)
+
+
+def latest_alarm_result(instance_id: Optional[str] = None) -> Optional[Dict]:
+    """가장 최근 알람 워크플로우 결과 조회."""
+    return get_alarm_store().latest(instance_id)
+
+
+def _failed(commands: List[str], message: str) -> List[ExecuteResponse]:
+    return [ExecuteResponse(
+        command=" ".join(commands) if commands else "",
+        stdout=None,
+        stderr=message,
+        returncode=1
+    )]
+
+
+async def execute_on_agent(commands: Optional[List[str]], target: Optional[str], url: str,
+                           timeout: Optional[int] = None) -> List[ExecuteResponse]:
+    """Agent의 /execute API를 직접 호출하여 커맨드 실행.
+
+    Args:
+        commands: 실행할 커맨드 리스트
+        target: 대상 인스턴스 ID
+        url: Agent 베이스 URL
+        timeout: 요청 전체 실행 제한 시간(초), 미지정 시 Agent 기본값 (읽기 타임아웃도 이에 맞춤)
+    Returns:
+        실행 결과 리스트
+    """
+    logger.info(f"commands: {commands}, target: {target}, url: {url}")
+
+    if not commands:
+        logger.warning("No command provided in request")
+        return [ExecuteResponse(
+            command="",
+            stdout=None,
+            stderr="No command to execute",
+            returncode=1
+        )]
+
+    try:
+        payload = ExecuteRequest(command=commands, agent=target, timeout=timeout)
+        logger.info(f"Sending request to {url}/execute with command: {commands}")
+        response = await get_agent_client().post(url, "/execute", payload.dict(), timeout)
+
+        logger.info(f"Response: {response.json()}")
+
+        # 응답이 List[ExecuteResponse]와 호환되는지 확인
+        results = response.json()
+        if not isinstance(results, list):
+            logger.error(f"Expected list response, got: {type(results)}")
+            return _failed(commands, "Invalid response format from agent")
+
+        # Pydantic 모델로 변환
+        return [ExecuteResponse(**result) for result in results]
+
+    except httpx.HTTPError as e:
+        logger.error(f"Request to agent failed: {str(e)}")
+        return _failed(commands, f"Request failed: {str(e)}")
+
+
+async def fetch_snapshot(url: str, top: int = SNAPSHOT_TOP_PROCESSES) -> ExecuteResponse:
+    """Agent의 /metrics/snapshot API 호출 (/proc 기반 CPU, 메모리, 부하, 디스크, 상위 프로세스).
+
+    Args:
+        url: Agent 베이스 URL
+        top: 상위 프로세스 개수
+    Returns:
+        스냅샷을 parsed에 담은 실행 결과 (실패 시 실패 결과)
+    """
+    try:
+        response = await get_agent_client().get(url, "/metrics/snapshot", {"top": top}, SNAPSHOT_TIMEOUT)
+        return ExecuteResponse(command=SNAPSHOT_COMMAND, stdout=None, stderr=None,
+                               returncode=0, parsed=response.json())
+    except (httpx.HTTPError, ValueError) as e:
+        # ValueError: JSON이 아닌 200 응답 (프록시 에러 페이지 등)
+        logger.error(f"Snapshot request to agent failed: {str(e)}")
+        return _failed([SNAPSHOT_COMMAND], f"Request failed: {str(e)}")[0]
+
+
+async def fetch_history(url: str, since: Optional[float] = None, until: Optional[float] = None,
+                        max_points: int = METRICS_HISTORY_POINTS) -> ExecuteResponse:
+    """Agent의 /metrics/history API 호출 (백그라운드 샘플러 링 버퍼의 시간 구간 조회, 대기 없음).
+
+    Args:
+        url: Agent 베이스 URL
+        since: 시작 시각 (epoch 초)
+        until: 종료 시각 (epoch 초), 미지정 시 최신 샘플까지
+        max_points: 반환할 최대 샘플 수 (초과 시 Agent가 구간 평균으로 축소)
+    Returns:
+        요약과 샘플을 parsed에 담은 실행 결과 (실패 시 실패 결과)
+    """
+    params = {"max_points": max_points}
+    if since is not None:
+        params["since"] = since
+    if until is not None:
+        params["until"] = until
+    try:
+        response = await get_agent_client().get(url, "/metrics/history", params, SNAPSHOT_TIMEOUT)
+        return ExecuteResponse(command=HISTORY_COMMAND, stdout=None, stderr=None,
+                               returncode=0, parsed=response.json())
+    except (httpx.HTTPError, ValueError) as e:
+        logger.error(f"History request to agent failed: {str(e)}")
+        return _failed([HISTORY_COMMAND], f"Request failed: {str(e)}")[0]
+
+
+async def collect(commands: Optional[List[str]], target: Optional[str], url: str,
+                  snapshot: bool = False, timeout: Optional[int] = None,
+                  history: Optional[Dict] = None) -> List[ExecuteResponse]:
+    """커맨드 실행과 메트릭 스냅샷/이력 조회를 동시에 수행 (스냅샷, 이력, 커맨드 결과 순).
+
+    Args:
+        commands: 실행할 커맨드 리스트 (비어 있으면 스냅샷/이력만 조회)
+        target: 대상 인스턴스 ID
+        url: Agent 베이스 URL
+        snapshot: True면 /metrics/snapshot도 함께 조회
+        timeout: 커맨드 실행 제한 시간(초)
+        history: 지정 시 /metrics/history도 함께 조회 (since, until)
+    Returns:
+        실행 결과 리스트
+    """
+    if not snapshot and history is None:
+        return await execute_on_agent(commands, target, url, timeout)
+    fetches = []
+    if snapshot:
+        fetches.append(fetch_snapshot(url))
+    if history is not None:
+        fetches.append(fetch_history(url, history.get("since"), history.get("until")))
+    if not commands:
+        return list(await asyncio.gather(*fetches))
+    *metrics, results = await asyncio.gather(*fetches, execute_on_agent(commands, target, url, timeout))
+    return [*metrics, *results]
+
+
+async def fan_out(commands: List[str], targets: List[str],
+                  concurrency: int = FANOUT_CONCURRENCY,
+                  deadline: int = FANOUT_AGENT_DEADLINE,
+                  snapshot: bool = False, history: Optional[Dict] = None) -> Dict[str, List[ExecuteResponse]]:
+    """
+    같은 커맨드를 여러 인스턴스의 Agent에 동시 실행.
+
+    Args:
+        commands: 실행할 커맨드 리스트
+        targets: 대상 인스턴스 ID 리스트
+        concurrency: 동시 Agent 호출 수
+        deadline: Agent별 실행 제한 시간(초), Agent에도 전달되며 재시도 포함 전체 대기 시간의 상한
+        snapshot: True면 인스턴스별 메트릭 스냅샷도 함께 조회
+        history: 지정 시 인스턴스별 메트릭 이력도 함께 조회 (since, until)
+    Returns:
+        인스턴스 ID별 실행 결과 (실패/시간 초과 인스턴스는 실패 결과)
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    requested = (([SNAPSHOT_COMMAND] if snapshot else []) + ([HISTORY_COMMAND] if history is not None else [])
+                 + list(commands or []))
+
+    async def run(target: str) -> List[ExecuteResponse]:
+        async with semaphore:
+            try:
+                url = get_agent_url(target)
+                results = await asyncio.wait_for(collect(commands, target, url, snapshot, deadline, history),
+                                                 deadline + AGENT_TIMEOUT_MARGIN)
+                return results or _failed(requested, "No valid response data")
+            except asyncio.TimeoutError:
+                logger.error(f"Fan-out to {target} exceeded {deadline}s deadline")
+                return _failed(requested, f"{deadline}s deadline exceeded")
+            except Exception as e:
+                logger.error(f"Fan-out to {target} failed: {str(e)}")
+                return _failed(requested, getattr(e, "detail", None) or str(e))
+
+    logger.info(f"Fan-out {requested} to {len(targets)} instances (concurrency {concurrency})")
+    results = await asyncio.gather(*(run(target) for target in targets))
+    return dict(zip(targets, results))
+
+
+async def stream_on_agent(commands: List[str], target: Optional[str], url: str,
+                          max_bytes: Optional[int] = None, timeout: Optional[int] = None) -> AsyncIterator[Dict]:
+    """Agent의 /execute/stream API를 호출하여 커맨드별 출력 이벤트를 수신 즉시 전달.
+
+    Args:
+        commands: 실행할 커맨드 리스트
+        target: 대상 인스턴스 ID
+        url: Agent 베이스 URL
+        max_bytes: 커맨드별 출력 최대 바이트 (미지정 시 Agent 기본값)
+        timeout: 요청 전체 실행 제한 시간(초), 미지정 시 Agent 기본값
+    Returns:
+        start/stdout/stderr/exit/done 이벤트
+    """
+    logger.info(f"Streaming {commands} on {url}/execute/stream")
+    payload = ExecuteRequest(command=commands, agent=target, max_bytes=max_bytes, timeout=timeout)
+    try:
+        async with get_agent_client().stream(url, "/execute/stream", payload.dict(), timeout) as response:
+            async for line in response.aiter_lines():
+                if line:
+                    yield json.loads(line)
+    except httpx.HTTPError as e:
+        logger.error(f"Stream request to agent failed: {str(e)}")
+        yield {"event": "error", "error": f"Request failed: {str(e)}"}
@@ -0,0 +1,160 @@
+# server/ingest.py
+import asyncio
+from typing import Awaitable, Callable, Dict, List, Optional, Set
+from server.models.models import Alarm
+from server.sqs_puller import SQS_BATCH_SIZE, parse_alarm, delete_messages, extend_visibility
+from server.utils.logging import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class AlarmIngestor:
+    """서버 프로세스 내부 SQS 수신 루프와 조사 워커.
+
+    수신한 알람은 HTTP 전송 없이 bounded asyncio 큐로 워커에 전달되며,
+    큐의 빈 자리 수만큼만 SQS에서 가져와 수신 속도를 조절한다.
+    """
+
+    def __init__(self, sqs, queue_url: str, handler: Callable[[Alarm], Awaitable],
+                 queue_size: int, workers: int, visibility_timeout: int, wait_time_seconds: int = 20):
+        self.sqs = sqs
+        self.queue_url = queue_url
+        self.handler = handler
+        self.capacity = queue_size
+        self.workers = workers
+        self.visibility_timeout = visibility_timeout
+        self.wait_time_seconds = wait_time_seconds
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self._space = asyncio.Event()
+        self._in_flight: Dict[str, str] = {}  # 큐 대기 + 처리 중 (MessageId -> ReceiptHandle)
+        self._acks: List[Dict] = []
+        self._tasks: List[asyncio.Task] = []
+        self._deleting: Set[asyncio.Future] = set()  # 진행 중인 삭제 요청 (취소되어도 완료까지 유지)
+        self.stats = {"received": 0, "processed": 0, "failed": 0, "invalid": 0}
+
+    def _free_slots(self) -> int:
+        return self.capacity - len(self._in_flight)
+
+    async def start(self) -> None:
+        self._tasks = [asyncio.create_task(self._receive_loop(), name="ingest-receive"),
+                       asyncio.create_task(self._heartbeat(), name="ingest-heartbeat")]
+        self._tasks += [asyncio.create_task(self._worker(), name=f"ingest-worker-{i}") for i in range(self.workers)]
+        logger.info(f"Alarm ingestion started: queue={self.capacity}, workers={self.workers}")
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        # 취소된 태스크가 보낸 삭제 요청 완료 대기 후 남은 삭제 요청 전송
+        await asyncio.gather(*self._deleting, return_exceptions=True)
+        await self._flush_acks()
+        logger.info("Alarm ingestion stopped")
+
+    async def _receive_loop(self) -> None:
+        while True:
+            free = self._free_slots()
+            if free <= 0:
+                # 큐가 가득 찬 동안은 SQS 수신 중단 (backpressure)
+                self._space.clear()
+                await self._space.wait()
+                continue
+            try:
+                # 대기 중인 작업이 있으면 짧게 폴링하여 완료된 작업의 삭제 요청을 빨리 보냄
+                wait_time = self.wait_time_seconds if not self._in_flight else 1
+                response = await asyncio.to_thread(
+                    self.sqs.receive_message,
+                    QueueUrl=self.queue_url,
+                    MaxNumberOfMessages=min(free, SQS_BATCH_SIZE),
+                    WaitTimeSeconds=wait_time,
+                    VisibilityTimeout=self.visibility_timeout
+                )
+            except Exception as e:
+                logger.error(f"Error polling SQS: {str(e)}")
+                await asyncio.sleep(1)
+                continue
+
+            for message in response.get("Messages", []):
+                try:
+                    alarm = parse_alarm(message)
+                except Exception as e:
+                    # 형식이 잘못된 메시지는 재전달되어도 처리할 수 없으므로 삭제 (수신 루프는 계속)
+                    logger.error(f"Invalid alarm message {message.get('MessageId')}: {type(e).__name__}: {str(e)}")
+                    self.stats["invalid"] += 1
+                    self._acks.append({"Id": message["MessageId"], "ReceiptHandle": message["ReceiptHandle"]})
+                    continue
+                self._in_flight[message["MessageId"]] = message["ReceiptHandle"]
+                self.stats["received"] += 1
+                self._queue.put_nowait((message, alarm))
+            await self._flush_acks()
+
+    async def _worker(self) -> None:
+        while True:
+            message, alarm = await self._queue.get()
+            try:
+                await self.handler(alarm)
+                self._acks.append({"Id": message["MessageId"], "ReceiptHandle": message["ReceiptHandle"]})
+                self.stats["processed"] += 1
+            except Exception as e:
+                # 삭제하지 않으면 가시성 타임아웃 후 재전달됨
+                logger.error(f"Alarm investigation failed: {str(e)}", exc_info=True)
+                self.stats["failed"] += 1
+            finally:
+                self._in_flight.pop(message["MessageId"], None)
+                self._queue.task_done()
+                self._space.set()
+            if len(self._acks) >= SQS_BATCH_SIZE:
+                await self._flush_acks()
+
+    async def _flush_acks(self) -> None:
+        acks, self._acks = self._acks, []
+        if acks:
+            deleting = asyncio.ensure_future(asyncio.to_thread(delete_messages, self.sqs, self.queue_url, acks))
+            self._deleting.add(deleting)
+            deleting.add_done_callback(self._deleting.discard)
+            try:
+                # 호출한 태스크가 취소되어도 꺼낸 삭제 요청은 유실되지 않도록 보호
+                await asyncio.shield(deleting)
+            except Exception as e:
+                logger.error(f"Error deleting messages: {str(e)}")
+
+    async def _heartbeat(self) -> None:
+        while True:
+            await asyncio.sleep(self.visibility_timeout / 2)
+            try:
+                await asyncio.to_thread(extend_visibility, self.sqs, self.queue_url,
+                                        dict(self._in_flight), self.visibility_timeout)
+                await self._flush_acks()
+            except Exception as e:
+                logger.error(f"Error extending visibility: {str(e)}")
+
+    def get_stats(self) -> Dict:
+        return {
+            **self.stats,
+            "queued": self._queue.qsize(),
+            "in_flight": len(self._in_flight),
+            "capacity": self.capacity,
+        }
+
+
+_ingestor: Optional[AlarmIngestor] = None
+
+
+def get_ingestor() -> Optional[AlarmIngestor]:
+    return _ingestor
+
+
+async def start_ingestion(sqs, queue_url: str, handler: Callable[[Alarm], Awaitable],
+                          queue_size: int, workers: int, visibility_timeout: int) -> AlarmIngestor:
+    """프로세스 내 알람 수집 시작 (서버 기동 시 호출)."""
+    global _ingestor
+    _ingestor = AlarmIngestor(sqs, queue_url, handler, queue_size, workers, visibility_timeout)
+    await _ingestor.start()
+    return _ingestor
+
+
+async def stop_ingestion() -> None:
+    """프로세스 내 알람 수집 종료 (서버 종료 시 호출)."""
+    global _ingestor
+    ingestor, _ingestor = _ingestor, None
+    if ingestor is not None:
+        await ingestor.stop()
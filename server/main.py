@@ -1,25 +1,91 @@
-from fastapi import FastAPI, HTTPException
-from server.models.models import Alarm, ExecuteRequest, ExecuteResponse
-import requests
-from server.config import API_TOKEN
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Query, Request, Header
+from fastapi.responses import StreamingResponse, PlainTextResponse
+from langgraph.graph import END
+from server.models.models import Alarm, ExecuteResponse, AgentHeartbeat
 from server.workflow.state import AgentState
-from server.workflow.builder import build_workflow
-from typing import List, Dict
+from server.workflow.registry import init_workflow, get_workflow, get_workflow_stats, ALARM_WORKFLOW, CHAT_WORKFLOW
+from server.workflow.router import intent_router
+from server.workflow.checkpoint import open_checkpointer, close_checkpointer, thread_config, forget_thread, prune_threads
+from typing import List, Dict, Optional
+import hmac
+import json
 from server.utils.logging import setup_logger
+from server.utils.coalesce import AlarmCoalescer
+from server.utils.session_store import Session, SessionStore
+from server.utils.history import summarizer, schedule_fold
+from server.config import (
+    ALARM_COALESCE_WINDOW,
+    AWS_SQS_QUEUE_URL,
+    SQS_INGEST_MODE,
+    SQS_VISIBILITY_TIMEOUT,
+    INGEST_QUEUE_SIZE,
+    INGEST_WORKERS,
+    API_TOKEN,
+    SESSION_MAX,
+    SESSION_TTL,
+    SESSION_MAX_TURNS,
+)
+from server.ingest import start_ingestion, stop_ingestion, get_ingestor
+from server.sqs_puller import create_sqs_client
+from server.utils.llm import close_llm
+from server.utils.llm_cache import llm_cache
+from server.utils.agent_client import get_agent_client, close_agent_client
+from server.utils.telemetry import registry, WORKFLOW_DURATION
+from server.utils.server_info import agent_registry
+from server.dispatch import (
+    collect,
+    stream_on_agent,
+    record_alarm_result,
+    update_alarm_result,
+    list_alarm_results,
+    close_alarm_store,
+)
 
-app = FastAPI()
-cloudwatch_messages: List[Dict] = []
 logger = setup_logger(__name__)
-last_question_bool = False
 
-def sqs_trigger(alarm: Alarm):
-    """CloudWatch SQS 메시지 처리."""
-    workflow = build_workflow()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """서버 기동 시 워크플로우 컴파일/검증 (실패 시 기동 중단) 및 설정에 따라 프로세스 내 알람 수집 시작."""
+    init_workflow(await open_checkpointer())
+    # 재시작 전 세션의 대화 체크포인트 정리
+    await prune_threads(SESSION_TTL)
+    if SQS_INGEST_MODE == "inprocess":
+        await start_ingestion(create_sqs_client(), AWS_SQS_QUEUE_URL, sqs_trigger,
+                              INGEST_QUEUE_SIZE, INGEST_WORKERS, SQS_VISIBILITY_TIMEOUT)
+    yield
+    await stop_ingestion()
+    await close_llm()
+    await close_agent_client()
+    close_alarm_store()
+    await close_checkpointer()
+
+
+app = FastAPI(lifespan=lifespan)
+coalescer = AlarmCoalescer(ALARM_COALESCE_WINDOW)
+sessions = SessionStore(SESSION_MAX, SESSION_TTL, SESSION_MAX_TURNS, on_drop=forget_thread)
+# 응답 없이 끝난 턴(클라이언트 연결 종료 등)의 세션 기록 값
+CHAT_INTERRUPTED = "응답이 중단되었습니다."
+
+async def sqs_trigger(alarm: Alarm) -> Dict:
+    """CloudWatch SQS 메시지 처리 (윈도우 내 중복 알람은 기존 조사에 병합)."""
+    is_new, entry = coalescer.claim(alarm.raw_data)
+    if not is_new:
+        if entry.get("record_id") is not None:
+            # 이미 저장된 조사 결과에 발생 내역 반영 (진행 중이면 완료 시 함께 저장됨)
+            update_alarm_result(entry["record_id"], {"occurrences": entry["occurrences"]})
+        return {"coalesced": True, "occurrences": len(entry["occurrences"])}
+
+    workflow = get_workflow()
     initial_state = AgentState(
         input_type="cloudwatch",
         raw_input=alarm.dict(),
         command=None,
         target=None,
+        targets=None,
+        include_snapshot=None,
+        include_history=None,
         approved=True,
         execution_result=None,
         final_answer=None,
@@ -27,104 +93,269 @@ def sqs_trigger(alarm: Alarm):
         intent=None,
         user_question=False
     )
-    
-    cloudwatch_messages.append(workflow.invoke(initial_state))
+
+    result = None
+    try:
+        with WORKFLOW_DURATION.time(workflow=ALARM_WORKFLOW):
+            result = await workflow.ainvoke(initial_state)
+        # 조사 중 병합된 발생 내역 포함하여 저장
+        result["occurrences"] = entry["occurrences"]
+        entry["record_id"] = record_alarm_result(result)
+    finally:
+        coalescer.finish(entry, result)
+    return {"coalesced": False, "occurrences": len(entry["occurrences"])}
 
 @app.post("/sqs_trigger")
-def sqs_trigger_endpoint(alarm: Alarm):
-    sqs_trigger(alarm)
+async def sqs_trigger_endpoint(alarm: Alarm) -> Dict:
+    return await sqs_trigger(alarm)
+
+@app.get("/alarms/coalescing")
+def coalescing_stats() -> Dict:
+    """알람 병합 통계 조회."""
+    return {"window": coalescer.window, **coalescer.stats}
+
+@app.get("/ingest/stats")
+def ingest_stats() -> Dict:
+    """프로세스 내 알람 수집 큐 상태 조회."""
+    ingestor = get_ingestor()
+    if ingestor is None:
+        return {"mode": SQS_INGEST_MODE}
+    return {"mode": SQS_INGEST_MODE, **ingestor.get_stats()}
+
+@app.get("/llm/cache/stats")
+def llm_cache_stats() -> Dict:
+    """LLM 응답 캐시 적중/미적중 통계 (노드별)."""
+    return llm_cache.stats
+
+@app.get("/sessions/stats")
+def session_stats() -> Dict:
+    """채팅 세션 저장소 및 대화 기록 요약 통계 조회."""
+    return {**sessions.get_stats(), "history_summary": summarizer.stats}
+
+def verify_agent(authorization: str) -> None:
+    """Agent 등록/하트비트 요청의 API 토큰 검증."""
+    token = authorization.replace("Bearer ", "") if authorization.startswith("Bearer ") else ""
+    if not hmac.compare_digest(token, API_TOKEN):
+        raise HTTPException(status_code=401, detail="유효하지 않은 토큰")
+
+def agent_info(heartbeat: AgentHeartbeat, request: Request) -> Dict:
+    info = heartbeat.dict()
+    # URL 미지정 시 요청을 보낸 IP와 Agent 포트로 구성
+    info["url"] = heartbeat.url or f"http://{request.client.host}:{heartbeat.port}"
+    return info
+
+@app.post("/agents/register")
+def register_agent(heartbeat: AgentHeartbeat, request: Request,
+                   authorization: str = Header(default="")) -> Dict:
+    """Agent 기동 시 자가 등록."""
+    verify_agent(authorization)
+    entry = agent_registry.upsert(agent_info(heartbeat, request), register=True)
+    logger.info(f"Agent registered: {entry}")
+    return {"instance_id": entry["instance_id"], "ttl": agent_registry.ttl}
+
+@app.post("/agents/heartbeat")
+def agent_heartbeat(heartbeat: AgentHeartbeat, request: Request,
+                    authorization: str = Header(default="")) -> Dict:
+    """Agent 주기 하트비트 (부하, 버전 갱신)."""
+    verify_agent(authorization)
+    entry = agent_registry.upsert(agent_info(heartbeat, request))
+    return {"instance_id": entry["instance_id"], "ttl": agent_registry.ttl}
+
+@app.get("/agents")
+def list_agents() -> Dict:
+    """등록된 Agent 목록 (정상 여부 포함) 및 레지스트리 통계."""
+    return {"agents": agent_registry.snapshot(), **agent_registry.stats}
+
+@app.get("/agents/stats")
+def agent_stats() -> Dict:
+    """Agent RPC 재시도/실패 및 Agent별 서킷 상태 조회."""
+    return get_agent_client().get_stats()
+
+@app.get("/workflow/stats")
+def workflow_stats() -> Dict:
+    """워크플로우 빌드/재사용 및 receive 라우팅 경로 통계 조회."""
+    return {**get_workflow_stats(), "routing": intent_router.get_stats()}
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics() -> PlainTextResponse:
+    """노드별 실행 시간, LLM 호출 지연/토큰, Agent RPC 왕복 시간 히스토그램 (Prometheus 텍스트 포맷)."""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
 
 @app.get("/commands")
-def get_commands() -> List[Dict]:
-    """cloudwatch_messages 조회."""
-    return cloudwatch_messages
+def get_commands(instance_id: Optional[str] = None, alarm_name: Optional[str] = None,
+                 since: Optional[float] = None, until: Optional[float] = None,
+                 limit: int = Query(50, ge=1, le=500), offset: int = Query(0, ge=0)) -> List[Dict]:
+    """알람 워크플로우 결과를 최신순으로 페이지 조회.
+
+    Args:
+        instance_id: 인스턴스 ID 필터
+        alarm_name: 알람 이름 필터
+        since: 시작 시각 (epoch 초, 포함)
+        until: 종료 시각 (epoch 초, 미포함)
+        limit: 페이지 크기
+        offset: 건너뛸 개수
+    """
+    return list_alarm_results(instance_id, alarm_name, since, until, limit, offset)
 
 @app.post("/chat")
-def handle_chat(request:Dict):
-    """Streamlit 사용자 입력 처리."""
-    global last_question_bool
+async def handle_chat(request:Dict) -> Dict:
+    """Streamlit 사용자 입력 처리.
+
+    클라이언트는 새 입력(user_input)과 session_id만 전송하고, 대화 기록은 서버 세션에 누적된다.
+    커맨드 승인 요청 후 그래프는 execute 직전에서 중단되어 체크포인트에 저장되며,
+    같은 세션의 Y/N 응답은 저장된 상태에서 바로 재개/종료한다.
+
+    Returns:
+        {"session_id": 세션 ID (첫 요청 시 발급), "answer": 응답}
+    """
     logger.info(f"Received request: {request}")
     user_input = request.get("user_input")
-    chat_history = request.get("chat_history")
-    workflow = build_workflow()
-    initial_state = AgentState(
-        input_type="streamlit",
-        raw_input={"user_input": user_input},
-        command=None,
-        target=None,
-        approved=False,
-        execution_result=None,
-        final_answer=None,
-        chat_history=chat_history,
-        intent=None,
-        user_question=last_question_bool
-    )
-    result = workflow.invoke(initial_state)
-    if not last_question_bool and result["user_question"]:
-        last_question_bool = True
-    elif result["user_question"] and last_question_bool:
-        last_question_bool = False
+    session = sessions.get(request.get("session_id"))
+    answer = None
+    async with session.lock:
+        try:
+            async for event in chat_events(session, user_input):
+                if event["type"] == "answer":
+                    answer = event["content"]
+        except Exception as e:
+            answer = chat_error(e)
+        finally:
+            record_turn(session, user_input, answer)
+    return {"session_id": session.session_id, "answer": answer}
+
+@app.post("/chat/stream")
+async def handle_chat_stream(request: Dict) -> StreamingResponse:
+    """Streamlit 사용자 입력 처리 (SSE 스트리밍).
+
+    이벤트 (data는 JSON):
+        session: {"session_id"} - 첫 이벤트
+        status: {"node"} - 노드 완료
+        token: {"content"} - analyze가 생성 중인 마크다운 토큰
+        answer: {"content"} - 최종 응답 (세션 기록에 저장되는 값)
+        error: {"content"} - 처리 실패 (answer 대신 마지막 이벤트로 전송, 세션 기록에 저장되는 값)
+    """
+    logger.info(f"Received stream request: {request}")
+    user_input = request.get("user_input")
+    session = sessions.get(request.get("session_id"))
+
+    async def events():
+        yield sse_event("session", {"session_id": session.session_id})
+        async with session.lock:
+            answer = None
+            try:
+                async for event in chat_events(session, user_input):
+                    if event["type"] == "answer":
+                        answer = event["content"]
+                    yield sse_event(event["type"], {k: v for k, v in event.items() if k != "type"})
+            except Exception as e:
+                answer = chat_error(e)
+                yield sse_event("error", {"content": answer})
+            finally:
+                # 오류나 클라이언트 연결 종료 시에도 체크포인트까지 진행된 턴을 세션 기록에 남김
+                record_turn(session, user_input, answer)
 
-    return result["final_answer"]
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+def chat_error(error: Exception) -> str:
+    """채팅 처리 실패 응답 메시지."""
+    logger.error(f"Chat request failed: {str(error)}", exc_info=True)
+    detail = getattr(error, "detail", None) or str(error)
+    return f"요청 처리 중 오류가 발생했습니다: {detail}"
+
+def record_turn(session: Session, user_input: Optional[str], answer) -> None:
+    """턴을 세션 기록에 추가하고 오래된 턴 요약 예약 (응답 없이 끝난 턴은 중단으로 기록)."""
+    sessions.append_turn(session, user_input, answer if answer is not None else CHAT_INTERRUPTED)
+    schedule_fold(session)
+
+def sse_event(event: str, data: Dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+async def chat_events(session: Session, user_input: Optional[str]):
+    """
+    세션의 채팅 그래프 실행 이벤트 (승인 대기 중이면 Y/N 처리).
+
+    Yields:
+        {"type": "status", "node"} / {"type": "token", "content"} / 마지막에 {"type": "answer", "content"}
+    """
+    workflow = get_workflow(CHAT_WORKFLOW)
+    config = thread_config(session.session_id)
+
+    snapshot = await workflow.aget_state(config)
+    if "execute" in snapshot.next:
+        answer = (user_input or "").strip().upper()
+        if answer == "N":
+            # 대기 중인 execute 작업 제거
+            await workflow.aupdate_state(config, None, as_node=END)
+            yield {"type": "answer", "content": "사용자가 커맨드 실행을 거절하셨습니다. 추가적인 도움이 필요하신가요?"}
+            return
+        if answer != "Y":
+            # 승인 대기 상태 유지 후 다시 요청
+            yield {"type": "answer", "content": "잘못된 입력입니다. 'Y' 또는 'N'을 입력해주세요."}
+            return
+        # 저장된 상태에서 execute부터 재개
+        await workflow.aupdate_state(config, {"approved": True})
+        graph_input = None
+    else:
+        graph_input = AgentState(
+            input_type="streamlit",
+            raw_input={"user_input": user_input},
+            command=None,
+            target=None,
+            targets=None,
+            include_snapshot=None,
+            include_history=None,
+            approved=False,
+            execution_result=None,
+            compacted_result=None,
+            compaction=None,
+            final_answer=None,
+            chat_history=list(session.history),
+            history_summary=session.summary,
+            intent=None,
+            user_question=False
+        )
+
+    result = {}
+    with WORKFLOW_DURATION.time(workflow=CHAT_WORKFLOW):
+        async for mode, chunk in workflow.astream(graph_input, config, stream_mode=["custom", "updates", "values"]):
+            if mode == "custom":
+                yield chunk
+            elif mode == "updates":
+                for node in chunk:
+                    if not node.startswith("__"):  # __interrupt__ 제외
+                        yield {"type": "status", "node": node}
+            else:
+                result = chunk
+    yield {"type": "answer", "content": result.get("final_answer")}
 
 @app.post("/execute", response_model=List[ExecuteResponse])
-def handle_execute(request: Dict) -> List[ExecuteResponse]:
-    """Agent의 /execute API 호출로 커맨드 실행.
+async def handle_execute(request: Dict) -> List[ExecuteResponse]:
+    """Agent의 /execute API 호출로 커맨드 실행 (외부 호출용).
     
     Args:
-        request: 명령어와 에이전트 정보 포함
+        request: 명령어와 에이전트 정보 포함 (include_snapshot이 true면 메트릭 스냅샷,
+            history가 {since, until}이면 해당 구간 메트릭 이력도 함께 조회)
     Returns:
         실행 결과 리스트
     """
+    return await collect(request.get("command"), request.get("agent"), request.get("url"),
+                         bool(request.get("include_snapshot")), request.get("timeout"),
+                         request.get("history"))
 
-    commands = request.get("command")
-    target = request.get("agent")
-    url = request.get("url")
-    logger.info(f"commands: {commands}, target: {target}, url: {url}")
-    
-    if not commands:
-        logger.warning("No command provided in request")
-        return [ExecuteResponse(
-            command="",
-            stdout=None,
-            stderr="No command to execute",
-            returncode=1
-        )]
+@app.post("/execute/stream")
+async def handle_execute_stream(request: Dict) -> StreamingResponse:
+    """Agent의 /execute/stream API 중계 (커맨드 출력을 NDJSON으로 스트리밍)."""
+    async def events():
+        async for event in stream_on_agent(request.get("command"), request.get("agent"),
+                                           request.get("url"), request.get("max_bytes"),
+                                           request.get("timeout")):
+            yield json.dumps(event, ensure_ascii=False) + "\n"
 
-    try:
-        headers = {"Authorization": f"Bearer {API_TOKEN}"}
-        payload = ExecuteRequest(command=commands, agent=target)
-        logger.info(f"Sending request to {url}/execute with command: {commands}")
-        response = requests.post(f"{url}/execute", json=payload.dict(), headers=headers)
-        response.raise_for_status()
-
-        logger.info(f"Response: {response.json()}")
-        
-        # 응답이 List[ExecuteResponse]와 호환되는지 확인
-        results = response.json()
-        if not isinstance(results, list):
-            logger.error(f"Expected list response, got: {type(results)}")
-            return [ExecuteResponse(
-                command=" ".join(commands) if commands else "",
-                stdout=None,
-                stderr="Invalid response format from agent",
-                returncode=1
-            )]
-        
-        # Pydantic 모델로 변환
-        return [ExecuteResponse(**result) for result in results]
-    
-    except requests.RequestException as e:
-        logger.error(f"Request to agent failed: {str(e)}")
-        return [ExecuteResponse(
-            command=" ".join(commands) if commands else "",
-            stdout=None,
-            stderr=f"Request failed: {str(e)}",
-            returncode=1
-        )]
+    return StreamingResponse(events(), media_type="application/x-ndjson")
 
 @app.get("/test/inject_message")
-def inject_test_message():
+async def inject_test_message():
     """테스트 알람 주입."""
     test_alarm_data = {
         "AlarmName": "alt_cpu_high_alert",
@@ -157,4 +388,4 @@ def inject_test_message():
         }
     }
     alarm = Alarm(raw_data=test_alarm_data)
-    sqs_trigger(alarm)
\ No newline at end of file
+    return await sqs_trigger(alarm)
\ No newline at end of file
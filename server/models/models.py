@@ -7,9 +7,21 @@ class Alarm(BaseModel):
 class ExecuteRequest(BaseModel):
     command: Optional[List[str]]    # 실행할 커맨드
     agent: Optional[str] # 대상 인스턴스 ID, 기본값 환경 변수
+    timeout: Optional[int] = None  # 요청 전체 실행 제한 시간(초), 미지정 시 Agent 기본값
+    max_bytes: Optional[int] = None  # 스트리밍 실행 시 커맨드별 출력 최대 바이트
+    bypass_cache: bool = False  # True면 Agent 캐시 결과를 사용하지 않고 항상 실행
 
 class ExecuteResponse(BaseModel):
     command: str  # 실행된 명령어 (문자열)
     stdout: Optional[str]  # 표준 출력
     stderr: Optional[str]  # 표준 에러
-    returncode: int  # 종료 코드
\ No newline at end of file
+    returncode: int  # 종료 코드
+    parsed: Optional[Dict] = None  # 구조화된 결과 (Agent 메트릭 스냅샷)
+
+class AgentHeartbeat(BaseModel):
+    instance_id: str  # EC2 인스턴스 ID (Agent INSTANCE_ID)
+    port: int  # Agent 실행 포트
+    url: Optional[str] = None  # Agent 접속 URL, 미지정 시 서버가 요청 IP와 port로 구성
+    version: Optional[str] = None  # Agent 버전
+    group: Optional[str] = None  # 서버 그룹 (예: Auto Scaling 그룹, 역할)
+    load: Optional[Dict] = None  # 부하 정보 (load1/load5/load15, cpus)
@@ -1,58 +1,212 @@
-import boto3
 import json
+import threading
 import requests
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List
 from server.models.models import Alarm
-from config import AWS_ACCESS_KEY_ID, AWS_SECRET_ACCESS_KEY, AWS_REGION, AWS_SQS_QUEUE_URL, FASTAPI_HOST, FASTAPI_PORT
-
-# SQS 클라이언트 초기화
-sqs = boto3.client(
-    'sqs',
-    aws_access_key_id=AWS_ACCESS_KEY_ID,
-    aws_secret_access_key=AWS_SECRET_ACCESS_KEY,
-    region_name=AWS_REGION
+from server.config import (
+    AWS_ACCESS_KEY_ID,
+    AWS_SECRET_ACCESS_KEY,
+    AWS_REGION,
+    AWS_SQS_QUEUE_URL,
+    AWS_SQS_ENDPOINT_URL,
+    FASTAPI_HOST,
+    FASTAPI_PORT,
+    SQS_MAX_WORKERS,
+    SQS_MAX_IN_FLIGHT,
+    SQS_VISIBILITY_TIMEOUT,
+    SQS_FORWARD_TIMEOUT,
 )
 
 fastapi_url = f"http://{FASTAPI_HOST}:{FASTAPI_PORT}/sqs_trigger"
+# SQS 배치 API 최대 엔트리 수
+SQS_BATCH_SIZE = 10
+# FastAPI 연결 타임아웃(초)
+FORWARD_CONNECT_TIMEOUT = 5
 
-def poll_sqs():
-    while True:
+# FastAPI 전송용 keep-alive 세션
+_session = requests.Session()
+
+
+def create_sqs_client():
+    """SQS 클라이언트 생성 (AWS_SQS_ENDPOINT_URL 지정 시 로컬 SQS 호환 서버 사용)."""
+    # SQS를 사용하지 않는 서버 모드(poller)에서는 boto3가 없어도 import 가능하도록 지연 import
+    import boto3
+    return boto3.client(
+        'sqs',
+        aws_access_key_id=AWS_ACCESS_KEY_ID,
+        aws_secret_access_key=AWS_SECRET_ACCESS_KEY,
+        region_name=AWS_REGION,
+        endpoint_url=AWS_SQS_ENDPOINT_URL
+    )
+
+
+def parse_alarm(message: Dict) -> Alarm:
+    """SQS 메시지(SNS 래핑)에서 CloudWatch 알람 추출."""
+    # SNS 메시지 파싱
+    sns_message = json.loads(message['Body'])
+    # CloudWatch 알람 데이터 파싱 후 Alarm 모델로 래핑
+    return Alarm(raw_data=json.loads(sns_message['Message']))
+
+
+def delete_messages(sqs, queue_url: str, entries: List[Dict]) -> None:
+    """처리 완료 메시지를 delete_message_batch로 일괄 삭제 (entries: Id, ReceiptHandle)."""
+    for i in range(0, len(entries), SQS_BATCH_SIZE):
+        response = sqs.delete_message_batch(QueueUrl=queue_url, Entries=entries[i:i + SQS_BATCH_SIZE])
+        for failed in response.get('Failed', []):
+            print(f"Failed to delete message {failed.get('Id')}: {failed.get('Message')}")
+        if response.get('Successful'):
+            print(f"{len(response['Successful'])} messages deleted from queue.")
+
+
+def extend_visibility(sqs, queue_url: str, in_flight: Dict[str, str], visibility_timeout: int) -> None:
+    """처리 중인 메시지(MessageId -> ReceiptHandle)의 가시성 타임아웃 연장."""
+    entries = [
+        {'Id': message_id, 'ReceiptHandle': handle, 'VisibilityTimeout': visibility_timeout}
+        for message_id, handle in in_flight.items()
+    ]
+    for i in range(0, len(entries), SQS_BATCH_SIZE):
+        sqs.change_message_visibility_batch(QueueUrl=queue_url, Entries=entries[i:i + SQS_BATCH_SIZE])
+
+
+def forward_to_server(alarm: Alarm) -> bool:
+    """알람을 FastAPI /sqs_trigger로 전송, 성공 여부 반환 (타임아웃 시 삭제하지 않아 재수신됨)."""
+    response = _session.post(fastapi_url, json=alarm.dict(), timeout=(FORWARD_CONNECT_TIMEOUT, SQS_FORWARD_TIMEOUT))
+    if response.status_code == 200:
+        print("Sent alarm data to FastAPI")
+        return True
+    print(f"Failed to send to FastAPI: {response.text}")
+    return False
+
+
+class SQSConsumer:
+    """워커 풀 기반 SQS 컨슈머.
+
+    - 동시 처리 한도(max_in_flight)만큼만 수신하여 backpressure 적용
+    - 처리 완료 메시지는 delete_message_batch로 일괄 삭제
+    - 처리 중 메시지는 가시성 타임아웃을 주기적으로 연장
+    """
+
+    def __init__(self, sqs, queue_url: str, handler: Callable[[Alarm], bool] = forward_to_server,
+                 max_workers: int = SQS_MAX_WORKERS, max_in_flight: int = SQS_MAX_IN_FLIGHT,
+                 visibility_timeout: int = SQS_VISIBILITY_TIMEOUT, wait_time_seconds: int = 20):
+        self.sqs = sqs
+        self.queue_url = queue_url
+        self.handler = handler
+        self.visibility_timeout = visibility_timeout
+        self.wait_time_seconds = wait_time_seconds
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="sqs-worker")
+        self._slots = threading.Semaphore(max_in_flight)
+        self._lock = threading.Lock()
+        self._in_flight: Dict[str, str] = {}  # MessageId -> ReceiptHandle
+        self._acks: List[Dict] = []
+        self._stop = threading.Event()
+
+    def _acquire_slots(self) -> int:
+        """빈 처리 슬롯을 최대 배치 크기만큼 확보 (슬롯이 없으면 대기)."""
+        while not self._slots.acquire(timeout=1):
+            if self._stop.is_set():
+                return 0
+        slots = 1
+        while slots < SQS_BATCH_SIZE and self._slots.acquire(blocking=False):
+            slots += 1
+        return slots
+
+    def poll_once(self) -> int:
+        """빈 슬롯 수만큼 메시지를 수신하여 워커에 전달, 수신 개수 반환."""
+        slots = self._acquire_slots()
+        if not slots:
+            return 0
+        messages = []
         try:
-            response = sqs.receive_message(
-                QueueUrl=AWS_SQS_QUEUE_URL,
-                MaxNumberOfMessages=10,
-                WaitTimeSeconds=20
+            response = self.sqs.receive_message(
+                QueueUrl=self.queue_url,
+                MaxNumberOfMessages=slots,
+                WaitTimeSeconds=self.wait_time_seconds,
+                VisibilityTimeout=self.visibility_timeout
             )
             messages = response.get('Messages', [])
-            if not messages:
-                print("No messages received in this poll.")
-                continue
-            for message in messages:
-                try:
-                    # SNS 메시지 파싱
-                    sns_message = json.loads(message['Body'])
-                    # CloudWatch 알람 데이터 파싱
-                    alarm_data = json.loads(sns_message['Message'])
-                    # Alarm 모델로 래핑
-                    alarm = Alarm(raw_data=alarm_data)
-                    # FastAPI에 전송 (인증 제거)
-                    response = requests.post(fastapi_url, json=alarm.dict())
-                    if response.status_code == 200:
-                        print(f"Sent alarm data to FastAPI")
-                        sqs.delete_message(QueueUrl=AWS_SQS_QUEUE_URL, ReceiptHandle=message['ReceiptHandle'])
-                        print("Message deleted from queue.")
-                    else:
-                        print(f"Failed to send to FastAPI: {response.text}")
-                except json.JSONDecodeError as e:
-                    print(f"JSON parsing error: {e}")
-                except Exception as e:
-                    print(f"Error processing message: {e}")
+        finally:
+            for _ in range(slots - len(messages)):
+                self._slots.release()
+
+        if not messages:
+            print("No messages received in this poll.")
+        for message in messages:
+            with self._lock:
+                self._in_flight[message['MessageId']] = message['ReceiptHandle']
+            self._pool.submit(self._process, message)
+        self.flush_acks()
+        return len(messages)
+
+    def _process(self, message: Dict) -> None:
+        ok = False
+        try:
+            ok = self.handler(parse_alarm(message))
+        except json.JSONDecodeError as e:
+            print(f"JSON parsing error: {e}")
         except Exception as e:
-            print(f"Error polling SQS: {e}")
+            print(f"Error processing message: {e}")
+        finally:
+            with self._lock:
+                self._in_flight.pop(message['MessageId'], None)
+                if ok:
+                    self._acks.append({'Id': message['MessageId'], 'ReceiptHandle': message['ReceiptHandle']})
+                pending_acks = len(self._acks)
+            self._slots.release()
+        if pending_acks >= SQS_BATCH_SIZE:
+            self.flush_acks()
+
+    def flush_acks(self) -> None:
+        """처리 완료 메시지를 delete_message_batch로 일괄 삭제."""
+        with self._lock:
+            acks, self._acks = self._acks, []
+        delete_messages(self.sqs, self.queue_url, acks)
+
+    def extend_visibility(self) -> None:
+        """처리 중인 메시지의 가시성 타임아웃 연장."""
+        with self._lock:
+            in_flight = dict(self._in_flight)
+        extend_visibility(self.sqs, self.queue_url, in_flight, self.visibility_timeout)
+
+    def _heartbeat(self) -> None:
+        while not self._stop.wait(self.visibility_timeout / 2):
+            try:
+                self.extend_visibility()
+                self.flush_acks()
+            except Exception as e:
+                print(f"Error extending visibility: {e}")
+
+    def run(self) -> None:
+        """stop() 호출 전까지 폴링, 종료 시 처리 중 메시지 완료 후 삭제."""
+        heartbeat = threading.Thread(target=self._heartbeat, name="sqs-heartbeat", daemon=True)
+        heartbeat.start()
+        while not self._stop.is_set():
+            try:
+                self.poll_once()
+            except Exception as e:
+                print(f"Error polling SQS: {e}")
+                self._stop.wait(1)
+        self.drain()
+
+    def drain(self) -> None:
+        """처리 중 메시지 완료까지 대기 후 남은 삭제 요청 전송."""
+        self._pool.shutdown(wait=True)
+        self.flush_acks()
+
+    def stop(self) -> None:
+        self._stop.set()
+
 
 if __name__ == "__main__":
-    if not all([AWS_ACCESS_KEY_ID, AWS_SECRET_ACCESS_KEY, AWS_SQS_QUEUE_URL]):
+    if not AWS_SQS_QUEUE_URL or not (AWS_SQS_ENDPOINT_URL or all([AWS_ACCESS_KEY_ID, AWS_SECRET_ACCESS_KEY])):
         raise ValueError("Missing AWS credentials or SQS_QUEUE_URL in .env")
     print("Starting SQS poller...")
     print(f"Using SQS Queue URL: {AWS_SQS_QUEUE_URL}")
     print(f"Region: {AWS_REGION}")
-    poll_sqs()
\ No newline at end of file
+    consumer = SQSConsumer(create_sqs_client(), AWS_SQS_QUEUE_URL)
+    try:
+        consumer.run()
+    except KeyboardInterrupt:
+        consumer.stop()
+        consumer.drain()
@@ -0,0 +1,230 @@
+# server/utils/agent_client.py
+import asyncio
+import random
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional
+import httpx
+from server.config import (
+    API_TOKEN,
+    AGENT_CONNECT_TIMEOUT,
+    AGENT_EXECUTE_TIMEOUT,
+    AGENT_TIMEOUT_MARGIN,
+    AGENT_MAX_CONNECTIONS,
+    AGENT_MAX_KEEPALIVE,
+    AGENT_MAX_RETRIES,
+    AGENT_RETRY_BACKOFF,
+    AGENT_BREAKER_THRESHOLD,
+    AGENT_BREAKER_RESET,
+)
+from server.utils.logging import setup_logger
+from server.utils.telemetry import AGENT_RPC_DURATION
+
+logger = setup_logger(__name__)
+
+# 요청이 Agent에 도달하지 않았거나 Agent가 일시적으로 처리하지 못한 경우만 재시도
+# (읽기 타임아웃은 커맨드가 실행 중일 수 있으므로 재시도하지 않음)
+RETRYABLE_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+RETRYABLE_STATUS = {502, 503, 504}
+
+
+class CircuitOpenError(httpx.HTTPError):
+    """서킷이 열린 Agent로의 요청 (연결 시도 없이 즉시 실패)."""
+
+
+class CircuitBreaker:
+    """Agent별 서킷 브레이커.
+
+    연속 실패가 threshold에 도달하면 reset_timeout 동안 요청을 즉시 거절(open)하고,
+    이후 1건의 시험 요청(half-open)이 성공하면 다시 닫는다.
+    """
+
+    def __init__(self, threshold: int, reset_timeout: float):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._probe_at: Optional[float] = None
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        # 시험 요청이 결과 없이 끝난 경우(취소 등)를 대비해 reset_timeout 후 다시 허용
+        now = time.monotonic()
+        if state == "half_open" and (self._probe_at is None or now - self._probe_at >= self.reset_timeout):
+            self._probe_at = now
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self._probe_at = None
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._probe_at = None
+        if self.failures >= self.threshold or self.opened_at is not None:
+            self.opened_at = time.monotonic()
+
+
+def timeout_for(command_timeout: Optional[float] = None) -> httpx.Timeout:
+    """커맨드 제한 시간 기반 요청 타임아웃 (읽기 = 커맨드 제한 시간 + 여유분)."""
+    read = (command_timeout or AGENT_EXECUTE_TIMEOUT) + AGENT_TIMEOUT_MARGIN
+    return httpx.Timeout(read, connect=AGENT_CONNECT_TIMEOUT, pool=AGENT_CONNECT_TIMEOUT)
+
+
+class AgentClient:
+    """Agent별 keep-alive 커넥션 풀, 타임아웃, 지터 재시도, 서킷 브레이커를 갖춘 RPC 클라이언트."""
+
+    def __init__(self):
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self.stats = {"requests": 0, "retries": 0, "failures": 0, "rejected": 0}
+
+    def _client(self, url: str) -> httpx.AsyncClient:
+        client = self._clients.get(url)
+        if client is None:
+            client = httpx.AsyncClient(
+                base_url=url,
+                headers={"Authorization": f"Bearer {API_TOKEN}"},
+                limits=httpx.Limits(max_connections=AGENT_MAX_CONNECTIONS,
+                                    max_keepalive_connections=AGENT_MAX_KEEPALIVE)
+            )
+            self._clients[url] = client
+        return client
+
+    def breaker(self, url: str) -> CircuitBreaker:
+        breaker = self._breakers.get(url)
+        if breaker is None:
+            breaker = self._breakers[url] = CircuitBreaker(AGENT_BREAKER_THRESHOLD, AGENT_BREAKER_RESET)
+        return breaker
+
+    def _check(self, url: str) -> CircuitBreaker:
+        breaker = self.breaker(url)
+        if not breaker.allow():
+            self.stats["rejected"] += 1
+            raise CircuitOpenError(f"Circuit open for agent {url}")
+        return breaker
+
+    async def request(self, method: str, url: str, path: str, payload: Optional[Dict] = None,
+                      params: Optional[Dict] = None, command_timeout: Optional[float] = None) -> httpx.Response:
+        """
+        Agent API 호출 (연결 실패/5xx는 지터 포함 지수 백오프로 재시도).
+
+        Args:
+            method: HTTP 메서드
+            url: Agent 베이스 URL
+            path: API 경로 (예: /execute)
+            payload: JSON 본문
+            params: 쿼리 파라미터
+            command_timeout: 요청의 커맨드 제한 시간(초), 읽기 타임아웃 계산에 사용
+        Returns:
+            2xx 응답
+        Raises:
+            CircuitOpenError: 서킷이 열린 Agent
+            httpx.HTTPError: 재시도 후에도 실패
+        """
+        breaker = self._check(url)
+        timeout = timeout_for(command_timeout)
+        with AGENT_RPC_DURATION.time(path=path):
+            for attempt in range(AGENT_MAX_RETRIES + 1):
+                self.stats["requests"] += 1
+                try:
+                    response = await self._client(url).request(method, path, json=payload, params=params,
+                                                                timeout=timeout)
+                    if response.status_code in RETRYABLE_STATUS and attempt < AGENT_MAX_RETRIES:
+                        raise httpx.HTTPStatusError(f"{response.status_code} from agent",
+                                                    request=response.request, response=response)
+                    response.raise_for_status()
+                    breaker.record_success()
+                    return response
+                except (*RETRYABLE_ERRORS, httpx.HTTPStatusError) as e:
+                    retryable = isinstance(e, RETRYABLE_ERRORS) or e.response.status_code in RETRYABLE_STATUS
+                    if not retryable or attempt >= AGENT_MAX_RETRIES:
+                        self._fail(breaker, url, e)
+                        raise
+                    delay = AGENT_RETRY_BACKOFF * (2 ** attempt) * random.uniform(0.5, 1.5)
+                    logger.warning(f"Agent {url}{path} attempt {attempt + 1} failed ({str(e)}), retrying in {delay:.2f}s")
+                    self.stats["retries"] += 1
+                    await asyncio.sleep(delay)
+                except httpx.HTTPError as e:
+                    self._fail(breaker, url, e)
+                    raise
+
+    async def post(self, url: str, path: str, payload: Dict,
+                   command_timeout: Optional[float] = None) -> httpx.Response:
+        """Agent API POST 호출 (request 참조)."""
+        return await self.request("POST", url, path, payload, command_timeout=command_timeout)
+
+    async def get(self, url: str, path: str, params: Optional[Dict] = None,
+                  command_timeout: Optional[float] = None) -> httpx.Response:
+        """Agent API GET 호출 (request 참조)."""
+        return await self.request("GET", url, path, params=params, command_timeout=command_timeout)
+
+    @asynccontextmanager
+    async def stream(self, url: str, path: str, payload: Dict,
+                     command_timeout: Optional[float] = None) -> AsyncIterator[httpx.Response]:
+        """Agent 스트리밍 API 호출 (출력이 전달되기 시작하면 재시도하지 않음)."""
+        breaker = self._check(url)
+        self.stats["requests"] += 1
+        try:
+            with AGENT_RPC_DURATION.time(path=path):
+                async with self._client(url).stream("POST", path, json=payload,
+                                                    timeout=timeout_for(command_timeout)) as response:
+                    response.raise_for_status()
+                    yield response
+            breaker.record_success()
+        except httpx.HTTPError as e:
+            self._fail(breaker, url, e)
+            raise
+
+    def _fail(self, breaker: CircuitBreaker, url: str, error: Exception) -> None:
+        self.stats["failures"] += 1
+        # 4xx는 요청 문제이므로 Agent 상태로 집계하지 않음
+        if isinstance(error, httpx.HTTPStatusError) and error.response.status_code < 500:
+            return
+        breaker.record_failure()
+        if breaker.state == "open":
+            logger.error(f"Circuit opened for agent {url} after {breaker.failures} failures: {str(error)}")
+
+    def get_stats(self) -> Dict:
+        return {
+            **self.stats,
+            "agents": {
+                url: {"state": breaker.state, "failures": breaker.failures}
+                for url, breaker in self._breakers.items()
+            },
+        }
+
+    async def close(self) -> None:
+        clients, self._clients = self._clients, {}
+        await asyncio.gather(*(client.aclose() for client in clients.values()), return_exceptions=True)
+
+
+_agent_client: Optional[AgentClient] = None
+
+
+def get_agent_client() -> AgentClient:
+    """Agent RPC 공용 클라이언트를 반환."""
+    global _agent_client
+    if _agent_client is None:
+        _agent_client = AgentClient()
+    return _agent_client
+
+
+async def close_agent_client() -> None:
+    """Agent RPC 클라이언트 정리 (서버 종료 시 호출)."""
+    global _agent_client
+    client, _agent_client = _agent_client, None
+    if client is not None:
+        await client.close()
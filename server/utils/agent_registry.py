@@ -0,0 +1,69 @@
+# server/utils/agent_registry.py
+import threading
+import time
+from typing import Dict, List, Optional
+
+
+class AgentRegistry:
+    """Agent 자가 등록/하트비트 기반 레지스트리 (인스턴스 ID 해시 조회, TTL 만료).
+
+    하트비트가 ttl 이상 끊긴 Agent는 비정상으로 유지되어 디스패치가 즉시 실패하고,
+    ttl * EXPIRE_FACTOR가 지나면 목록에서 제거된다.
+    등록/하트비트 핸들러(스레드 풀)와 디스패치(이벤트 루프)가 함께 사용하므로 변경과 순회는 락으로 보호한다.
+    """
+
+    EXPIRE_FACTOR = 10
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._agents: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        self._pruned_at = time.time()
+        self.stats = {"registered": 0, "heartbeats": 0, "expired": 0}
+
+    def upsert(self, info: Dict, register: bool = False) -> Dict:
+        """등록 또는 하트비트 반영 (모르는 Agent의 하트비트는 등록으로 처리)."""
+        now = time.time()
+        with self._lock:
+            if now - self._pruned_at > self.ttl:
+                self._prune(now, self.ttl * self.EXPIRE_FACTOR)
+            entry = self._agents.get(info["instance_id"])
+            if entry is None or register:
+                entry = {"registered_at": now}
+                self._agents[info["instance_id"]] = entry
+                self.stats["registered"] += 1
+            else:
+                self.stats["heartbeats"] += 1
+            entry.update(info)
+            entry["last_seen"] = now
+            return entry
+
+    def is_healthy(self, entry: Dict, now: Optional[float] = None) -> bool:
+        return (now or time.time()) - entry["last_seen"] <= self.ttl
+
+    def get(self, instance_id: str) -> Optional[Dict]:
+        """등록된 Agent 조회 (비정상 여부와 무관, 미등록이면 None)."""
+        return self._agents.get(instance_id)
+
+    def healthy(self) -> List[Dict]:
+        now = time.time()
+        with self._lock:
+            return [entry for entry in self._agents.values() if self.is_healthy(entry, now)]
+
+    def prune(self, max_age: float) -> int:
+        """마지막 하트비트 후 max_age가 지난 Agent 제거."""
+        with self._lock:
+            return self._prune(time.time(), max_age)
+
+    def _prune(self, now: float, max_age: float) -> int:
+        self._pruned_at = now
+        expired = [iid for iid, entry in self._agents.items() if now - entry["last_seen"] > max_age]
+        for instance_id in expired:
+            del self._agents[instance_id]
+        self.stats["expired"] += len(expired)
+        return len(expired)
+
+    def snapshot(self) -> List[Dict]:
+        now = time.time()
+        with self._lock:
+            return [{**entry, "healthy": self.is_healthy(entry, now)} for entry in self._agents.values()]
@@ -0,0 +1,122 @@
+# server/utils/alarm_store.py
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS alarm_results (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at REAL NOT NULL,
+    instance_id TEXT,
+    alarm_name TEXT,
+    metric_name TEXT,
+    result TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_alarm_results_instance ON alarm_results (instance_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_alarm_results_alarm ON alarm_results (alarm_name, created_at);
+CREATE INDEX IF NOT EXISTS idx_alarm_results_created ON alarm_results (created_at);
+"""
+
+
+class AlarmStore:
+    """알람 워크플로우 결과 저장소 (최근 결과는 메모리, 전체는 SQLite)."""
+
+    def __init__(self, path: str, memory_size: int = 200):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+        self._memory_size = memory_size
+        self._recent: "OrderedDict[int, Dict]" = OrderedDict()
+
+    def _remember(self, record: Dict) -> None:
+        self._recent[record["id"]] = record
+        self._recent.move_to_end(record["id"])
+        while len(self._recent) > self._memory_size:
+            self._recent.popitem(last=False)
+
+    def _row_to_record(self, row) -> Dict:
+        record_id, created_at, result = row
+        cached = self._recent.get(record_id)
+        if cached is not None:
+            return cached
+        return {**json.loads(result), "id": record_id, "created_at": created_at}
+
+    def add(self, result: Dict, instance_id: Optional[str], alarm_name: Optional[str],
+            metric_name: Optional[str]) -> int:
+        """결과 저장 후 ID 반환."""
+        created_at = time.time()
+        payload = json.dumps(result, ensure_ascii=False, default=str)
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO alarm_results (created_at, instance_id, alarm_name, metric_name, result) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (created_at, instance_id, alarm_name, metric_name, payload)
+            )
+            self._conn.commit()
+            record_id = cursor.lastrowid
+            self._remember({**result, "id": record_id, "created_at": created_at})
+        return record_id
+
+    def update(self, record_id: int, fields: Dict) -> None:
+        """저장된 결과의 일부 필드 갱신 (예: 병합된 알람 발생 내역)."""
+        with self._lock:
+            record = self.get(record_id)
+            if record is None:
+                return
+            record = {**record, **fields}
+            result = {k: v for k, v in record.items() if k not in ("id", "created_at")}
+            self._conn.execute(
+                "UPDATE alarm_results SET result = ? WHERE id = ?",
+                (json.dumps(result, ensure_ascii=False, default=str), record_id)
+            )
+            self._conn.commit()
+            if record_id in self._recent:
+                self._recent[record_id] = record
+
+    def get(self, record_id: int) -> Optional[Dict]:
+        """ID로 결과 조회."""
+        cached = self._recent.get(record_id)
+        if cached is not None:
+            return cached
+        row = self._conn.execute(
+            "SELECT id, created_at, result FROM alarm_results WHERE id = ?", (record_id,)
+        ).fetchone()
+        return self._row_to_record(row) if row else None
+
+    def query(self, instance_id: Optional[str] = None, alarm_name: Optional[str] = None,
+              since: Optional[float] = None, until: Optional[float] = None,
+              limit: int = 50, offset: int = 0) -> List[Dict]:
+        """필터 조건에 맞는 결과를 최신순으로 페이지 조회."""
+        clauses, params = [], []
+        if instance_id is not None:
+            clauses.append("instance_id = ?")
+            params.append(instance_id)
+        if alarm_name is not None:
+            clauses.append("alarm_name = ?")
+            params.append(alarm_name)
+        if since is not None:
+            clauses.append("created_at >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("created_at < ?")
+            params.append(until)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT id, created_at, result FROM alarm_results {where} "
+                "ORDER BY created_at DESC, id DESC LIMIT ? OFFSET ?",
+                (*params, limit, offset)
+            ).fetchall()
+            return [self._row_to_record(row) for row in rows]
+
+    def latest(self, instance_id: Optional[str] = None) -> Optional[Dict]:
+        """가장 최근 결과 조회 (instance_id 지정 시 해당 인스턴스 기준, 인덱스 조회)."""
+        results = self.query(instance_id=instance_id, limit=1)
+        return results[0] if results else None
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,83 @@
+# server/utils/coalesce.py
+import time
+from typing import Dict, Optional, Tuple
+from server.utils.logging import setup_logger
+
+logger = setup_logger(__name__)
+
+AlarmKey = Tuple[Optional[str], Optional[str], Optional[str]]
+
+
+def alarm_key(raw_data: Dict) -> AlarmKey:
+    """CloudWatch 알람 데이터에서 (인스턴스 ID, 메트릭 이름, 알람 이름) 키 추출."""
+    trigger = raw_data.get("Trigger") or {}
+    instance_id = next(
+        (d.get("value") for d in trigger.get("Dimensions") or [] if d.get("name") == "InstanceId"),
+        None
+    )
+    return instance_id, trigger.get("MetricName"), raw_data.get("AlarmName")
+
+
+def occurrence(raw_data: Dict) -> Dict:
+    """병합된 알람 발생 1건의 요약."""
+    return {
+        "received_at": time.time(),
+        "state_change_time": raw_data.get("StateChangeTime"),
+        "new_state_value": raw_data.get("NewStateValue"),
+        "new_state_reason": raw_data.get("NewStateReason"),
+    }
+
+
+class AlarmCoalescer:
+    """윈도우 내 동일 키 알람을 진행 중이거나 가장 최근 조사에 병합."""
+
+    def __init__(self, window: float):
+        self.window = window
+        self._entries: Dict[AlarmKey, Dict] = {}
+        self.stats = {"investigations": 0, "coalesced": 0}
+
+    def _prune(self, now: float) -> None:
+        expired = [
+            key for key, entry in self._entries.items()
+            if not entry["in_flight"] and now - entry["started_at"] > self.window
+        ]
+        for key in expired:
+            del self._entries[key]
+
+    def claim(self, raw_data: Dict) -> Tuple[bool, Dict]:
+        """
+        알람을 등록하고 새 조사를 시작해야 하는지 판단.
+
+        Args:
+            raw_data: CloudWatch 알람 데이터
+        Returns:
+            (새 조사 여부, 조사 엔트리). 병합된 경우 엔트리의 occurrences에 발생 내역이 추가됨
+        """
+        now = time.time()
+        self._prune(now)
+        key = alarm_key(raw_data)
+        entry = self._entries.get(key)
+        if entry is not None:
+            entry["occurrences"].append(occurrence(raw_data))
+            self.stats["coalesced"] += 1
+            logger.info(f"Alarm {key} coalesced into investigation started at {entry['started_at']}")
+            return False, entry
+
+        entry = {
+            "key": key,
+            "started_at": now,
+            "in_flight": True,
+            "occurrences": [occurrence(raw_data)],
+            "result": None,
+        }
+        self._entries[key] = entry
+        self.stats["investigations"] += 1
+        return True, entry
+
+    def finish(self, entry: Dict, result: Optional[Dict]) -> None:
+        """조사 완료 처리 (윈도우가 끝날 때까지 이후 중복은 이 결과에 병합)."""
+        entry["in_flight"] = False
+        entry["result"] = result
+        if result is None:
+            # 조사 실패 시 다음 알람이 새 조사를 시작하도록 제거
+            self._entries.pop(entry["key"], None)
@@ -0,0 +1,151 @@
+# server/utils/compaction.py
+from typing import Dict, List, Tuple
+from server.utils.tokens import estimate_tokens, truncate_tokens
+
+# 분석 가치가 낮아 제거 가능한 표 컬럼 (ps aux 등)
+PRUNABLE_COLUMNS = {"VSZ", "RSS", "TTY", "STAT", "START", "TIME"}
+# 압축 대상 필드
+TEXT_FIELDS = ("stdout", "stderr")
+# head/tail 절단 시 head에 배정하는 예산 비율
+HEAD_RATIO = 0.6
+TRUNCATED_MARK = " ...[truncated]"
+
+
+def collapse_duplicates(lines: List[str]) -> Tuple[List[str], int]:
+    """연속으로 반복되는 동일 라인을 1줄로 접음. (결과 라인, 제거된 라인 수) 반환."""
+    collapsed: List[str] = []
+    removed = 0
+    i = 0
+    while i < len(lines):
+        j = i
+        while j + 1 < len(lines) and lines[j + 1] == lines[i]:
+            j += 1
+        repeat = j - i + 1
+        collapsed.append(f"{lines[i]}  [x{repeat}]" if repeat > 1 else lines[i])
+        removed += repeat - 1
+        i = j + 1
+    return collapsed, removed
+
+
+def prune_columns(lines: List[str]) -> Tuple[List[str], List[str]]:
+    """헤더가 있는 표 형식 출력에서 PRUNABLE_COLUMNS 컬럼을 제거. (결과 라인, 제거된 컬럼) 반환."""
+    for header_index, line in enumerate(lines[:3]):
+        header = line.split()
+        pruned = [name for name in header if name in PRUNABLE_COLUMNS]
+        if len(header) >= 3 and pruned:
+            break
+    else:
+        return lines, []
+
+    width = len(header)
+    keep = [i for i, name in enumerate(header) if name not in PRUNABLE_COLUMNS]
+    rows = lines[header_index + 1:]
+    # 마지막 컬럼(COMMAND 등)은 공백을 포함할 수 있으므로 width-1번만 분리
+    split_rows = [row.split(None, width - 1) for row in rows if row.strip()]
+    if any(len(fields) != width for fields in split_rows):
+        return lines, []
+
+    result = lines[:header_index]
+    result.append(" ".join(header[i] for i in keep))
+    result.extend(" ".join(fields[i] for i in keep) for fields in split_rows)
+    return result, pruned
+
+
+def head_tail(lines: List[str], max_tokens: int) -> Tuple[List[str], int]:
+    """토큰 예산 내에서 앞/뒤 라인만 남기고 가운데를 생략. (결과 라인, 생략된 라인 수) 반환."""
+    if max_tokens <= 0:
+        return [f"... [{len(lines)} lines omitted] ..."], len(lines)
+    if estimate_tokens("\n".join(lines)) <= max_tokens:
+        return lines, 0
+
+    # 생략 표시 라인도 예산에 포함
+    marker_cost = estimate_tokens(f"... [{len(lines)} lines omitted] ...") + 1
+    head: List[str] = []
+    used = marker_cost
+    head_budget = marker_cost + int((max_tokens - marker_cost) * HEAD_RATIO)
+    for line in lines:
+        cost = estimate_tokens(line) + 1
+        if used + cost > head_budget:
+            break
+        head.append(line)
+        used += cost
+
+    if not head and lines:
+        # 한 줄이 예산보다 큰 경우 토큰 예산 기준으로 절단
+        budget = max(max_tokens - estimate_tokens(TRUNCATED_MARK), 0)
+        return [truncate_tokens(lines[0], budget) + TRUNCATED_MARK], len(lines) - 1
+
+    tail: List[str] = []
+    for line in reversed(lines[len(head):]):
+        cost = estimate_tokens(line) + 1
+        if used + cost > max_tokens:
+            break
+        tail.insert(0, line)
+        used += cost
+
+    omitted = len(lines) - len(head) - len(tail)
+    if omitted <= 0:
+        return lines, 0
+    return head + [f"... [{omitted} lines omitted] ..."] + tail, omitted
+
+
+def compact_results(results: List[Dict], budget: int) -> Tuple[List[Dict], Dict]:
+    """
+    실행 결과의 stdout/stderr를 토큰 예산에 맞게 압축.
+
+    중복 라인 접기와 표 컬럼 제거를 먼저 적용하고, 그래도 예산을 넘으면
+    필드별로 예산을 균등 배분(작은 출력의 남는 몫은 큰 출력에 재배분)하여 head/tail 절단.
+
+    Args:
+        results: execute 노드의 실행 결과 리스트
+        budget: 전체 출력 토큰 예산
+    Returns:
+        (압축된 실행 결과, 제거 내역 리포트)
+    """
+    compacted = [dict(result) for result in results]
+    items = []
+    for index, result in enumerate(compacted):
+        for field in TEXT_FIELDS:
+            text = result.get(field)
+            if not text:
+                continue
+            lines, collapsed = collapse_duplicates(text.splitlines())
+            lines, pruned = prune_columns(lines)
+            items.append({
+                "index": index,
+                "field": field,
+                "lines": lines,
+                "tokens": estimate_tokens("\n".join(lines)),
+                "report": {
+                    "command": result.get("command"),
+                    "field": field,
+                    "original_tokens": estimate_tokens(text),
+                    "collapsed_lines": collapsed,
+                    "pruned_columns": pruned,
+                    "omitted_lines": 0,
+                },
+            })
+
+    # 작은 항목부터 균등 배분 (water-filling)
+    remaining_budget = budget
+    for position, item in enumerate(sorted(items, key=lambda x: x["tokens"])):
+        share = remaining_budget // (len(items) - position)
+        if item["tokens"] > share:
+            item["lines"], item["report"]["omitted_lines"] = head_tail(item["lines"], share)
+            item["tokens"] = estimate_tokens("\n".join(item["lines"]))
+        remaining_budget -= min(item["tokens"], remaining_budget)
+
+    dropped = []
+    for item in items:
+        compacted[item["index"]][item["field"]] = "\n".join(item["lines"])
+        report = item["report"]
+        report["final_tokens"] = item["tokens"]
+        if report["collapsed_lines"] or report["pruned_columns"] or report["omitted_lines"]:
+            dropped.append(report)
+
+    return compacted, {
+        "budget": budget,
+        "original_tokens": sum(item["report"]["original_tokens"] for item in items),
+        "final_tokens": sum(item["tokens"] for item in items),
+        "dropped": dropped,
+    }
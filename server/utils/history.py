@@ -0,0 +1,136 @@
+# server/utils/history.py
+import asyncio
+import json
+from typing import Any, Dict, List, Optional, Set
+from server.config import (
+    HISTORY_RECENT_TURNS,
+    HISTORY_TURN_MAX_TOKENS,
+    HISTORY_SUMMARY_MAX_TOKENS,
+    HISTORY_TOKEN_BUDGETS,
+)
+from server.utils.compaction import head_tail
+from server.utils.llm import get_async_llm
+from server.utils.logging import setup_logger
+from server.utils.session_store import Session
+from server.utils.telemetry import LLM_DURATION, record_llm_usage
+from server.utils.tokens import estimate_tokens, estimate_json_tokens
+
+logger = setup_logger(__name__)
+
+SUMMARY_MODEL = "gpt-4o-mini"
+
+
+def _content(message: Any) -> str:
+    content = (message or {}).get("content", "") if isinstance(message, dict) else message
+    return content if isinstance(content, str) else json.dumps(content, ensure_ascii=False)
+
+
+def clip_turn(turn: Dict, max_tokens: int) -> Dict:
+    """턴의 사용자/응답 내용을 토큰 예산 내로 절단 (긴 마크다운 보고서는 앞/뒤만 유지)."""
+    user = _content(turn.get("user"))
+    assistant = _content(turn.get("assistant"))
+    assistant_budget = max(max_tokens - estimate_tokens(user), 0)
+    if estimate_tokens(assistant) > assistant_budget:
+        lines, _ = head_tail(assistant.splitlines(), assistant_budget)
+        assistant = "\n".join(lines)
+    return {"user": user, "assistant": assistant}
+
+
+class HistorySummarizer:
+    """오래된 턴을 롤링 요약으로 접음 (이전 요약 + 새 턴 -> 새 요약, 대화 전체를 다시 요약하지 않음)."""
+
+    def __init__(self):
+        self.stats = {"folds": 0, "folded_turns": 0, "failed": 0}
+
+    async def fold(self, previous: Optional[str], turns: List[Dict]) -> str:
+        """이전 요약에 새 턴을 접어 넣은 요약 (실패 시 예외)."""
+        try:
+            summary = await self._fold(previous, turns)
+        except Exception:
+            self.stats["failed"] += 1
+            raise
+        self.stats["folds"] += 1
+        self.stats["folded_turns"] += len(turns)
+        return summary
+
+    async def _fold(self, previous: Optional[str], turns: List[Dict]) -> str:
+        clipped = [clip_turn(turn, HISTORY_TURN_MAX_TOKENS) for turn in turns]
+        prompt = f"""
+        이전 대화 요약과 새 대화 턴을 합쳐 하나의 요약으로 갱신하세요:
+
+        [이전 요약]
+        {previous or "없음"}
+
+        [새 대화 턴]
+        {json.dumps(clipped, ensure_ascii=False)}
+
+        [지침]
+        - 인스턴스 ID, 실행/제안된 커맨드, 승인 여부, 진단 결과의 핵심 수치와 결론을 유지.
+        - 마크다운 표, 코드 블록, 원본 출력은 포함하지 말 것.
+        - {HISTORY_SUMMARY_MAX_TOKENS} 토큰 이내의 평문으로 반환.
+        """
+        with LLM_DURATION.time(call="history_summary", model=SUMMARY_MODEL):
+            response = await get_async_llm().chat.completions.create(
+                model=SUMMARY_MODEL,
+                messages=[{"role": "user", "content": prompt}],
+                max_tokens=HISTORY_SUMMARY_MAX_TOKENS
+            )
+        record_llm_usage("history_summary", SUMMARY_MODEL, response.usage)
+        return response.choices[0].message.content.strip()
+
+
+summarizer = HistorySummarizer()
+# 실행 중인 요약 작업 (태스크 GC 방지)
+_pending_folds: Set[asyncio.Task] = set()
+
+
+async def fold_session(session: Session) -> None:
+    """최근 HISTORY_RECENT_TURNS 이전 턴을 세션의 롤링 요약에 접고 대화 기록에서 제거 (세션 락 내에서 실행).
+
+    요약에 실패하면 턴을 기록에 남겨 두고 다음 턴에서 다시 시도한다.
+    """
+    async with session.lock:
+        excess = len(session.history) - HISTORY_RECENT_TURNS
+        if excess <= 0:
+            return
+        try:
+            session.summary = await summarizer.fold(session.summary, session.history[:excess])
+        except Exception as e:
+            logger.error(f"History summarization failed: {str(e)}")
+            return
+        del session.history[:excess]
+
+
+def schedule_fold(session: Session) -> None:
+    """응답 후 백그라운드에서 fold_session 실행 (같은 세션의 다음 요청은 세션 락에서 완료를 기다림)."""
+    task = asyncio.create_task(fold_session(session))
+    _pending_folds.add(task)
+    task.add_done_callback(_pending_folds.discard)
+
+
+def build_history(chat_history: List[Dict], node: str, summary: Optional[str] = None) -> Dict:
+    """
+    노드 프롬프트용 대화 기록 구성.
+
+    Args:
+        chat_history: 세션의 요약되지 않은 최근 대화 기록
+        node: 토큰 예산을 적용할 노드 이름 (HISTORY_TOKEN_BUDGETS)
+        summary: 세션의 이전 턴 롤링 요약
+    Returns:
+        {"summary": 이전 턴 요약 또는 None, "recent_turns": 최근 턴 (예산 내로 절단)}
+    """
+    if not chat_history and not summary:
+        return {"summary": None, "recent_turns": []}
+
+    budget = HISTORY_TOKEN_BUDGETS.get(node, HISTORY_TURN_MAX_TOKENS)
+    if summary and estimate_tokens(summary) > budget // 2:
+        lines, _ = head_tail(summary.splitlines(), budget // 2)
+        summary = "\n".join(lines)
+
+    # 요약이 아직 반영되지 않은(또는 실패한) 오래된 턴은 제외
+    recent = chat_history[-HISTORY_RECENT_TURNS:] if HISTORY_RECENT_TURNS > 0 else []
+    per_turn = (budget - estimate_tokens(summary or "")) // max(len(recent), 1)
+    recent_turns = [clip_turn(turn, min(per_turn, HISTORY_TURN_MAX_TOKENS)) for turn in recent]
+    history = {"summary": summary, "recent_turns": recent_turns}
+    logger.debug(f"History for {node}: {len(chat_history)} turns -> {estimate_json_tokens(history)} tokens")
+    return history
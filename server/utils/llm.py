@@ -1,19 +1,102 @@
 # server/utils/llm.py
-from openai import OpenAI
-from server.config import OPENAI_API_KEY
+import threading
+from typing import Optional
+import httpx
+from openai import OpenAI, AsyncOpenAI
+from server.config import (
+    OPENAI_API_KEY,
+    LLM_TIMEOUT,
+    LLM_CONNECT_TIMEOUT,
+    LLM_MAX_CONNECTIONS,
+    LLM_MAX_KEEPALIVE,
+    LLM_KEEPALIVE_EXPIRY,
+    LLM_MAX_RETRIES,
+)
 
-def get_llm() -> OpenAI:
-    """OpenAI LLM 클라이언트를 반환."""
-    api_key = OPENAI_API_KEY
+_lock = threading.Lock()
+_client: Optional[OpenAI] = None
+_async_client: Optional[AsyncOpenAI] = None
 
-    if not api_key:
+
+def _limits() -> httpx.Limits:
+    """keep-alive 커넥션 풀 한도."""
+    return httpx.Limits(
+        max_connections=LLM_MAX_CONNECTIONS,
+        max_keepalive_connections=LLM_MAX_KEEPALIVE,
+        keepalive_expiry=LLM_KEEPALIVE_EXPIRY
+    )
+
+
+def _timeout() -> httpx.Timeout:
+    """기본 요청 타임아웃 (연결 타임아웃은 별도로 짧게)."""
+    return httpx.Timeout(LLM_TIMEOUT, connect=LLM_CONNECT_TIMEOUT)
+
+
+def _api_key() -> str:
+    if not OPENAI_API_KEY:
         raise ValueError("OPENAI_API_KEY가 설정되지 않았습니다. 환경 변수를 확인하세요.")
+    return OPENAI_API_KEY
+
+
+def get_llm(timeout: Optional[float] = None) -> OpenAI:
+    """프로세스 공용 OpenAI 동기 클라이언트를 반환 (커넥션 풀 공유).
+
+    Args:
+        timeout: 호출별 타임아웃(초). 지정 시 같은 커넥션 풀을 공유하는 복사본 반환
+    """
+    global _client
+    if _client is None:
+        with _lock:
+            if _client is None:
+                try:
+                    _client = OpenAI(
+                        api_key=_api_key(),
+                        timeout=_timeout(),
+                        max_retries=LLM_MAX_RETRIES,
+                        http_client=httpx.Client(limits=_limits(), timeout=_timeout())
+                    )
+                except ValueError:
+                    raise
+                except Exception as e:
+                    raise RuntimeError(f"OpenAI 클라이언트 초기화 실패: {str(e)}")
+    if timeout is not None:
+        return _client.with_options(timeout=timeout)
+    return _client
+
+
+def get_async_llm(timeout: Optional[float] = None) -> AsyncOpenAI:
+    """프로세스 공용 OpenAI 비동기 클라이언트를 반환 (커넥션 풀 공유).
+
+    Args:
+        timeout: 호출별 타임아웃(초). 지정 시 같은 커넥션 풀을 공유하는 복사본 반환
+    """
+    global _async_client
+    if _async_client is None:
+        with _lock:
+            if _async_client is None:
+                try:
+                    _async_client = AsyncOpenAI(
+                        api_key=_api_key(),
+                        timeout=_timeout(),
+                        max_retries=LLM_MAX_RETRIES,
+                        http_client=httpx.AsyncClient(limits=_limits(), timeout=_timeout())
+                    )
+                except ValueError:
+                    raise
+                except Exception as e:
+                    raise RuntimeError(f"OpenAI 비동기 클라이언트 초기화 실패: {str(e)}")
+    if timeout is not None:
+        return _async_client.with_options(timeout=timeout)
+    return _async_client
+
 
-    try:
-        client = OpenAI(
-            api_key=api_key,
-            timeout=30.0  # 요청 타임아웃 30초
-        )
-        return client
-    except Exception as e:
-        raise RuntimeError(f"OpenAI 클라이언트 초기화 실패: {str(e)}")
\ No newline at end of file
+async def close_llm() -> None:
+    """공용 클라이언트의 커넥션 풀 정리 (서버 종료 시 호출)."""
+    global _client, _async_client
+    with _lock:
+        client, async_client = _client, _async_client
+        _client, _async_client = None, None
+    if client is not None:
+        client.close()
+    if async_client is not None:
+        await async_client.close()
@@ -0,0 +1,157 @@
+# server/utils/llm_cache.py
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Protocol
+from server.config import LLM_CACHE_ENABLED, LLM_CACHE_SIZE, LLM_CACHE_TTL, LLM_CACHE_DB_PATH
+
+# 알람마다 달라지는 시각 필드 (fingerprint에서 제외)
+VOLATILE_KEYS = {"StateChangeTime", "AlarmConfigurationUpdatedTimestamp", "Timestamp"}
+# 데이터포인트 값이 들어가는 CloudWatch 필드 (시각/수치만 치환)
+DATAPOINT_KEYS = {"NewStateReason", "Threshold"}
+
+_DATAPOINT_PATTERNS = [
+    (re.compile(r"\d{4}-\d{2}-\d{2}[T ][\d:.]+(?:[+-]\d{4}|Z)?"), "<ts>"),  # ISO 타임스탬프
+    (re.compile(r"\d{1,2}/\d{1,2}/\d{2,4}(?: [\d:]+)?"), "<date>"),         # 14/05/25 01:55:00
+    (re.compile(r"\b\d{1,2}:\d{2}:\d{2}\b"), "<time>"),
+    (re.compile(r"\b\d+\.\d+\b"), "<num>"),                                  # 데이터포인트 값
+]
+
+
+def normalize_datapoint(value: Any) -> Any:
+    """데이터포인트 필드 값의 타임스탬프/소수 값을 치환 (수치 값은 <num>)."""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return "<num>"
+    if isinstance(value, str):
+        for pattern, placeholder in _DATAPOINT_PATTERNS:
+            value = pattern.sub(placeholder, value)
+    return value
+
+
+def strip_volatile(data: Any) -> Any:
+    """VOLATILE_KEYS 필드를 재귀적으로 제거하고 DATAPOINT_KEYS 필드 값을 정규화."""
+    if isinstance(data, dict):
+        return {
+            k: normalize_datapoint(v) if k in DATAPOINT_KEYS else strip_volatile(v)
+            for k, v in data.items() if k not in VOLATILE_KEYS
+        }
+    if isinstance(data, list):
+        return [strip_volatile(v) for v in data]
+    return data
+
+
+def fingerprint(namespace: str, model: str, value: Any) -> str:
+    """노드/모델/입력 기반 캐시 키 (채팅 입력은 원문 그대로, 알람 데이터는 시각/데이터포인트 값 제외)."""
+    text = value if isinstance(value, str) else json.dumps(strip_volatile(value), ensure_ascii=False, sort_keys=True)
+    digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+    return f"{namespace}:{model}:{digest}"
+
+
+class CacheBackend(Protocol):
+    def get(self, key: str) -> Optional[str]: ...
+    def set(self, key: str, value: str, ttl: float) -> None: ...
+
+
+class MemoryBackend:
+    """크기 제한 LRU + TTL 메모리 캐시."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: str, value: str, ttl: float) -> None:
+        with self._lock:
+            self._entries[key] = (time.time() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class SQLiteBackend:
+    """프로세스 재시작 후에도 유지되는 디스크 캐시 계층."""
+
+    def __init__(self, path: str):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM llm_cache WHERE key = ? AND expires_at >= ?", (key, time.time())
+            ).fetchone()
+        return row[0] if row else None
+
+    def set(self, key: str, value: str, ttl: float) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, value, time.time() + ttl)
+            )
+            self._conn.execute("DELETE FROM llm_cache WHERE expires_at < ?", (time.time(),))
+            self._conn.commit()
+
+
+class LLMResponseCache:
+    """메모리 계층 + 선택적 디스크 계층 LLM 응답 캐시 (네임스페이스별 적중 통계)."""
+
+    def __init__(self, memory: CacheBackend, disk: Optional[CacheBackend] = None,
+                 ttl: float = LLM_CACHE_TTL, enabled: bool = True):
+        self.memory = memory
+        self.disk = disk
+        self.ttl = ttl
+        self.enabled = enabled
+        self.stats: Dict[str, Dict[str, int]] = {}
+
+    def _count(self, key: str, field: str) -> None:
+        namespace = key.split(":", 1)[0]
+        counters = self.stats.setdefault(namespace, {"memory_hits": 0, "disk_hits": 0, "misses": 0})
+        counters[field] += 1
+
+    def get(self, key: str) -> Optional[str]:
+        if not self.enabled:
+            return None
+        value = self.memory.get(key)
+        if value is not None:
+            self._count(key, "memory_hits")
+            return value
+        if self.disk is not None:
+            value = self.disk.get(key)
+            if value is not None:
+                self.memory.set(key, value, self.ttl)
+                self._count(key, "disk_hits")
+                return value
+        self._count(key, "misses")
+        return None
+
+    def set(self, key: str, value: str) -> None:
+        if not self.enabled:
+            return
+        self.memory.set(key, value, self.ttl)
+        if self.disk is not None:
+            self.disk.set(key, value, self.ttl)
+
+
+llm_cache = LLMResponseCache(
+    MemoryBackend(LLM_CACHE_SIZE),
+    SQLiteBackend(LLM_CACHE_DB_PATH) if LLM_CACHE_DB_PATH else None,
+    enabled=LLM_CACHE_ENABLED
+)
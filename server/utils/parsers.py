@@ -0,0 +1,273 @@
+# server/utils/parsers.py
+import re
+from typing import Callable, Dict, List, Optional, TypedDict
+
+# 프로세스 목록에서 유지할 상위 개수
+TOP_N = 10
+# df 결과에서 제외할 가상 파일시스템
+VIRTUAL_FILESYSTEMS = ("tmpfs", "devtmpfs", "efivarfs", "overlay", "squashfs")
+
+
+class ProcessRecord(TypedDict):
+    pid: int
+    user: str
+    cpu: float  # %CPU
+    mem: float  # %MEM
+    command: str
+
+
+class CpuInterval(TypedDict):
+    time: str
+    user: float
+    nice: float
+    system: float
+    iowait: float
+    steal: float
+    idle: float
+
+
+def _num(value: str) -> Optional[float]:
+    """숫자 문자열을 float로 변환 (로케일 소수점 ',' 허용), 실패 시 None."""
+    try:
+        return float(value.replace(",", "."))
+    except (ValueError, AttributeError):
+        return None
+
+
+def _top_processes(processes: List[ProcessRecord]) -> List[ProcessRecord]:
+    return sorted(processes, key=lambda p: (p["cpu"], p["mem"]), reverse=True)[:TOP_N]
+
+
+def parse_ps(stdout: str) -> Optional[Dict]:
+    """ps aux 출력 → CPU 상위 프로세스."""
+    lines = [line for line in stdout.splitlines() if line.strip()]
+    if not lines:
+        return None
+    header = lines[0].split()
+    if not {"PID", "%CPU", "%MEM", "USER"}.issubset(header):
+        return None
+    width = len(header)
+    pid_i, cpu_i, mem_i, user_i = (header.index(c) for c in ("PID", "%CPU", "%MEM", "USER"))
+
+    processes: List[ProcessRecord] = []
+    for line in lines[1:]:
+        fields = line.split(None, width - 1)
+        if len(fields) != width:
+            continue
+        cpu, mem = _num(fields[cpu_i]), _num(fields[mem_i])
+        if cpu is None or mem is None or not fields[pid_i].isdigit():
+            continue
+        processes.append(ProcessRecord(
+            pid=int(fields[pid_i]), user=fields[user_i], cpu=cpu, mem=mem, command=fields[-1][:120]
+        ))
+    if not processes:
+        return None
+    return {"type": "processes", "total": len(processes), "processes": _top_processes(processes)}
+
+
+_SAR_FIELDS = {"%user": "user", "%usr": "user", "%nice": "nice", "%system": "system", "%sys": "system",
+               "%iowait": "iowait", "%steal": "steal", "%idle": "idle"}
+
+
+def parse_sar(stdout: str) -> Optional[Dict]:
+    """sar -u 출력 → 구간별 CPU 사용률과 평균."""
+    columns: Optional[List[str]] = None
+    intervals: List[CpuInterval] = []
+    average: Optional[Dict] = None
+    for line in stdout.splitlines():
+        fields = line.split()
+        if not fields:
+            continue
+        if "CPU" in fields and any(f in _SAR_FIELDS for f in fields):
+            columns = fields
+            continue
+        if columns is None or "all" not in fields:
+            continue
+        # 12시간 표기(AM/PM) 등으로 앞쪽 컬럼 수가 달라지므로 뒤에서부터 정렬
+        offset = len(fields) - len(columns)
+        record = {"time": " ".join(fields[:fields.index("all")])}
+        for i, name in enumerate(columns):
+            key = _SAR_FIELDS.get(name)
+            if key and 0 <= i + offset < len(fields):
+                record[key] = _num(fields[i + offset])
+        if fields[0].rstrip(":").lower() in ("average", "평균"):
+            record.pop("time")
+            average = record
+        else:
+            intervals.append(record)
+    if not intervals and average is None:
+        return None
+    return {"type": "cpu_intervals", "intervals": intervals, "average": average}
+
+
+def parse_df(stdout: str) -> Optional[Dict]:
+    """df -h 출력 → 파일시스템별 사용량 (가상 파일시스템 제외)."""
+    lines = stdout.splitlines()
+    if not lines or not lines[0].startswith("Filesystem"):
+        return None
+    filesystems = []
+    pending = ""
+    for line in lines[1:]:
+        fields = (pending + " " + line).split() if pending else line.split()
+        if len(fields) == 1:
+            pending = fields[0]  # 긴 장치명은 다음 줄로 넘어감
+            continue
+        pending = ""
+        if len(fields) < 6 or fields[0].startswith(VIRTUAL_FILESYSTEMS):
+            continue
+        filesystems.append({
+            "filesystem": fields[0],
+            "size": fields[1],
+            "used": fields[2],
+            "avail": fields[3],
+            "use_pct": _num(fields[4].rstrip("%")),
+            "mount": " ".join(fields[5:]),
+        })
+    if not filesystems:
+        return None
+    filesystems.sort(key=lambda f: f["use_pct"] or 0, reverse=True)
+    return {"type": "filesystems", "filesystems": filesystems}
+
+
+def parse_free(stdout: str) -> Optional[Dict]:
+    """free -m 출력 → 메모리/스왑 사용량."""
+    lines = [line for line in stdout.splitlines() if line.strip()]
+    if not lines or "total" not in lines[0]:
+        return None
+    columns = [c.replace("/", "_") for c in lines[0].split()]
+    result: Dict = {"type": "memory"}
+    for line in lines[1:]:
+        label, _, rest = line.partition(":")
+        values = [_num(v) for v in rest.split()]
+        if label.strip().lower() in ("mem", "swap"):
+            result[label.strip().lower()] = dict(zip(columns, values))
+    return result if "mem" in result else None
+
+
+_TOP_CPU_KEYS = {"us": "user", "sy": "system", "ni": "nice", "id": "idle",
+                 "wa": "iowait", "hi": "irq", "si": "softirq", "st": "steal"}
+
+
+def parse_top(stdout: str) -> Optional[Dict]:
+    """top -bn1 출력 → 부하, 태스크, CPU, 메모리 요약과 CPU 상위 프로세스."""
+    result: Dict = {"type": "top"}
+    lines = stdout.splitlines()
+    table_start = None
+    for i, line in enumerate(lines):
+        if "load average:" in line:
+            result["load_average"] = [_num(v) for v in line.split("load average:")[1].split(",")]
+        elif line.startswith("Tasks:"):
+            result["tasks"] = {k: int(v) for v, k in re.findall(r"(\d+)\s+(\w+)", line)}
+        elif line.startswith("%Cpu"):
+            values = re.findall(r"(\d+(?:[.,]\d+)?)\s*(\w\w)\b", line.split(":", 1)[1])
+            result["cpu"] = {_TOP_CPU_KEYS[k]: _num(v) for v, k in values if k in _TOP_CPU_KEYS}
+        elif re.match(r"^\w+ (Mem|Swap)\s*:", line):
+            unit, kind = re.match(r"^(\w+) (Mem|Swap)", line).groups()
+            stats = re.findall(r"(\d+(?:[.,]\d+)?)\s+([\w/]+)", line.split(":", 1)[1])
+            result[kind.lower()] = {"unit": unit, **{k.replace("/", "_"): _num(v) for v, k in stats}}
+        elif line.split()[:2] == ["PID", "USER"]:
+            table_start = i
+            break
+    if table_start is None and "cpu" not in result:
+        return None
+
+    processes: List[ProcessRecord] = []
+    if table_start is not None:
+        header = lines[table_start].split()
+        width = len(header)
+        for line in lines[table_start + 1:]:
+            fields = line.split(None, width - 1)
+            if len(fields) != width or not fields[0].isdigit():
+                continue
+            cpu, mem = _num(fields[header.index("%CPU")]), _num(fields[header.index("%MEM")])
+            if cpu is None or mem is None:
+                continue
+            processes.append(ProcessRecord(
+                pid=int(fields[0]), user=fields[1], cpu=cpu, mem=mem, command=fields[-1][:120]
+            ))
+    result["processes"] = _top_processes(processes)
+    return result
+
+
+def parse_iostat(stdout: str) -> Optional[Dict]:
+    """iostat 출력 → avg-cpu와 장치별 통계 (마지막 리포트 기준)."""
+    cpu: Optional[Dict] = None
+    devices: Dict[str, Dict] = {}
+    lines = stdout.splitlines()
+    i = 0
+    while i < len(lines):
+        fields = lines[i].split()
+        if fields and fields[0] == "avg-cpu:" and i + 1 < len(lines):
+            names = [f.lstrip("%") for f in fields[1:]]
+            cpu = dict(zip(names, (_num(v) for v in lines[i + 1].split())))
+            i += 2
+            continue
+        if fields and fields[0].rstrip(":") == "Device":
+            names = fields[1:]
+            i += 1
+            while i < len(lines) and lines[i].split():
+                row = lines[i].split()
+                devices[row[0]] = dict(zip(names, (_num(v) for v in row[1:])))
+                i += 1
+            continue
+        i += 1
+    if cpu is None and not devices:
+        return None
+    return {"type": "iostat", "cpu": cpu, "devices": devices}
+
+
+def parse_vmstat(stdout: str) -> Optional[Dict]:
+    """vmstat 출력 → 샘플별 수치 (첫 샘플은 부팅 이후 평균)."""
+    lines = [line for line in stdout.splitlines() if line.strip()]
+    header_index = next((i for i, line in enumerate(lines) if line.split()[:2] == ["r", "b"]), None)
+    if header_index is None:
+        return None
+    columns = lines[header_index].split()
+    samples = []
+    for line in lines[header_index + 1:]:
+        values = line.split()
+        if len(values) != len(columns) or not values[0].isdigit():
+            continue
+        samples.append({name: _num(value) for name, value in zip(columns, values)})
+    if not samples:
+        return None
+    return {"type": "vmstat", "samples": samples}
+
+
+# 프로그램 이름 → 파서
+PARSERS: Dict[str, Callable[[str], Optional[Dict]]] = {
+    "ps": parse_ps,
+    "sar": parse_sar,
+    "df": parse_df,
+    "free": parse_free,
+    "top": parse_top,
+    "iostat": parse_iostat,
+    "vmstat": parse_vmstat,
+}
+
+
+def program_name(command: str) -> str:
+    """파이프라인 첫 커맨드의 프로그램 이름 (sudo, 경로 제외)."""
+    words = command.split("|")[0].split()
+    while words and words[0] in ("sudo", "env", "LC_ALL=C", "LANG=C"):
+        words = words[1:]
+    return words[0].rsplit("/", 1)[-1] if words else ""
+
+
+def parse_output(command: str, stdout: Optional[str]) -> Optional[Dict]:
+    """
+    알려진 진단 커맨드의 출력을 구조화된 레코드로 변환.
+
+    Args:
+        command: 실행된 커맨드
+        stdout: 표준 출력
+    Returns:
+        레코드 딕셔너리, 지원하지 않거나 파싱 실패 시 None
+    """
+    parser = PARSERS.get(program_name(command))
+    if parser is None or not stdout:
+        return None
+    try:
+        return parser(stdout)
+    except (ValueError, IndexError, KeyError):
+        return None
@@ -1,17 +1,73 @@
 # utils/server_info.py
+from typing import List, Optional, Tuple, Union
 from fastapi import HTTPException
+from server.config import AGENT_HEARTBEAT_TTL
+from server.utils.agent_registry import AgentRegistry
+from server.utils.logging import setup_logger
+
+logger = setup_logger(__name__)
 
 my_server_list = [
     {
         "uuid": "i-08fb8abe21e6fa058",
         "ip": "3.128.204.185",
         "name": "agent-1",
+        "group": "web",
     },
 ]
 
+# 정적 서버 목록 인덱스 (레지스트리에 등록되지 않은 인스턴스의 폴백)
+_static_servers = {server["uuid"]: server for server in my_server_list}
+
+# Agent 자가 등록/하트비트 레지스트리
+agent_registry = AgentRegistry(AGENT_HEARTBEAT_TTL)
+
+# 전체 인스턴스 대상 지정
+ALL_TARGETS = "all"
+
 def get_agent_url(instance_id: str, port: str = "9917") -> str:
-    """instance_id로 my_server_list에서 IP 조회, AGENT_URL 생성."""
-    for server in my_server_list:
-        if server["uuid"] == instance_id:
-            return f"http://{server['ip']}:{port}"
-    raise HTTPException(status_code=400, detail=f"Instance ID {instance_id} not found in server list")
\ No newline at end of file
+    """instance_id로 AGENT_URL 조회 (레지스트리 우선, 미등록 인스턴스는 my_server_list)."""
+    entry = agent_registry.get(instance_id)
+    if entry is not None:
+        # 하트비트가 끊긴 Agent는 연결 시도 없이 즉시 실패
+        if not agent_registry.is_healthy(entry):
+            raise HTTPException(status_code=503, detail=f"Agent for {instance_id} is unhealthy (no heartbeat)")
+        return entry["url"]
+    server = _static_servers.get(instance_id)
+    if server is not None:
+        return f"http://{server['ip']}:{port}"
+    raise HTTPException(status_code=400, detail=f"Instance ID {instance_id} not found in server list")
+
+def _inventory() -> List[Tuple[str, Optional[str]]]:
+    """실행 가능한 (인스턴스 ID, 그룹) 목록: 정상 Agent + 레지스트리에 없는 정적 서버."""
+    healthy = [(entry["instance_id"], entry.get("group")) for entry in agent_registry.healthy()]
+    static = [(server["uuid"], server.get("group")) for server in my_server_list
+              if agent_registry.get(server["uuid"]) is None]
+    return healthy + static
+
+def list_groups() -> List[str]:
+    """등록된 서버 그룹 이름 (예: Auto Scaling 그룹, 역할)."""
+    return sorted({group for _, group in _inventory() if group})
+
+def resolve_targets(target: Optional[Union[str, List[str]]]) -> List[str]:
+    """대상 지정(인스턴스 ID, 그룹 이름, 'all' 또는 이들의 리스트)을 중복 없는 인스턴스 ID 리스트로 변환.
+
+    등록되지 않은 인스턴스 ID나 그룹 이름, 인스턴스가 없는 'all'은 빈 리스트로 변환된다.
+    """
+    if not target:
+        return []
+    if isinstance(target, list):
+        instance_ids = []
+        for item in target:
+            instance_ids.extend(i for i in resolve_targets(item) if i not in instance_ids)
+        return instance_ids
+    if target == ALL_TARGETS:
+        return [instance_id for instance_id, _ in _inventory()]
+    group = [instance_id for instance_id, group in _inventory() if group == target]
+    if group:
+        return group
+    # 비정상 Agent도 포함 (디스패치 시 즉시 실패 결과로 보고됨)
+    if agent_registry.get(target) is not None or target in _static_servers:
+        return [target]
+    logger.warning(f"Unresolvable target: {target}")
+    return []
@@ -0,0 +1,89 @@
+# server/utils/session_store.py
+import asyncio
+import time
+import uuid
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+
+class Session:
+    """채팅 세션 1개의 대화 기록과 직렬화용 락."""
+
+    def __init__(self, session_id: str):
+        self.session_id = session_id
+        self.history: List[Dict] = []  # 요약되지 않은 최근 턴
+        self.summary: Optional[str] = None  # 이전 턴 롤링 요약
+        self.last_active = time.time()
+        self.lock = asyncio.Lock()
+
+
+class SessionStore:
+    """세션 ID별 대화 기록 저장소 (유휴 만료 + LRU 최대 개수).
+
+    클라이언트는 새 턴만 전송하고, 대화 기록은 서버가 누적한다.
+    같은 세션의 요청은 세션 락으로 순서대로 처리된다.
+    만료/제거된 세션 ID는 on_drop으로 전달된다 (체크포인트 정리 등).
+    """
+
+    def __init__(self, max_sessions: int, ttl: float, max_turns: int,
+                 on_drop: Optional[Callable[[str], None]] = None):
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self.max_turns = max_turns
+        self.on_drop = on_drop
+        self._sessions: "OrderedDict[str, Session]" = OrderedDict()
+        self.stats = {"created": 0, "expired": 0, "evicted": 0}
+
+    def _prune(self, now: float) -> None:
+        while self._sessions:
+            session_id, session = next(iter(self._sessions.items()))
+            if now - session.last_active <= self.ttl or session.lock.locked():
+                break
+            del self._sessions[session_id]
+            self.stats["expired"] += 1
+            self._dropped(session_id)
+
+    def _dropped(self, session_id: str) -> None:
+        if self.on_drop is not None:
+            self.on_drop(session_id)
+
+    def _evict(self, keep: str) -> None:
+        """최대 개수 초과분을 오래된 세션부터 제거 (_prune과 같이 처리 중인(락 보유) 세션은 유지)."""
+        excess = len(self._sessions) - self.max_sessions
+        if excess <= 0:
+            return
+        idle = [
+            session_id for session_id, session in self._sessions.items()
+            if session_id != keep and not session.lock.locked()
+        ][:excess]
+        for session_id in idle:
+            del self._sessions[session_id]
+            self.stats["evicted"] += 1
+            self._dropped(session_id)
+
+    def get(self, session_id: Optional[str] = None) -> Session:
+        """세션 조회 (ID가 없거나 서버가 발급하지 않은/만료된 ID면 새 ID로 세션 생성)."""
+        now = time.time()
+        self._prune(now)
+        session = self._sessions.get(session_id) if session_id else None
+        if session is None:
+            # 클라이언트가 임의로 지정한 ID는 사용하지 않음 (다른 세션/체크포인트와 충돌 방지)
+            session = Session(str(uuid.uuid4()))
+            self._sessions[session.session_id] = session
+            self.stats["created"] += 1
+            self._evict(keep=session.session_id)
+        session.last_active = now
+        self._sessions.move_to_end(session.session_id)
+        return session
+
+    def append_turn(self, session: Session, user_input: str, answer) -> None:
+        """사용자 입력과 응답 1턴 추가 (최대 턴 수 초과 시 오래된 턴 제거)."""
+        session.history.append({
+            "user": {"content": user_input},
+            "assistant": {"content": answer}
+        })
+        del session.history[:-self.max_turns]
+        session.last_active = time.time()
+
+    def get_stats(self) -> Dict:
+        return {**self.stats, "active": len(self._sessions)}
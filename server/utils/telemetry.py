@@ -0,0 +1,167 @@
+# server/utils/telemetry.py
+import functools
+import threading
+import time
+from contextlib import contextmanager
+from typing import Awaitable, Callable, Dict, Iterator, List, Optional, Tuple
+
+# 지연 시간 히스토그램 버킷 상한(초)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+INF_BUCKET = 'le="+Inf"'
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Counter:
+    """레이블별 누적 카운터 (Prometheus counter)."""
+
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = tuple(str(labels.get(name, "")) for name in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labels, key)} {_format_value(value)}" for key, value in values]
+
+
+class Histogram:
+    """레이블별 누적 버킷 히스토그램 (Prometheus histogram, p50/p99는 histogram_quantile로 계산)."""
+
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labels: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.buckets = tuple(sorted(buckets))
+        # 레이블 값 -> [버킷별 관측 수..., 합계, 개수]
+        self._series: Dict[Tuple[str, ...], List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels) -> None:
+        key = tuple(str(labels.get(name, "")) for name in self.labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 2)
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[index] += 1
+                    break
+            series[-2] += value
+            series[-1] += 1
+
+    @contextmanager
+    def time(self, **labels) -> Iterator[Dict]:
+        """블록 실행 시간 관측 (블록에서 예외 발생 시 outcome="error", 블록에서 레이블 변경 가능)."""
+        labels.setdefault("outcome", "ok")
+        started = time.perf_counter()
+        try:
+            yield labels
+        except BaseException:
+            labels["outcome"] = "error"
+            raise
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            series = sorted((key, list(values)) for key, values in self._series.items())
+        lines = []
+        for key, values in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets, values):
+                cumulative += count
+                le = _format_labels(self.labels, key, f'le="{_format_value(bound)}"')
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            lines.append(f"{self.name}_bucket{_format_labels(self.labels, key, INF_BUCKET)} {values[-1]}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, key)} {_format_value(values[-2])}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, key)} {values[-1]}")
+        return lines
+
+
+class MetricsRegistry:
+    """메트릭 등록과 Prometheus 텍스트 포맷 출력."""
+
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+
+    def counter(self, name: str, documentation: str, labels: Tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labels))
+
+    def histogram(self, name: str, documentation: str, labels: Tuple[str, ...] = (),
+                  buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labels, buckets))
+
+    def _register(self, metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"Duplicate metric: {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        """Prometheus 텍스트 노출 포맷 (text/plain; version=0.0.4)."""
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+WORKFLOW_DURATION = registry.histogram(
+    "workflow_duration_seconds", "End-to-end workflow run time", ("workflow", "outcome"),
+    DEFAULT_BUCKETS + (120.0, 300.0))
+NODE_DURATION = registry.histogram(
+    "workflow_node_duration_seconds", "Workflow node execution time", ("node", "outcome"))
+LLM_DURATION = registry.histogram(
+    "llm_request_duration_seconds", "OpenAI chat completion latency (until the last streamed token)",
+    ("call", "model", "outcome"))
+LLM_TOKENS = registry.counter(
+    "llm_tokens_total", "OpenAI tokens used", ("call", "model", "type"))
+AGENT_RPC_DURATION = registry.histogram(
+    "agent_rpc_duration_seconds", "Agent RPC round trip time including retries", ("path", "outcome"))
+
+
+def instrument_node(name: str, node: Callable[..., Awaitable[Dict]]) -> Callable[..., Awaitable[Dict]]:
+    """워크플로우 노드 실행 시간을 NODE_DURATION에 기록하는 래퍼."""
+    @functools.wraps(node)
+    async def wrapper(state):
+        with NODE_DURATION.time(node=name):
+            return await node(state)
+    return wrapper
+
+
+def record_llm_usage(call: str, model: str, usage: Optional[object]) -> None:
+    """LLM 응답의 prompt/completion 토큰 수 기록 (usage가 없으면 무시)."""
+    if usage is None:
+        return
+    LLM_TOKENS.inc(usage.prompt_tokens or 0, call=call, model=model, type="prompt")
+    LLM_TOKENS.inc(usage.completion_tokens or 0, call=call, model=model, type="completion")
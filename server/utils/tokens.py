@@ -0,0 +1,30 @@
+# server/utils/tokens.py
+import json
+from typing import Any
+
+
+def estimate_tokens(text: str) -> int:
+    """토크나이저 없이 토큰 수 근사 (ASCII 약 4자당 1토큰, 그 외 문자는 1자당 1토큰)."""
+    if not text:
+        return 0
+    ascii_chars = sum(1 for c in text if ord(c) < 128)
+    return (ascii_chars + 3) // 4 + (len(text) - ascii_chars)
+
+
+def estimate_json_tokens(value: Any) -> int:
+    """프롬프트에 json.dumps로 삽입될 값의 토큰 수 근사."""
+    return estimate_tokens(json.dumps(value, ensure_ascii=False))
+
+
+def truncate_tokens(text: str, max_tokens: int) -> str:
+    """추정 토큰 수가 max_tokens 이하인 가장 긴 앞부분 (문자 수 이분 탐색, 비 ASCII 문자 포함 시에도 예산 준수)."""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    low, high = 0, len(text)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if estimate_tokens(text[:middle]) <= max_tokens:
+            low = middle
+        else:
+            high = middle - 1
+    return text[:low]
@@ -1,25 +1,39 @@
+from typing import Optional
+from langgraph.checkpoint.base import BaseCheckpointSaver
 from langgraph.graph import StateGraph, END
 from server.workflow.state import AgentState
 from server.workflow.nodes.receive import receive
-from server.workflow.nodes.messages import messages
 from server.workflow.nodes.fetch import fetch
 from server.workflow.nodes.generate import generate
 from server.workflow.nodes.execute import execute
+from server.workflow.nodes.compact import compact
 from server.workflow.nodes.analyze import analyze
+from server.utils.telemetry import instrument_node
 
-def build_workflow() -> StateGraph:
-    """LangGraph 워크플로우 빌더: 노드와 엣지 정의."""
+def route_after_analyze(state: AgentState) -> str:
+    """승인 요청 보고서를 만든 뒤(실행 전)에는 execute로 이동 (체크포인터 그래프에서는 execute 직전에 중단)."""
+    if state.get("user_question") and state.get("execution_result") is None:
+        return "execute"
+    return "end"
+
+def build_workflow(checkpointer: Optional[BaseCheckpointSaver] = None) -> StateGraph:
+    """LangGraph 워크플로우 빌더: 노드와 엣지 정의.
+
+    checkpointer를 지정하면 execute 직전에 중단되는 승인 대기 그래프를 컴파일한다.
+    사용자 승인(Y) 시 같은 thread_id로 저장된 상태에서 실행을 재개한다.
+    """
     # 상태 그래프 생성
     workflow = StateGraph(
         AgentState
     )
 
-    # 노드 추가
-    workflow.add_node("receive", receive)
-    workflow.add_node("fetch", fetch)
-    workflow.add_node("generate", generate)
-    workflow.add_node("execute", execute)
-    workflow.add_node("analyze", analyze)
+    # 노드 추가 (노드별 실행 시간은 /metrics로 노출)
+    workflow.add_node("receive", instrument_node("receive", receive))
+    workflow.add_node("fetch", instrument_node("fetch", fetch))
+    workflow.add_node("generate", instrument_node("generate", generate))
+    workflow.add_node("execute", instrument_node("execute", execute))
+    workflow.add_node("compact", instrument_node("compact", compact))
+    workflow.add_node("analyze", instrument_node("analyze", analyze))
 
     # 엣지 추가
     workflow.set_entry_point("receive")
@@ -31,7 +45,6 @@ def build_workflow() -> StateGraph:
         {
             "fetch": "fetch",
             "generate": "generate",
-            "execute": "execute",
             "end": END
         }
     )
@@ -50,9 +63,23 @@ def build_workflow() -> StateGraph:
     )
 
     # execute 고정 엣지
-    workflow.add_edge("execute", "analyze")
+    workflow.add_edge("execute", "compact")
 
-    # analyze 고정 엣지
-    workflow.add_edge("analyze", END)
+    # compact 고정 엣지
+    workflow.add_edge("compact", "analyze")
 
-    return workflow.compile()
\ No newline at end of file
+    if checkpointer is None:
+        # analyze 고정 엣지
+        workflow.add_edge("analyze", END)
+        return workflow.compile()
+
+    # analyze 조건부 엣지 (승인 대기 시 execute 직전 중단)
+    workflow.add_conditional_edges(
+        "analyze",
+        route_after_analyze,
+        {
+            "execute": "execute",
+            "end": END
+        }
+    )
+    return workflow.compile(checkpointer=checkpointer, interrupt_before=["execute"])
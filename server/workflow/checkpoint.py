@@ -0,0 +1,86 @@
+# server/workflow/checkpoint.py
+import asyncio
+import time
+from typing import Optional, Set
+import aiosqlite
+from langgraph.checkpoint.base.id import UUID
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+from server.config import CHECKPOINT_DB_PATH
+from server.utils.logging import setup_logger
+
+logger = setup_logger(__name__)
+
+# uuid6 타임스탬프 기준(1582-10-15)과 Unix epoch의 차이 (100ns 단위)
+_UUID_EPOCH_OFFSET = 0x01B21DD213814000
+
+_checkpointer: Optional[AsyncSqliteSaver] = None
+_pending_deletes: Set[asyncio.Task] = set()
+
+
+async def open_checkpointer(path: str = CHECKPOINT_DB_PATH) -> AsyncSqliteSaver:
+    """SQLite 체크포인터 연결 및 테이블 생성 (서버 기동 시 호출)."""
+    global _checkpointer
+    if _checkpointer is None:
+        conn = await aiosqlite.connect(path)
+        saver = AsyncSqliteSaver(conn)
+        await saver.setup()
+        _checkpointer = saver
+        logger.info(f"Checkpointer opened: {path}")
+    return _checkpointer
+
+
+async def close_checkpointer() -> None:
+    """체크포인터 연결 종료 (서버 종료 시 호출)."""
+    global _checkpointer
+    saver, _checkpointer = _checkpointer, None
+    if saver is not None:
+        await saver.conn.close()
+
+
+def thread_config(conversation_id: str) -> dict:
+    """대화 ID를 체크포인트 thread_id로 사용하는 실행 설정."""
+    return {"configurable": {"thread_id": conversation_id}}
+
+
+def checkpoint_time(checkpoint_id: str) -> float:
+    """체크포인트 ID(uuid6)에 기록된 생성 시각 (epoch 초)."""
+    return (UUID(checkpoint_id).time - _UUID_EPOCH_OFFSET) / 1e7
+
+
+async def delete_thread(conversation_id: str) -> None:
+    """대화의 체크포인트 전체 삭제."""
+    if _checkpointer is not None:
+        await _checkpointer.adelete_thread(conversation_id)
+
+
+def forget_thread(conversation_id: str) -> None:
+    """세션 만료/제거 시 호출: 대화의 체크포인트 삭제를 백그라운드로 실행."""
+    if _checkpointer is None:
+        return
+    task = asyncio.get_running_loop().create_task(delete_thread(conversation_id))
+    _pending_deletes.add(task)
+    task.add_done_callback(_pending_deletes.discard)
+
+
+async def prune_threads(max_age: float) -> int:
+    """
+    마지막 체크포인트가 max_age초보다 오래된 대화 삭제 (재시작으로 세션 정보가 사라진 대화 정리).
+
+    Args:
+        max_age: 보관 기간(초), 보통 세션 TTL
+    Returns:
+        삭제한 대화 수
+    """
+    if _checkpointer is None:
+        return 0
+    cutoff = time.time() - max_age
+    async with _checkpointer.conn.execute(
+        "SELECT thread_id, MAX(checkpoint_id) FROM checkpoints GROUP BY thread_id"
+    ) as cursor:
+        rows = await cursor.fetchall()
+    stale = [thread_id for thread_id, checkpoint_id in rows if checkpoint_time(checkpoint_id) < cutoff]
+    for thread_id in stale:
+        await _checkpointer.adelete_thread(thread_id)
+    if stale:
+        logger.info(f"Pruned {len(stale)} stale checkpoint threads")
+    return len(stale)
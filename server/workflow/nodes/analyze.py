@@ -1,22 +1,27 @@
 from typing import Dict
 from server.workflow.state import AgentState
-from server.utils.llm import get_llm
+from server.utils.llm import get_async_llm
 from server.utils.logging import setup_logger
+from server.utils.telemetry import LLM_DURATION, record_llm_usage
+from langgraph.config import get_stream_writer
 import json
-import re
 
 logger = setup_logger(__name__)
 
-def analyze(state: AgentState) -> Dict:
+async def analyze(state: AgentState) -> Dict:
     """실행 결과를 포맷팅하고 시스템 상태를 분석하여 요약."""
     logger.info(f"analyze Start state: {state}")
     
     # 상태에서 필요한 데이터 추출
-    execution_result = state.get("execution_result", [])
+    # compact 노드에서 토큰 예산에 맞게 압축된 결과 우선 사용
+    execution_result = state.get("compacted_result") or state.get("execution_result", [])
     target = state.get("target")
+    targets = state.get("targets") or []
     input_type = state.get("input_type")
     intent = state.get("intent")
     approved = state.get("approved")
+    include_snapshot = bool(state.get("include_snapshot"))
+    include_history = bool(state.get("include_history"))
     
     # 디버깅: execution_result 구조 확인
     logger.debug(f"execution_result: {execution_result}")
@@ -26,7 +31,7 @@ def analyze(state: AgentState) -> Dict:
     logger.debug(f"Extracted commands: {commands}")
 
     # LLM 호출로 단일 응답 생성
-    client = get_llm()
+    client = get_async_llm()
 
     # 프롬프트 분기
     if approved:
@@ -39,22 +44,58 @@ def analyze(state: AgentState) -> Dict:
         - 실행 결과: {json.dumps(execution_result, ensure_ascii=False)}
         - 의도: {intent}
         - 대상 인스턴스: {target}
+        - 실행 인스턴스 목록: {json.dumps(targets, ensure_ascii=False)}
         - 입력 유형: {input_type}
         - 사용자 승인: {approved}
         
         [지침]
+        - 실행 결과에 `target` 필드가 있으면 여러 인스턴스에서 동시 실행된 결과임: 인스턴스별로 묶어 표시하고, 인스턴스 간 비교 요약 표(인스턴스, 주요 수치, 이상 여부)와 이상 인스턴스 목록을 보고서 상단에 추가.
         - 시스템 상태를 간결한 마크다운 문자열로 요약 (CPU 사용량, 디스크 상태, 문제 여부 포함).
         - 모든 명령어와 실행 결과를 포함, 가변적 개수에 맞게 동적으로 처리.
-        - 실행 결과의 각 명령어는 `### \\`커맨드\\`` 형식으로 표시 (예: ### \\`ps aux --sort=-%cpu | head -n 10\\`).
+        - 실행 결과의 각 명령어는 "### `커맨드`" 형식으로 표시 (예: ### `ps aux --sort=-%cpu | head -n 10`).
         - 실행 결과는 코드 블록(```text)으로, 상태(성공/실패) 명시, 전체 stdout 포함.
+        - 실행 결과는 토큰 예산에 맞게 압축되어 있음 ("... [N lines omitted] ..." 생략 표시, "[xN]" 반복 라인 표시는 그대로 유지).
+        - `parsed` 필드가 있는 실행 결과는 stdout 대신 파싱된 레코드를 마크다운 표로 표시하고, 수치는 레코드 값을 그대로 사용 (재계산/추정 금지).
+        - `metrics_snapshot` 결과는 Agent가 /proc에서 직접 수집한 스냅샷 (cpu.user/system/iowait/steal/idle/used: 측정 구간 CPU 사용률(%), load, memory, disks, processes.by_cpu/by_memory): "### 메트릭 스냅샷" 헤딩으로 CPU/메모리/디스크/상위 프로세스 표를 표시하고 요약의 기준 수치로 사용.
+        - `metrics_history` 결과는 Agent가 알람 발생 전부터 주기적으로 기록한 메트릭 이력 (summary: 필드별 min/avg/max/max_at, samples: 필드별 시계열, 시각은 epoch 초): "### 메트릭 이력" 헤딩으로 구간 요약 표를 표시하고, CPU/메모리/디스크 IO 피크 시각과 당시 CPU 상위 프로세스(top_name)를 근거로 알람 원인을 분석.
         - 보고서 상단에 "명령이 실행된 인스턴스: `{target}`" 추가.
         - 요약은 시스템 상태와 데이터 기반 분석(예: CPU 피크 원인, 프로세스 이상 여부)을 포함.
         - 마크다운 형식을 자유롭게 선택하되, Streamlit 렌더링에 적합하게 가독성 유지 (헤딩, 리스트, 코드 블록 활용).
-        - **반드시 유효한 JSON 형식으로만 반환** (예: {{"answer": "마크다운 요약"}}).
-        - Markdown (예: ```json), 코드 블록, 추가 텍스트 절대 포함 금지.
+        - **마크다운 본문만 반환** (JSON, 전체를 감싸는 ```markdown 코드 블록, 추가 설명 금지). 응답은 생성되는 대로 사용자에게 스트리밍됨.
         
         [반환 예시]
-        {{"answer": "# 시스템 상태 보고서\\n\\n**명령이 실행된 인스턴스**: `i-08fb8abe21e6fa058`\\n\\n## 실행된 명령어\\n- \\`ps aux --sort=-%cpu | head -n 10\\`\\n- \\`sar 1 5\\`\\n\\n**생성 의도**: 높은 CPU 사용률은 애플리케이션 부하, 프로세스 문제, 또는 외부 테스트로 인한 것일 수 있음.\\n\\n## 명령어 실행 결과\\n### \\`ps aux --sort=-%cpu | head -n 10\\`\\n**상태**: 성공\\n```text\\nUSER PID %CPU %MEM VSZ RSS TTY STAT START TIME COMMAND\\nec2-user 314273 0.1 2.2 347424 44988 ? Ssl 01:31 0:19 /usr/bin/python3.12 -m uvicorn...\\n...\\n```\\n### \\`sar 1 5\\`\\n**상태**: 성공\\n```text\\nLinux 6.1.134-150.224.amzn2023.x86_64...\\nAverage: all 0.79 0.00 1.39 0.00 1.39 96.44\\n```\\n## 시스템 상태 요약\\n- **CPU 사용량**: 평균 0.79%, 최대 7% (05:14:34 순간 피크)\\n- **디스크 상태**: 정상\\n- **문제 여부**: 없음\\n\\n**분석**: 높은 CPU 사용률 알람(94.1%) 발생, 그러나 현재 데이터로는 정상. 순간 부하(7% system) 확인, 지속성 없음. 추가 모니터링 권장.\\n\\n**인스턴스**: i-08fb8abe21e6fa058"}}
+        # 시스템 상태 보고서
+
+        **명령이 실행된 인스턴스**: `i-08fb8abe21e6fa058`
+
+        ## 실행된 명령어
+        - `ps aux --sort=-%cpu | head -n 10`
+        - `sar 1 5`
+
+        **생성 의도**: 높은 CPU 사용률은 애플리케이션 부하, 프로세스 문제, 또는 외부 테스트로 인한 것일 수 있음.
+
+        ## 명령어 실행 결과
+        ### `ps aux --sort=-%cpu | head -n 10`
+        **상태**: 성공
+        ```text
+        USER PID %CPU %MEM VSZ RSS TTY STAT START TIME COMMAND
+        ec2-user 314273 0.1 2.2 347424 44988 ? Ssl 01:31 0:19 /usr/bin/python3.12 -m uvicorn...
+        ...
+        ```
+        ### `sar 1 5`
+        **상태**: 성공
+        ```text
+        Linux 6.1.134-150.224.amzn2023.x86_64...
+        Average: all 0.79 0.00 1.39 0.00 1.39 96.44
+        ```
+        ## 시스템 상태 요약
+        - **CPU 사용량**: 평균 0.79%, 최대 7% (05:14:34 순간 피크)
+        - **디스크 상태**: 정상
+        - **문제 여부**: 없음
+
+        **분석**: 높은 CPU 사용률 알람(94.1%) 발생, 그러나 현재 데이터로는 정상. 순간 부하(7% system) 확인, 지속성 없음. 추가 모니터링 권장.
+
+        **인스턴스**: i-08fb8abe21e6fa058
         """
     else:
         # 미승인 경우: 임시 프롬프트
@@ -65,35 +106,65 @@ def analyze(state: AgentState) -> Dict:
         - 커맨드: {json.dumps(commands, ensure_ascii=False)}
         - 의도: {intent}
         - 대상 인스턴스: {target}
+        - 실행 인스턴스 목록: {json.dumps(targets, ensure_ascii=False)}
         - 입력 유형: {input_type}
         - 사용자 승인: {approved}
+        - 메트릭 스냅샷 조회: {include_snapshot}
+        - 메트릭 이력 조회: {include_history}
         
         [지침]
+        - 메트릭 스냅샷 조회가 True이면 커맨드와 함께 Agent 메트릭 스냅샷(CPU, 메모리, 부하, 디스크, 상위 프로세스)을 수집함을 명시.
+        - 메트릭 이력 조회가 True이면 Agent에 기록된 최근 메트릭 이력(CPU, 메모리, 디스크 IO, 상위 프로세스)을 함께 조회함을 명시.
+        - 실행 인스턴스가 여러 개이면 모든 인스턴스 ID를 나열하고 같은 커맨드가 동시에 실행됨을 명시.
         - 간단한 마크다운 보고서를 생성, 커맨드 실행 전 사용자 승인 요청.
         - 커맨드 목록과 의도를 포함, 실행 결과는 제외.
         - 보고서 상단에 "명령이 실행될 인스턴스: `{target}`" 추가.
-        - 커맨드 목록은 "- \\`cmd\\`" 형식으로 표시 (예: - \\`lscpu\\`).
+        - 커맨드 목록은 "- `cmd`" 형식으로 표시 (예: - `lscpu`).
         - 사용자에게 승인 요청을 강조하는 경고 메시지 포함, 마지막에 "커맨드를 실행하시겠습니까? (Y/N)" 추가.
         - 마크다운 형식을 자유롭게 선택하되, Streamlit 렌더링에 적합하게 가독성 유지.
-        - **반드시 유효한 JSON 형식으로만 반환** (예: {{"answer": "마크다운 요약"}}).
-        - Markdown (예: ```json), 코드 블록, 추가 텍스트 절대 포함 금지.
+        - **마크다운 본문만 반환** (JSON, 전체를 감싸는 ```markdown 코드 블록, 추가 설명 금지). 응답은 생성되는 대로 사용자에게 스트리밍됨.
         
         [반환 예시]
-        {{"answer": "# 시스템 상태 보고서 (미승인)\\n\\n**명령이 실행된 인스턴스**: `i-08fb8abe21e6fa058`\\n\\n## 제안된 명령어\\n- \\`lscpu\\`\\n- \\`cat /proc/cpuinfo\\`\\n- \\`sar -u 1 5\\`\\n\\n**의도**: CPU에 대한 추가 정보를 수집하고, 잠재적인 성능 문제를 진단하기 위함.\\n\\n## 승인 요청\\n**경고**: 아래 커맨드들이 실행을 대기 중입니다. 실행 전 시스템 상태를 확인할 수 없습니다. 승인하시면 커맨드가 실행됩니다.\\n\\n커맨드를 실행하시겠습니까? (Y/N)"}}
+        # 시스템 상태 보고서 (미승인)
+
+        **명령이 실행된 인스턴스**: `i-08fb8abe21e6fa058`
+
+        ## 제안된 명령어
+        - `lscpu`
+        - `cat /proc/cpuinfo`
+        - `sar -u 1 5`
+
+        **의도**: CPU에 대한 추가 정보를 수집하고, 잠재적인 성능 문제를 진단하기 위함.
+
+        ## 승인 요청
+        **경고**: 아래 커맨드들이 실행을 대기 중입니다. 실행 전 시스템 상태를 확인할 수 없습니다. 승인하시면 커맨드가 실행됩니다.
+
+        커맨드를 실행하시겠습니까? (Y/N)
         """
     
+    # 스트리밍 실행(/chat/stream) 시 생성되는 토큰을 바로 전달 (일반 실행에서는 무시됨)
+    writer = get_stream_writer()
     try:
-        response = client.chat.completions.create(
-            model="gpt-4o",
-            messages=[{"role": "user", "content": prompt}],
-            response_format={"type": "json_object"}
-        )
-        content = response.choices[0].message.content
+        chunks, usage = [], None
+        with LLM_DURATION.time(call="analyze", model="gpt-4o"):
+            stream = await client.chat.completions.create(
+                model="gpt-4o",
+                messages=[{"role": "user", "content": prompt}],
+                stream=True,
+                stream_options={"include_usage": True}  # 마지막 청크에 토큰 사용량 포함
+            )
+            async for chunk in stream:
+                usage = getattr(chunk, "usage", None) or usage
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    chunks.append(delta)
+                    writer({"type": "token", "content": delta})
+        record_llm_usage("analyze", "gpt-4o", usage)
+        content = "".join(chunks).strip()
         logger.debug(f"LLM raw response: {content}")
-        
-        result = json.loads(content)
-        # final_answer를 문자열로 설정
-        state["final_answer"] = result["answer"]
+
+        # final_answer를 마크다운 문자열로 설정
+        state["final_answer"] = content
 
         return state
     
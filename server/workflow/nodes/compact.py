@@ -0,0 +1,39 @@
+from server.workflow.state import AgentState
+from typing import Dict, List
+from server.config import ANALYZE_TOKEN_BUDGET
+from server.utils.compaction import compact_results
+from server.utils.parsers import parse_output
+from server.utils.tokens import estimate_json_tokens
+from server.utils.logging import setup_logger
+
+logger = setup_logger(__name__)
+
+async def compact(state: AgentState) -> Dict:
+    """실행 결과를 구조화된 레코드로 파싱하고, 나머지 출력은 토큰 예산에 맞게 압축."""
+    execution_result = state.get("execution_result") or []
+
+    # 알려진 진단 커맨드는 원문 대신 파싱된 레코드를 전달
+    shaped: List[Dict] = []
+    parsed_commands: List[str] = []
+    for result in execution_result:
+        # Agent 메트릭 스냅샷은 이미 구조화된 레코드
+        if result.get("parsed") is not None:
+            shaped.append(result)
+            parsed_commands.append(result.get("command"))
+            continue
+        record = parse_output(result.get("command", ""), result.get("stdout")) if result.get("returncode") == 0 else None
+        if record is None:
+            shaped.append(result)
+            continue
+        shaped.append({**result, "stdout": None, "parsed": record})
+        parsed_commands.append(result.get("command"))
+
+    parsed_tokens = sum(estimate_json_tokens(result["parsed"]) for result in shaped if "parsed" in result)
+    compacted, report = compact_results(shaped, max(ANALYZE_TOKEN_BUDGET - parsed_tokens, 0))
+    report["parsed"] = parsed_commands
+    report["parsed_tokens"] = parsed_tokens
+    logger.info(
+        f"compact tokens: {report['original_tokens']} -> {report['final_tokens']} "
+        f"(budget {report['budget']}, parsed {len(parsed_commands)}, dropped {len(report['dropped'])} items)"
+    )
+    return {"compacted_result": compacted, "compaction": report}
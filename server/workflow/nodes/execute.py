@@ -1,29 +1,62 @@
-from typing import Dict, List, Any
-import requests
+from datetime import datetime
+import time
+from typing import Dict, Any, Optional
+from fastapi import HTTPException
 from pydantic import ValidationError
+from server.config import METRICS_HISTORY_LOOKBACK
 from server.models.models import ExecuteResponse
-from server.config import FASTAPI_HOST, FASTAPI_PORT
 from server.utils.logging import setup_logger
 from server.utils.server_info import get_agent_url
+from server.dispatch import collect, fan_out
 
 logger = setup_logger(__name__)
 
 AgentState = Dict[str, Any]
 
-def execute(state: AgentState) -> Dict:
+
+def to_entry(result: ExecuteResponse, target: Optional[str] = None) -> Dict:
+    """Agent 응답을 execution_result 항목으로 변환 (스냅샷은 parsed 유지)."""
+    entry = {"target": target} if target else {}
+    entry.update(command=result.command, stdout=result.stdout, stderr=result.stderr,
+                 returncode=result.returncode)
+    if result.parsed is not None:
+        entry["parsed"] = result.parsed
+    return entry
+
+
+def history_window(state: AgentState) -> Optional[Dict]:
+    """include_history이면 메트릭 이력 조회 구간 (알람 발생 시각, 없으면 현재 기준 METRICS_HISTORY_LOOKBACK초 전부터)."""
+    if not state.get("include_history"):
+        return None
+    raw_data = (state.get("raw_input") or {}).get("raw_data") or {}
+    anchor = time.time()
+    if raw_data.get("StateChangeTime"):
+        try:
+            anchor = datetime.strptime(raw_data["StateChangeTime"], "%Y-%m-%dT%H:%M:%S.%f%z").timestamp()
+        except ValueError:
+            logger.warning(f"Invalid StateChangeTime: {raw_data['StateChangeTime']}")
+    return {"since": anchor - METRICS_HISTORY_LOOKBACK, "until": None}
+
+async def execute(state: AgentState) -> Dict:
     """
-    command 리스트와 target을 사용하여 /execute API 호출.
+    command 리스트와 target을 사용하여 Agent에 커맨드 실행 요청 (프로세스 내 디스패치).
+    대상 인스턴스(targets)가 2개 이상이면 모든 Agent에 동시 실행하고 결과에 인스턴스 ID(target)를 표시.
+    include_snapshot이면 Agent 메트릭 스냅샷(/metrics/snapshot), include_history이면 알람 발생 전부터의
+    메트릭 이력(/metrics/history)을 커맨드와 함께 조회.
     
     Args:
-        state: 에이전트 상태 (command와 target 포함)
+        state: 에이전트 상태 (command, target/targets, include_snapshot, include_history 포함)
     Returns:
         다음 노드와 업데이트된 상태
     """
     commands = state.get("command", [])
     target = state.get("target")
+    targets = state.get("targets") or []
+    snapshot = bool(state.get("include_snapshot"))
+    history = history_window(state)
     state_update = {}
 
-    if not commands:
+    if not commands and not snapshot and history is None:
         logger.warning("No command provided in state")
         state["execution_result"] = [
             {
@@ -37,39 +70,35 @@ def execute(state: AgentState) -> Dict:
         logger.info(f"execute end state: {state}")
         return {**state_update, "next": "finish"}
 
+    if len(targets) > 1:
+        results = await fan_out(commands, targets, snapshot=snapshot, history=history)
+        state["execution_result"] = [
+            to_entry(result, instance_id)
+            for instance_id, responses in results.items()
+            for result in responses
+        ]
+        state_update["execution_result"] = state["execution_result"]
+        logger.info(f"Fan-out execution finished on {len(targets)} instances, commands: {commands}")
+        return {**state_update, "next": "analyze"}
+    if targets:
+        target = targets[0]
+    elif target:
+        # 그룹/인스턴스를 찾을 수 없거나 'all'인데 실행 가능한 인스턴스가 없음
+        logger.error(f"No instances resolved for target: {target}")
+        state["execution_result"] = [
+            {"command": cmd, "stdout": None, "stderr": f"대상 인스턴스를 찾을 수 없음: {target}", "returncode": 1}
+            for cmd in commands or [""]
+        ]
+        state_update["execution_result"] = state["execution_result"]
+        return {**state_update, "next": "finish"}
+
     try:
         agent_url = get_agent_url(target)
-        payload = {"command": commands, "agent": target, "url": agent_url}
-        logger.info(f"Sending request to {agent_url}/execute with payload: {payload}")
-        
-        response = requests.post(
-            f"http://{FASTAPI_HOST}:{FASTAPI_PORT}/execute",
-            json=payload,
-            headers={"Content-Type": "application/json"}
-        )
-        response.raise_for_status()
-
-        results = response.json()
-        if not isinstance(results, list):
-            logger.error(f"Expected list response, got: {type(results)}, data: {results}")
-            state["execution_result"] = [
-                {"command": cmd, "stdout": None, "stderr": "Invalid response format from server", "returncode": 1}
-                for cmd in commands
-            ]
-            state_update["execution_result"] = state["execution_result"]
-            logger.info(f"execute end state: {state}")
-            return {**state_update, "next": "finish"}
+        logger.info(f"Dispatching to {agent_url} with commands: {commands}, snapshot: {snapshot}, history: {history}")
 
-        state["execution_result"] = [
-            {
-                "command": result.get("command", cmd),
-                "stdout": result.get("stdout"),
-                "stderr": result.get("stderr"),
-                "returncode": result.get("returncode", 1)
-            }
-            for cmd, result in zip(commands, results)
-            if isinstance(result, dict)
-        ]
+        results = await collect(commands, target, agent_url, snapshot, history=history)
+
+        state["execution_result"] = [to_entry(result) for result in results]
 
         if not state["execution_result"]:
             logger.error(f"No valid ExecuteResponse objects in response: {results}")
@@ -86,17 +115,19 @@ def execute(state: AgentState) -> Dict:
         logger.info(f"execute end state: {state}")
         return {**state_update, "next": "analyze"}
 
-    except requests.RequestException as e:
-        logger.error(f"Agent request failed: {str(e)}")
+    except HTTPException as e:
+        # 미등록/비정상 Agent (fan_out과 같이 실패 결과로 반환)
+        logger.error(f"Agent lookup for {target} failed: {e.detail}")
         state["execution_result"] = [
-            {"command": cmd, "stdout": None, "stderr": f"Agent execution failed: {str(e)}", "returncode": 1}
-            for cmd in commands
+            {"command": cmd, "stdout": None, "stderr": e.detail, "returncode": 1}
+            for cmd in commands or [""]
         ]
         state_update["execution_result"] = state["execution_result"]
         logger.info(f"execute end state: {state}")
         return {**state_update, "next": "finish"}
+
     except ValidationError as e:
-        logger.error(f"Response validation failed: {str(e)}, data: {results}")
+        logger.error(f"Response validation failed: {str(e)}")
         state["execution_result"] = [
             {"command": cmd, "stdout": None, "stderr": f"Response validation failed: {str(e)}", "returncode": 1}
             for cmd in commands
@@ -1,27 +1,28 @@
 from server.workflow.state import AgentState
-import requests
-import json
+import re
 from typing import Dict
-from server.config import FASTAPI_HOST, FASTAPI_PORT
 from server.utils.logging import setup_logger
+from server.dispatch import latest_alarm_result
 
 logger = setup_logger(__name__)
 
-def fetch(state: AgentState) -> Dict:
-    """CloudWatch 메시지 조회."""
+INSTANCE_ID_PATTERN = re.compile(r"\bi-[0-9a-f]{8,17}\b")
+
+async def fetch(state: AgentState) -> Dict:
+    """CloudWatch 메시지 조회 (입력에 인스턴스 ID가 있으면 해당 인스턴스의 최근 알람)."""
     logger.info(f"fetch Start state: {state}")
     state_update = {}
 
-    try:
-        response = requests.get(f"http://{FASTAPI_HOST}:{FASTAPI_PORT}/commands")
-        logger.info(f"fetch response: {response.json()}")
-        response.raise_for_status()
-        messages = response.json()[-1:]  # 최근 1개
-        return {**messages[0], "next": "end"}
-    
-    except requests.RequestException as e:
-        state["final_answer"] = {"response": f"조회 실패: {str(e)}"}
+    user_input = (state.get("raw_input") or {}).get("user_input", "")
+    match = INSTANCE_ID_PATTERN.search(user_input)
+    instance_id = match.group(0) if match else None
+
+    message = latest_alarm_result(instance_id)  # 최근 1개
+    logger.info(f"fetch result: {message}")
+    if message is not None:
+        return {**message, "next": "end"}
 
+    state["final_answer"] = {"response": "조회 실패: 저장된 알람 메시지가 없습니다."}
     state_update["final_answer"] = state["final_answer"]
     logger.info(f"fetch end state: {state}")
-    return {**state_update, "next": "end"}
\ No newline at end of file
+    return {**state_update, "next": "end"}
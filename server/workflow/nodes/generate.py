@@ -1,18 +1,24 @@
 from server.workflow.state import AgentState
-from server.utils.llm import get_llm
+from server.utils.llm import get_async_llm
+from server.utils.llm_cache import llm_cache, fingerprint
+from server.utils.history import build_history
+from server.utils.telemetry import LLM_DURATION, record_llm_usage
+from server.utils.server_info import list_groups, resolve_targets
 import json
 from typing import Dict
 from server.utils.logging import setup_logger
 
 logger = setup_logger(__name__)
 
-def generate(state: AgentState) -> Dict:
+async def generate(state: AgentState) -> Dict:
     """입력 유형에 따라 CloudWatch 또는 Streamlit 요청을 분석하여 커맨드 리스트, 대상 인스턴스 ID, 의도 생성."""
     input_type = state.get("input_type")
     raw_input = state.get("raw_input", {})
     approved = state.get("approved", False)
     chat_history = state.get("chat_history", [])
-    client = get_llm()
+    client = get_async_llm()
+    # 최근 턴 + 이전 턴 요약 (generate 토큰 예산 내)
+    history = build_history(chat_history, "generate", state.get("history_summary"))
 
     prompt_settings = {
         "cloudwatch": {
@@ -30,27 +36,44 @@ def generate(state: AgentState) -> Dict:
     {settings["input_description"]}을 분석하여 리눅스 커맨드 리스트, 대상 인스턴스 ID, 커맨드 의도를 생성:
     입력: {json.dumps(raw_input, ensure_ascii=False)}
     {settings["target_instruction"]}
-    - 입력과 대화 기록를 기반으로 적절한 리눅스 커맨드를 생성 (예: CPU 사용량 확인 → ["ps aux --sort=-%cpu | head -n 10", "sar 1 5"]).
-    - 커맨드 생성이 불가능하면 commands를 빈 리스트([])로 설정, intent는 커맨드를 생성한 이유 설명.
-    - 대화 기록: {json.dumps(chat_history, ensure_ascii=False)}
+    - 여러 인스턴스가 대상이면 target에 인스턴스 ID 리스트, 그룹 이름 (등록된 그룹: {json.dumps(list_groups(), ensure_ascii=False)}) 또는 전체 인스턴스 "all" 지정 (같은 커맨드가 모든 대상에 동시 실행됨).
+    - 입력과 대화 기록를 기반으로 적절한 리눅스 커맨드를 생성 (예: 네트워크 연결 확인 → ["ss -tunap | head -n 20"]).
+    - CPU, 메모리, 부하, 디스크 사용량, 상위 프로세스 확인은 셸 커맨드(ps, free, df, sar 등) 대신 snapshot을 true로 설정 (Agent가 /proc에서 즉시 수집), 그 외 정보가 필요할 때만 commands에 커맨드 추가.
+    - 알람 발생 전후의 추이(순간 피크, 증가 추세)가 필요하면 history를 true로 설정 (Agent가 기록해 둔 최근 메트릭 이력 조회, CloudWatch 알람은 항상 true).
+    - 커맨드 생성이 불가능하고 snapshot, history도 필요 없으면 commands를 빈 리스트([])로 설정, intent는 커맨드를 생성한 이유 설명.
+    - 대화 기록: {json.dumps(history, ensure_ascii=False)}
     - 출력은 순수 JSON 문자열로, ```json, ```, 마크다운, 주석, 추가 텍스트를 절대 포함시키지 마세요.
     - JSON 형식:
     {{
       "commands": ["cmd1", ...] 또는 [],
-      "target": "i-123" 또는 null,
+      "snapshot": true 또는 false,
+      "history": true 또는 false,
+      "target": "i-123" 또는 ["i-123", "i-456"] 또는 "그룹 이름" 또는 null,
       "intent": "커맨드 생성 이유 설명"
     }}
     예시 입력: {{"AlarmName": "alt_cpu_high_alert", "Trigger": {{"MetricName": "CPUUtilization", "Dimensions": [{{"value": "i-123", "name": "InstanceId"}}]}}}}
-    예시 출력: {{"commands": ["ps aux --sort=-%cpu | head -n 10", "sar 1 5"], "target": "i-123", "intent": "높은 CPU 사용률은 애플리케이션 부하, 프로세스 문제, 또는 외부 테스트로 인한 것일 수 있음."}}
+    예시 출력: {{"commands": ["top -b -n 1 | head -n 5"], "snapshot": true, "history": true, "target": "i-123", "intent": "높은 CPU 사용률은 애플리케이션 부하, 프로세스 문제, 또는 외부 테스트로 인한 것일 수 있음."}}
     """
 
+    # 같은 유형의 알람/동일 요청은 캐시된 응답 재사용 (알람 타임스탬프, 데이터포인트 값은 키에서 제외)
+    cache_key = fingerprint("generate", "gpt-4o", {
+        "input_type": input_type,
+        "raw_input": raw_input,
+        "history": history
+    })
+
     try:
-        response = client.chat.completions.create(
-            model="gpt-4o",
-            messages=[{"role": "user", "content": prompt}]
-        )
-        logger.info(f"generate response: {response.choices[0].message.content}")
-        result = json.loads(response.choices[0].message.content)
+        content = llm_cache.get(cache_key)
+        if content is None:
+            with LLM_DURATION.time(call="generate", model="gpt-4o"):
+                response = await client.chat.completions.create(
+                    model="gpt-4o",
+                    messages=[{"role": "user", "content": prompt}]
+                )
+            record_llm_usage("generate", "gpt-4o", response.usage)
+            content = response.choices[0].message.content
+        logger.info(f"generate response: {content}")
+        result = json.loads(content)
 
         logger.info(f"generate Final result: {state}")
 
@@ -58,11 +81,14 @@ def generate(state: AgentState) -> Dict:
         state_update = {
             "command": result["commands"],
             "target": result["target"],
+            "targets": resolve_targets(result["target"]),
+            "include_snapshot": bool(result.get("snapshot")),
+            "include_history": bool(result.get("history")),
             "intent": result["intent"],
             "user_question": state.get("user_question", False)
         }
 
-        if not result["commands"] or len(result["commands"]) == 0:
+        if not result["commands"] and not state_update["include_snapshot"] and not state_update["include_history"]:
             state["final_answer"] = "커맨드를 생성할 수 없습니다."
             state["chat_history"] = state.get("chat_history", []) + [{
                 "user": {"content": raw_input.get("user_input", "")},
@@ -73,6 +99,7 @@ def generate(state: AgentState) -> Dict:
             logger.info(f"generate end state: {state}")
             return {**state_update, "next": "end"}
 
+        llm_cache.set(cache_key, content)
         if approved:
             return {**state_update, "next": "execute"}
         else:
@@ -0,0 +1,93 @@
+# server/workflow/registry.py
+import importlib
+import threading
+import time
+from typing import Dict, Optional
+from langgraph.checkpoint.base import BaseCheckpointSaver
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.graph.state import CompiledStateGraph
+from server.workflow.builder import build_workflow
+from server.utils.logging import setup_logger
+
+logger = setup_logger(__name__)
+
+# 워크플로우가 의존하는 노드 모듈 (기동 시 import 검증)
+NODE_MODULES = [
+    "server.workflow.nodes.receive",
+    "server.workflow.nodes.fetch",
+    "server.workflow.nodes.generate",
+    "server.workflow.nodes.execute",
+    "server.workflow.nodes.compact",
+    "server.workflow.nodes.analyze",
+]
+# 컴파일된 그래프에 반드시 존재해야 하는 노드
+REQUIRED_NODES = ["receive", "fetch", "generate", "execute", "compact", "analyze"]
+
+# 알람 조사용(승인 불필요) 그래프와 체크포인터 기반 채팅(승인 대기) 그래프
+ALARM_WORKFLOW = "alarm"
+CHAT_WORKFLOW = "chat"
+
+_lock = threading.Lock()
+_workflows: Dict[str, CompiledStateGraph] = {}
+_stats: Dict[str, float] = {
+    "builds": 0,
+    "build_seconds": 0.0,
+    "built_at": 0.0,
+    "reuses": 0,
+}
+
+
+def validate_workflow(workflow: CompiledStateGraph) -> None:
+    """컴파일된 그래프에 필수 노드가 모두 포함되었는지 검증."""
+    missing = [name for name in REQUIRED_NODES if name not in workflow.nodes]
+    if missing:
+        raise RuntimeError(f"워크플로우에 필수 노드가 없습니다: {missing}")
+
+
+def init_workflow(checkpointer: Optional[BaseCheckpointSaver] = None) -> Dict[str, CompiledStateGraph]:
+    """노드 import 검증 후 워크플로우를 1회 컴파일하여 등록 (서버 기동 시 호출).
+
+    checkpointer가 없으면 채팅 그래프는 프로세스 메모리 체크포인터를 사용한다.
+    """
+    with _lock:
+        if _workflows:
+            return _workflows
+
+        for module in NODE_MODULES:
+            try:
+                importlib.import_module(module)
+            except ImportError as e:
+                raise RuntimeError(f"노드 모듈 import 실패: {module}: {str(e)}") from e
+
+        started = time.perf_counter()
+        workflows = {
+            ALARM_WORKFLOW: build_workflow(),
+            CHAT_WORKFLOW: build_workflow(checkpointer or InMemorySaver()),
+        }
+        for workflow in workflows.values():
+            validate_workflow(workflow)
+        elapsed = time.perf_counter() - started
+
+        _stats["builds"] += len(workflows)
+        _stats["build_seconds"] = elapsed
+        _stats["built_at"] = time.time()
+        _workflows.update(workflows)
+        logger.info(f"Workflows {list(workflows)} compiled in {elapsed * 1000:.1f}ms")
+        return _workflows
+
+
+def get_workflow(name: str = ALARM_WORKFLOW) -> CompiledStateGraph:
+    """등록된 컴파일 그래프를 반환 (요청 경로에서는 재빌드하지 않음)."""
+    workflow = _workflows.get(name)
+    if workflow is None:
+        logger.warning("Workflow not initialized at startup, compiling now")
+        workflow = init_workflow()[name]
+    with _lock:
+        _stats["reuses"] += 1
+    return workflow
+
+
+def get_workflow_stats() -> Dict[str, float]:
+    """빌드 횟수, 빌드 소요 시간, 재사용 횟수 조회."""
+    with _lock:
+        return {**_stats, "initialized": bool(_workflows), "workflows": list(_workflows)}
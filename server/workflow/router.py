@@ -0,0 +1,112 @@
+# server/workflow/router.py
+import re
+from typing import Dict, List, Optional, Set, Tuple
+from server.config import ROUTER_CONFIDENCE_THRESHOLD
+from server.utils.logging import setup_logger
+
+logger = setup_logger(__name__)
+
+# receive 프롬프트의 분류 규칙
+FETCH_KEYWORDS = ("cloudwatch", "클라우드워치", "알람", "alarm", "로그", "메시지", "티켓")
+GENERATE_KEYWORDS = (
+    "cpu", "메모리", "memory", "디스크", "disk", "용량", "사용률", "프로세스", "process",
+    "부하", "load", "네트워크", "network", "스왑", "swap", "커맨드", "명령어",
+)
+INSTANCE_ID_PATTERN = re.compile(r"\bi-[0-9a-f]{17}\b")
+# 입력 자체가 리눅스 커맨드인 경우 (예: 'ls -l')
+SHELL_COMMANDS = {
+    "ls", "ps", "df", "du", "free", "top", "uptime", "sar", "iostat", "vmstat", "mpstat", "pidstat",
+    "netstat", "ss", "cat", "tail", "head", "grep", "dmesg", "lscpu", "lsblk", "uname", "journalctl",
+    "systemctl", "hostname", "ip", "ifconfig", "who", "whoami", "last",
+}
+# 커맨드 인자로 보이는 토큰 (옵션, 경로, 숫자, 파이프/리다이렉션, ps의 BSD 옵션)
+SHELL_ARGUMENT_PATTERN = re.compile(r"^(-\S*|\S*[/=.~]\S*|\d+[kmg%]?|[|<>&;]+|aux|axu|auxf)$")
+# 단어 토큰 (한글과 영문/숫자는 붙어 있어도 분리, 예: 'cpu사용률' -> 'cpu', '사용률')
+WORD_PATTERN = re.compile(r"[a-z0-9]+|[가-힣]+")
+# 한글 키워드 뒤에 붙을 수 있는 조사
+KOREAN_PARTICLES = (
+    "", "은", "는", "이", "가", "을", "를", "의", "에", "에서", "도", "만", "로", "으로", "과", "와", "좀", "들",
+)
+
+
+def is_command_line(tokens: List[str]) -> bool:
+    """
+    첫 토큰이 진단 커맨드이고 나머지가 모두 인자 형태인 입력 (예: 'free -h', 'tail -n 50 /var/log/syslog').
+    파이프 뒤(예: '| grep java')는 인자 형태를 검사하지 않는다.
+    """
+    if not tokens or tokens[0] not in SHELL_COMMANDS:
+        return False
+    for token in tokens[1:]:
+        if token == "|":
+            return True
+        if not SHELL_ARGUMENT_PATTERN.match(token):
+            return False
+    return True
+
+
+def keyword_matches(keyword: str, words: Set[str]) -> bool:
+    """키워드가 단어 단위로 일치하는지 (영문은 복수형, 한글은 조사 허용; '로그인'은 '로그'와 불일치)."""
+    if keyword.isascii():
+        return bool(words & {keyword, keyword + "s", keyword + "es"})
+    return any(keyword + particle in words for particle in KOREAN_PARTICLES)
+
+
+def classify_intent(text: str) -> Tuple[Optional[str], float]:
+    """
+    규칙 기반 요청 유형 분류.
+
+    Args:
+        text: 사용자 입력
+    Returns:
+        (fetch/generate 또는 None, 신뢰도 0~1). 한쪽 규칙만 일치하면 일치 수에 따라 0.8 이상,
+        양쪽 모두 일치하면 0.7 미만, 일치 규칙이 없으면 (None, 0.0)
+    """
+    lowered = text.strip().lower()
+    if lowered.isascii() and is_command_line(lowered.split()):
+        return "generate", 0.95
+
+    words = set(WORD_PATTERN.findall(lowered))
+    scores = {
+        "fetch": sum(1 for keyword in FETCH_KEYWORDS if keyword_matches(keyword, words)),
+        "generate": sum(1 for keyword in GENERATE_KEYWORDS if keyword_matches(keyword, words))
+                    + (1 if INSTANCE_ID_PATTERN.search(lowered) else 0),
+    }
+    intent = max(scores, key=scores.get)
+    winner, loser = scores[intent], min(scores.values())
+    if winner == 0:
+        return None, 0.0
+    if loser == 0:
+        return intent, round(min(0.7 + 0.1 * winner, 0.99), 2)
+    return intent, round(0.7 * (winner - loser) / (winner + loser), 2)
+
+
+class IntentRouter:
+    """규칙 기반 분류 우선, 신뢰도가 낮은 입력만 LLM 분류로 넘김 (경로별 통계 기록)."""
+
+    def __init__(self, threshold: float):
+        self.threshold = threshold
+        self.stats = {"rule": 0, "llm": 0, "fetch": 0, "generate": 0}
+
+    def route(self, text: str) -> Optional[str]:
+        """신뢰도가 임계값 이상이면 fetch/generate, 아니면 None (LLM 분류 필요)."""
+        intent, confidence = classify_intent(text)
+        if intent is None or confidence < self.threshold:
+            logger.info(f"Rule routing ambiguous (intent={intent}, confidence={confidence:.2f}), falling back to LLM")
+            self.stats["llm"] += 1
+            return None
+        logger.info(f"Rule routing: {intent} (confidence={confidence:.2f})")
+        self.stats["rule"] += 1
+        self.stats[intent] += 1
+        return intent
+
+    def record(self, intent: str) -> None:
+        """LLM 분류 결과 집계."""
+        if intent in ("fetch", "generate"):
+            self.stats[intent] += 1
+
+    def get_stats(self) -> Dict:
+        total = self.stats["rule"] + self.stats["llm"]
+        return {**self.stats, "fast_path_ratio": self.stats["rule"] / total if total else 0.0}
+
+
+intent_router = IntentRouter(ROUTER_CONFIDENCE_THRESHOLD)
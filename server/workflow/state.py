@@ -5,10 +5,17 @@ class AgentState(TypedDict):
     input_type: str # 입력 유형: 'streamlit' 또는 'cloudwatch'
     raw_input: Dict # 원본 입력: Streamlit 텍스트 또는 CloudWatch 알람 JSON
     command: Optional[List[str]] # 생성된 리눅스 커맨드
-    target: Optional[str] # 대상 인스턴스 ID
+    target: Optional[str] # 대상 인스턴스 ID (또는 그룹 이름, 인스턴스 ID 리스트)
+    targets: Optional[List[str]] # target을 풀어낸 실행 대상 인스턴스 ID 리스트 (2개 이상이면 동시 실행)
+    include_snapshot: Optional[bool] # True면 커맨드와 함께 Agent 메트릭 스냅샷(/metrics/snapshot) 조회
+    include_history: Optional[bool] # True면 알람 발생 전부터의 Agent 메트릭 이력(/metrics/history) 조회
     approved: Optional[bool] # 사용자 승인 여부: True, False, None
     execution_result: Optional[Dict] # 커맨드 실행 결과
+    compacted_result: Optional[List[Dict]] # analyze 프롬프트용으로 압축된 실행 결과
+    compaction: Optional[Dict] # 압축 시 제거된 내역
     final_answer: Optional[Dict] # 최종 User 리턴 메시지
-    chat_history: List[Dict] # 현재 워크플로우의 채팅 히스토리
+    chat_history: List[Dict] # 현재 워크플로우의 채팅 히스토리 (요약되지 않은 최근 턴)
+    history_summary: Optional[str] # 이전 턴 롤링 요약
     intent: Optional[str] # 커맨드 생성 의도
-    user_question: Optional[str] # 사용자 질문
\ No newline at end of file
+    user_question: Optional[str] # 사용자 질문
+    occurrences: Optional[List[Dict]] # 병합된 동일 알람 발생 내역 (cloudwatch)
\ No newline at end of file
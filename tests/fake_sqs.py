@@ -0,0 +1,57 @@
+import json
+import threading
+import time
+
+QUEUE_URL = "http://sqs.local/queue/alarms"
+# SQS 배치 API 최대 엔트리 수 (server.sqs_puller.SQS_BATCH_SIZE)
+BATCH_SIZE = 10
+
+
+def sqs_message(index, body=None):
+    alarm = {"AlarmName": f"alarm-{index}", "NewStateValue": "ALARM"}
+    return {
+        "MessageId": f"m{index}",
+        "ReceiptHandle": f"r{index}",
+        "Body": json.dumps({"Message": json.dumps(alarm)}) if body is None else body,
+    }
+
+
+class FakeSQS:
+    """receive/delete/change_visibility 배치 호출을 기록하는 SQS 클라이언트."""
+
+    def __init__(self, messages=()):
+        self.queue = list(messages)
+        self.receives = []
+        self.deletes = []
+        self.visibility_changes = []
+        self._lock = threading.Lock()
+
+    def send(self, message):
+        with self._lock:
+            self.queue.append(message)
+
+    def receive_message(self, QueueUrl, MaxNumberOfMessages, WaitTimeSeconds, VisibilityTimeout):
+        assert QueueUrl == QUEUE_URL and 1 <= MaxNumberOfMessages <= BATCH_SIZE
+        with self._lock:
+            batch, self.queue = self.queue[:MaxNumberOfMessages], self.queue[MaxNumberOfMessages:]
+            self.receives.append(MaxNumberOfMessages)
+        if not batch:
+            time.sleep(0.01)  # 롱 폴링 대기 흉내 (빈 큐에서 바쁜 반복 방지)
+        return {"Messages": batch} if batch else {}
+
+    def deleted(self):
+        with self._lock:
+            return [message_id for batch in self.deletes for message_id in batch]
+
+    def delete_message_batch(self, QueueUrl, Entries):
+        assert QueueUrl == QUEUE_URL and len(Entries) <= BATCH_SIZE
+        with self._lock:
+            self.deletes.append([entry["Id"] for entry in Entries])
+        return {"Successful": [{"Id": entry["Id"]} for entry in Entries]}
+
+    def change_message_visibility_batch(self, QueueUrl, Entries):
+        assert QueueUrl == QUEUE_URL and len(Entries) <= BATCH_SIZE
+        with self._lock:
+            self.visibility_changes.append(
+                sorted((entry["Id"], entry["VisibilityTimeout"]) for entry in Entries))
+        return {"Successful": [{"Id": entry["Id"]} for entry in Entries]}
@@ -0,0 +1,55 @@
+import threading
+import time
+from server.utils.agent_registry import AgentRegistry
+
+
+def agent(instance_id, group="web"):
+    return {"instance_id": instance_id, "url": f"http://{instance_id}:9917", "group": group}
+
+
+def test_register_then_heartbeat_updates_entry():
+    registry = AgentRegistry(30)
+    registry.upsert(agent("i-1"), register=True)
+    entry = registry.upsert({**agent("i-1"), "url": "http://new:9917"})
+    assert registry.get("i-1") is entry and entry["url"] == "http://new:9917"
+    assert registry.stats == {"registered": 1, "heartbeats": 1, "expired": 0}
+
+
+def test_unknown_heartbeat_registers():
+    registry = AgentRegistry(30)
+    registry.upsert(agent("i-1"))
+    assert registry.stats["registered"] == 1
+
+
+def test_stale_agent_is_unhealthy_then_pruned():
+    registry = AgentRegistry(30)
+    registry.upsert(agent("i-1"))
+    registry.upsert(agent("i-2"))["last_seen"] = time.time() - 60
+    assert [entry["instance_id"] for entry in registry.healthy()] == ["i-1"]
+    assert {entry["instance_id"]: entry["healthy"] for entry in registry.snapshot()} == {"i-1": True, "i-2": False}
+    assert registry.prune(45) == 1
+    assert registry.get("i-2") is None and registry.stats["expired"] == 1
+
+
+def test_concurrent_heartbeats_and_reads():
+    registry = AgentRegistry(0.001)
+    stop = threading.Event()
+
+    def writer(offset):
+        n = 0
+        while not stop.is_set():
+            registry.upsert(agent(f"i-{offset}-{n % 200}"))
+            registry.prune(0.0005)
+            n += 1
+
+    threads = [threading.Thread(target=writer, args=(i,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    try:
+        for _ in range(2000):
+            registry.snapshot()
+            registry.healthy()
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join()
@@ -0,0 +1,47 @@
+import pytest
+from server.utils import alarm_store
+from server.utils.alarm_store import AlarmStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = AlarmStore(str(tmp_path / "alarms.db"), memory_size=2)
+    yield store
+    store.close()
+
+
+def test_add_and_get(store):
+    record_id = store.add({"final_answer": "CPU 과다 사용"}, "i-1", "cpu-high", "CPUUtilization")
+    record = store.get(record_id)
+    assert record["final_answer"] == "CPU 과다 사용" and record["id"] == record_id
+    assert store.get(record_id + 100) is None
+
+
+def test_records_evicted_from_memory_are_read_from_sqlite(store):
+    ids = [store.add({"n": n}, "i-1", "cpu-high", "CPUUtilization") for n in range(4)]
+    assert ids[0] not in store._recent
+    assert store.get(ids[0])["n"] == 0
+
+
+def test_query_filters_newest_first(store, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(alarm_store.time, "time", lambda: now[0])
+    for n, instance_id in enumerate(["i-1", "i-2", "i-1", "i-1"]):
+        now[0] += 10
+        store.add({"n": n}, instance_id, "cpu-high" if n < 3 else "mem-high", None)
+    assert [r["n"] for r in store.query(instance_id="i-1")] == [3, 2, 0]
+    assert [r["n"] for r in store.query(alarm_name="cpu-high", limit=2)] == [2, 1]
+    assert [r["n"] for r in store.query(since=1020.0, until=1040.0)] == [2, 1]
+    assert [r["n"] for r in store.query(limit=2, offset=2)] == [1, 0]
+    assert store.latest("i-2")["n"] == 1
+    assert store.latest("i-9") is None
+
+
+def test_update_persists(store, tmp_path):
+    record_id = store.add({"final_answer": "x"}, "i-1", "cpu-high", None)
+    store.update(record_id, {"occurrences": [1, 2]})
+    assert store.get(record_id)["occurrences"] == [1, 2]
+    reopened = AlarmStore(str(tmp_path / "alarms.db"))
+    assert reopened.get(record_id)["occurrences"] == [1, 2]
+    assert reopened.get(record_id)["final_answer"] == "x"
+    reopened.close()
@@ -0,0 +1,55 @@
+from server.utils import coalesce
+from server.utils.coalesce import AlarmCoalescer, alarm_key
+
+
+def alarm(instance_id="i-1", metric="CPUUtilization", name="cpu-high", state_time="2025-05-14T01:58:11"):
+    return {
+        "AlarmName": name,
+        "StateChangeTime": state_time,
+        "NewStateValue": "ALARM",
+        "Trigger": {"MetricName": metric, "Dimensions": [{"name": "InstanceId", "value": instance_id}]},
+    }
+
+
+def test_alarm_key():
+    assert alarm_key(alarm()) == ("i-1", "CPUUtilization", "cpu-high")
+    assert alarm_key({"AlarmName": "x"}) == (None, None, "x")
+
+
+def test_duplicates_join_in_flight_investigation():
+    coalescer = AlarmCoalescer(300)
+    is_new, entry = coalescer.claim(alarm())
+    assert is_new
+    again, joined = coalescer.claim(alarm(state_time="2025-05-14T01:59:11"))
+    assert not again and joined is entry
+    assert [o["state_change_time"] for o in entry["occurrences"]] == ["2025-05-14T01:58:11", "2025-05-14T01:59:11"]
+    assert coalescer.claim(alarm(instance_id="i-2"))[0]
+    assert coalescer.stats == {"investigations": 2, "coalesced": 1}
+
+
+def test_finished_entry_expires_after_window(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(coalesce.time, "time", lambda: now[0])
+    coalescer = AlarmCoalescer(300)
+    _, entry = coalescer.claim(alarm())
+    coalescer.finish(entry, {"final_answer": "ok"})
+    now[0] += 200
+    assert not coalescer.claim(alarm())[0]
+    now[0] += 200
+    assert coalescer.claim(alarm())[0]
+
+
+def test_in_flight_entry_is_not_expired(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(coalesce.time, "time", lambda: now[0])
+    coalescer = AlarmCoalescer(300)
+    coalescer.claim(alarm())
+    now[0] += 1000
+    assert not coalescer.claim(alarm())[0]
+
+
+def test_failed_investigation_is_retried():
+    coalescer = AlarmCoalescer(300)
+    _, entry = coalescer.claim(alarm())
+    coalescer.finish(entry, None)
+    assert coalescer.claim(alarm())[0]
@@ -0,0 +1,66 @@
+from agent import cache
+from agent.cache import CACHE_SHORT_TTL, CACHE_STATIC_TTL, CommandCache, normalize_command, ttl_for
+from agent.models.models import ExecuteResponse
+
+
+def result(command, returncode=0):
+    return ExecuteResponse(command=command, stdout="out", stderr="", returncode=returncode)
+
+
+def test_ttl_by_command_class():
+    assert ttl_for("lscpu") == CACHE_STATIC_TTL
+    assert ttl_for("df -h") == CACHE_SHORT_TTL
+    assert ttl_for("top -bn1") == 0
+    assert ttl_for("dfx") == 0
+
+
+def test_pipeline_ttl_ignores_filters_and_takes_minimum():
+    assert ttl_for("df -h | grep /dev | sort") == CACHE_SHORT_TTL
+    assert ttl_for("lscpu && free -m") == CACHE_SHORT_TTL
+    assert ttl_for("uptime; ps aux") == 0
+
+
+def test_hit_ignores_whitespace_and_keeps_requested_command():
+    commands = CommandCache()
+    commands.put("df  -h", result("df  -h"))
+    hit = commands.get(" df -h ")
+    assert hit is not None and hit.command == " df -h " and hit.stdout == "out"
+    assert normalize_command(" df  -h ") == "df -h"
+    assert commands.stats["hits"] == 1
+
+
+def test_failed_and_uncacheable_results_are_not_stored():
+    commands = CommandCache()
+    commands.put("df -h", result("df -h", returncode=1))
+    commands.put("ps aux", result("ps aux"))
+    assert commands.get("df -h") is None and commands.get("ps aux") is None
+    assert commands.stats["misses"] == 2
+
+
+def test_entries_expire(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now[0])
+    commands = CommandCache()
+    commands.put("free -m", result("free -m"))
+    now[0] += CACHE_SHORT_TTL - 1
+    assert commands.get("free -m") is not None
+    now[0] += 2
+    assert commands.get("free -m") is None
+
+
+def test_lru_eviction():
+    commands = CommandCache(max_entries=2)
+    for command in ("lscpu", "nproc", "uname -a"):
+        commands.put(command, result(command))
+    assert commands.get("lscpu") is None
+    assert commands.get("uname -a") is not None
+    assert commands.stats["evictions"] == 1
+
+
+def test_redirection_and_substitution_are_not_cached():
+    for command in ("df -h > /tmp/x", "df -h 2>&1", "free -m < /dev/null", "uptime $(touch /tmp/x)",
+                    "uname -a `id`", "df -h | grep / > /tmp/x"):
+        assert ttl_for(command) == 0, command
+    commands = CommandCache()
+    commands.put("df -h > /tmp/x", result("df -h > /tmp/x"))
+    assert commands.get("df -h > /tmp/x") is None
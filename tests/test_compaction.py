@@ -0,0 +1,58 @@
+from server.utils.compaction import collapse_duplicates, compact_results, head_tail, prune_columns
+from server.utils.tokens import estimate_tokens, truncate_tokens
+
+
+def test_truncate_tokens_respects_budget_for_korean_text():
+    text = "디스크 사용률이 임계치를 초과했습니다 " * 50
+    clipped = truncate_tokens(text, 100)
+    assert estimate_tokens(clipped) <= 100
+    assert estimate_tokens(text[:len(clipped) + 1]) > 100
+    assert truncate_tokens("short", 100) == "short"
+
+
+def test_head_tail_truncates_long_korean_line_within_budget():
+    lines, omitted = head_tail(["가" * 2000], 100)
+    assert estimate_tokens("\n".join(lines)) <= 100
+    assert lines[0].endswith("...[truncated]")
+    assert omitted == 0
+
+
+def test_head_tail_keeps_head_and_tail_within_budget():
+    lines = [f"line {i} 오류 발생" for i in range(200)]
+    result, omitted = head_tail(lines, 120)
+    assert estimate_tokens("\n".join(result)) <= 120
+    assert result[0] == "line 0 오류 발생" and result[-1] == "line 199 오류 발생"
+    assert f"... [{omitted} lines omitted] ..." in result
+    assert len(result) - 1 + omitted == len(lines)
+
+
+def test_head_tail_returns_lines_that_fit():
+    assert head_tail(["a", "b"], 100) == (["a", "b"], 0)
+
+
+def test_collapse_duplicates():
+    lines, removed = collapse_duplicates(["a", "a", "a", "b", "a"])
+    assert lines == ["a  [x3]", "b", "a"]
+    assert removed == 2
+
+
+def test_prune_columns_drops_ps_columns():
+    lines = [
+        "USER PID %CPU %MEM VSZ RSS TTY STAT START TIME COMMAND",
+        "root 1 0.0 0.1 1000 200 ? Ss 10:00 0:01 /sbin/init splash",
+    ]
+    result, pruned = prune_columns(lines)
+    assert result == ["USER PID %CPU %MEM COMMAND", "root 1 0.0 0.1 /sbin/init splash"]
+    assert pruned == ["VSZ", "RSS", "TTY", "STAT", "START", "TIME"]
+
+
+def test_compact_results_fits_budget_and_reports_drops():
+    results = [
+        {"command": "journalctl", "stdout": "\n".join(f"로그 {i}" for i in range(500)), "stderr": ""},
+        {"command": "uptime", "stdout": "load average: 0.1, 0.2, 0.3", "stderr": ""},
+    ]
+    compacted, report = compact_results(results, 300)
+    assert report["final_tokens"] <= 300
+    assert compacted[1]["stdout"] == results[1]["stdout"]
+    assert [entry["command"] for entry in report["dropped"]] == ["journalctl"]
+    assert report["dropped"][0]["omitted_lines"] > 0
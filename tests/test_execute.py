@@ -0,0 +1,35 @@
+import asyncio
+import pytest
+from server.utils import server_info
+from server.utils.agent_registry import AgentRegistry
+from server.workflow.nodes import execute as execute_node
+from server.workflow.nodes.execute import execute
+
+
+@pytest.fixture
+def no_dispatch(monkeypatch):
+    async def collect(*args, **kwargs):
+        raise AssertionError("agent must not be called")
+    monkeypatch.setattr(execute_node, "collect", collect)
+    monkeypatch.setattr(execute_node, "fan_out", collect)
+
+
+@pytest.mark.parametrize("target", ["all", "wbe", ["i-unknown"]])
+def test_unresolved_target_returns_failed_result(no_dispatch, target):
+    update = asyncio.run(execute({"command": ["uptime", "df -h"], "target": target, "targets": []}))
+    assert update["next"] == "finish"
+    assert [entry["command"] for entry in update["execution_result"]] == ["uptime", "df -h"]
+    assert all(entry["returncode"] == 1 and "대상 인스턴스를 찾을 수 없음" in entry["stderr"]
+               for entry in update["execution_result"])
+
+
+def test_unhealthy_agent_returns_failed_result(no_dispatch, monkeypatch):
+    registry = AgentRegistry(30)
+    registry.upsert({"instance_id": "i-web1", "url": "http://10.0.1.1:9917"})["last_seen"] = 0
+    monkeypatch.setattr(server_info, "agent_registry", registry)
+    update = asyncio.run(execute({"command": ["uptime"], "target": "i-web1", "targets": ["i-web1"]}))
+    assert update["next"] == "finish"
+    assert update["execution_result"] == [{
+        "command": "uptime", "stdout": None, "returncode": 1,
+        "stderr": "Agent for i-web1 is unhealthy (no heartbeat)",
+    }]
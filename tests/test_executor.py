@@ -0,0 +1,59 @@
+import asyncio
+import threading
+import time
+from agent import executor
+from agent.executor import execute_command, stream_commands
+
+
+def collect(commands, timeout=None, max_bytes=None):
+    async def run():
+        return [event async for event in stream_commands(commands, timeout, max_bytes)]
+    return asyncio.run(run())
+
+
+def test_stream_emits_output_exit_and_done():
+    events = collect(["printf hello", "echo oops >&2; exit 3"])
+    assert events[-1] == {"event": "done"}
+    exits = {event["index"]: event for event in events if event["event"] == "exit"}
+    assert exits[0]["returncode"] == 0 and exits[1]["returncode"] == 3
+    output = lambda name, index: "".join(e["data"] for e in events if e["event"] == name and e["index"] == index)
+    assert output("stdout", 0) == "hello"
+    assert output("stderr", 1) == "oops\n"
+
+
+def test_stream_caps_output_bytes():
+    events = collect(["yes x | head -c 100000"], max_bytes=1000)
+    data = "".join(event["data"] for event in events if event["event"] == "stdout")
+    exit_event = next(event for event in events if event["event"] == "exit")
+    assert len(data) == 1000
+    assert exit_event["truncated"] and exit_event["returncode"] == 0
+
+
+def test_stream_timeout_kills_command():
+    started = time.monotonic()
+    events = collect(["sleep 5"], timeout=1)
+    exit_event = next(event for event in events if event["event"] == "exit")
+    assert exit_event["returncode"] == 1 and exit_event["error"] == "1s timeout"
+    assert events[-1] == {"event": "done"}
+    assert time.monotonic() - started < 3
+
+
+def test_streams_and_execute_share_shell_slots(monkeypatch):
+    monkeypatch.setattr(executor, "_shell_slots", threading.BoundedSemaphore(1))
+
+    async def run():
+        async def stream():
+            return [event async for event in stream_commands(["sleep 0.3"])]
+        started = time.monotonic()
+        await asyncio.gather(stream(), stream())
+        return time.monotonic() - started
+
+    # 슬롯 1개: 두 스트림의 셸이 순차 실행
+    assert asyncio.run(run()) >= 0.6
+
+    executor._shell_slots.acquire()
+    try:
+        result = execute_command(["echo hi"], timeout=1, bypass_cache=True)
+    finally:
+        executor._shell_slots.release()
+    assert result[0].returncode == 1 and result[0].stderr == "1s timeout"
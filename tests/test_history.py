@@ -0,0 +1,103 @@
+import asyncio
+import pytest
+from server.utils import history
+from server.utils.history import build_history, fold_session, summarizer
+from server.utils.session_store import SessionStore
+from server.utils.tokens import estimate_json_tokens, estimate_tokens
+
+
+def turn(n, answer="ok"):
+    return {"user": {"content": f"질문 {n}"}, "assistant": {"content": answer}}
+
+
+@pytest.fixture
+def folds(monkeypatch):
+    """LLM 대신 접힌 턴 수를 기록하는 요약기."""
+    calls = []
+
+    async def fake_fold(previous, turns):
+        calls.append(len(turns))
+        return f"{previous or ''}|{','.join(t['user']['content'] for t in turns)}"
+
+    monkeypatch.setattr(summarizer, "_fold", fake_fold)
+    monkeypatch.setattr(summarizer, "stats", {"folds": 0, "folded_turns": 0, "failed": 0})
+    return calls
+
+
+def test_build_history_empty():
+    assert build_history([], "receive") == {"summary": None, "recent_turns": []}
+
+
+def test_build_history_keeps_recent_turns_and_summary():
+    result = build_history([turn(n) for n in range(5)], "generate", "이전 요약")
+    assert result["summary"] == "이전 요약"
+    assert [t["user"] for t in result["recent_turns"]] == ["질문 2", "질문 3", "질문 4"]
+
+
+def test_build_history_fits_node_budget():
+    report = "\n".join(f"| 프로세스 {i} | CPU {i}% |" for i in range(300))
+    summary = "\n".join(f"요약 {i} 인스턴스 i-08fb8abe21e6fa058" for i in range(200))
+    result = build_history([turn(n, report) for n in range(3)], "receive", summary)
+    assert estimate_tokens(result["summary"]) <= 200
+    assert estimate_json_tokens(result) <= 400 + 50  # JSON 구문 여유분
+
+
+def test_long_conversation_folds_one_turn_per_message(folds):
+    async def run():
+        sessions = SessionStore(10, 3600, 100)
+        session = sessions.get()
+        for n in range(150):
+            async with session.lock:
+                sessions.append_turn(session, f"질문 {n}", "ok")
+            await fold_session(session)
+        return session
+
+    session = asyncio.run(run())
+    # 최대 턴 수에 도달한 뒤에도 매 메시지마다 새 턴 1개만 요약
+    assert folds == [1] * 147
+    assert len(session.history) == 3
+    assert session.summary.endswith("질문 146")
+    assert summarizer.stats["folded_turns"] == 147
+
+
+def test_failed_fold_keeps_turns_for_next_attempt(folds, monkeypatch):
+    async def run():
+        sessions = SessionStore(10, 3600, 100)
+        session = sessions.get()
+        for n in range(4):
+            sessions.append_turn(session, f"질문 {n}", "ok")
+
+        async def broken(previous, turns):
+            raise RuntimeError("rate limited")
+
+        original = summarizer._fold
+        monkeypatch.setattr(summarizer, "_fold", broken)
+        await fold_session(session)
+        assert len(session.history) == 4 and session.summary is None
+
+        monkeypatch.setattr(summarizer, "_fold", original)
+        sessions.append_turn(session, "질문 4", "ok")
+        await fold_session(session)
+        return session
+
+    session = asyncio.run(run())
+    assert folds == [2]
+    assert session.summary == "|질문 0,질문 1"
+    assert summarizer.stats["failed"] == 1
+
+
+def test_schedule_fold_waits_for_session_lock(folds):
+    async def run():
+        sessions = SessionStore(10, 3600, 100)
+        session = sessions.get()
+        async with session.lock:
+            for n in range(4):
+                sessions.append_turn(session, f"질문 {n}", "ok")
+            history.schedule_fold(session)
+            await asyncio.sleep(0.01)
+            assert folds == []
+        await asyncio.gather(*history._pending_folds)
+        return session
+
+    session = asyncio.run(run())
+    assert folds == [1] and len(session.history) == 3
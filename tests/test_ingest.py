@@ -0,0 +1,103 @@
+import asyncio
+import json
+from fake_sqs import QUEUE_URL, FakeSQS, sqs_message
+from server.ingest import AlarmIngestor
+
+
+async def wait_until(condition, timeout=2.0):
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while not condition():
+        assert loop.time() < deadline, "condition not met in time"
+        await asyncio.sleep(0.01)
+
+
+def ingestor(sqs, handler, queue_size=4, workers=2, visibility_timeout=60):
+    return AlarmIngestor(sqs, QUEUE_URL, handler, queue_size, workers, visibility_timeout, wait_time_seconds=0)
+
+
+def test_receive_stops_while_queue_is_full():
+    async def run():
+        sqs = FakeSQS([sqs_message(i) for i in range(5)])
+        release = asyncio.Event()
+
+        async def handler(alarm):
+            await release.wait()
+
+        consumer = ingestor(sqs, handler, queue_size=2)
+        await consumer.start()
+        await wait_until(lambda: consumer.stats["received"] == 2)
+        await asyncio.sleep(0.1)
+        # 빈 자리가 없으므로 추가 수신 없이 대기
+        assert consumer._free_slots() == 0 and not consumer._space.is_set()
+        assert sqs.receives == [2] and len(sqs.queue) == 3
+
+        release.set()
+        await wait_until(lambda: consumer.stats["processed"] == 5)
+        await consumer.stop()
+        assert sorted(sqs.deleted()) == [f"m{i}" for i in range(5)]
+        assert all(count <= 2 for count in sqs.receives)
+
+    asyncio.run(run())
+
+
+def test_processed_messages_are_acked_in_batches():
+    async def run():
+        sqs = FakeSQS([sqs_message(i) for i in range(25)])
+        handled = []
+
+        async def handler(alarm):
+            handled.append(alarm.raw_data["AlarmName"])
+
+        consumer = ingestor(sqs, handler, queue_size=25, workers=4)
+        await consumer.start()
+        await wait_until(lambda: len(sqs.deleted()) == 25)
+        await consumer.stop()
+        assert len(handled) == 25
+        assert sorted(sqs.deleted()) == sorted(f"m{i}" for i in range(25))
+        assert all(len(batch) <= 10 for batch in sqs.deletes)
+
+    asyncio.run(run())
+
+
+def test_failed_investigation_is_not_acked():
+    async def run():
+        sqs = FakeSQS([sqs_message(0), sqs_message(1)])
+
+        async def handler(alarm):
+            if alarm.raw_data["AlarmName"] == "alarm-1":
+                raise RuntimeError("boom")
+
+        consumer = ingestor(sqs, handler)
+        await consumer.start()
+        await wait_until(lambda: consumer.stats["processed"] + consumer.stats["failed"] == 2)
+        await consumer.stop()
+        assert sqs.deleted() == ["m0"]
+
+    asyncio.run(run())
+
+
+def test_malformed_messages_are_deleted_and_receive_continues():
+    async def run():
+        sqs = FakeSQS([
+            sqs_message(0, body='"x"'),                                  # TypeError
+            sqs_message(1, body=json.dumps({"Message": "[1,2]"})),       # ValidationError
+            sqs_message(2, body="not json"),                             # JSONDecodeError
+            sqs_message(3, body=json.dumps({"Subject": "no message"})),  # KeyError
+        ])
+        handled = []
+
+        async def handler(alarm):
+            handled.append(alarm.raw_data["AlarmName"])
+
+        consumer = ingestor(sqs, handler)
+        await consumer.start()
+        await wait_until(lambda: consumer.stats["invalid"] == 4)
+        sqs.send(sqs_message(4))
+        await wait_until(lambda: handled == ["alarm-4"])
+        receive_task = consumer._tasks[0]
+        assert not receive_task.done()
+        await consumer.stop()
+        assert sorted(sqs.deleted()) == ["m0", "m1", "m2", "m3", "m4"]
+
+    asyncio.run(run())
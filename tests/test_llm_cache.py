@@ -0,0 +1,71 @@
+import copy
+from server.utils.llm_cache import LLMResponseCache, MemoryBackend, fingerprint
+
+ALARM = {
+    "AlarmName": "alt_cpu_high_alert",
+    "AlarmConfigurationUpdatedTimestamp": "2025-05-13T09:50:08.366+0000",
+    "NewStateValue": "ALARM",
+    "NewStateReason": "Threshold Crossed: 1 out of the last 1 datapoints [94.10166666666666 (14/05/25 01:55:00)] "
+                      "was greater than or equal to the threshold (90.0).",
+    "StateChangeTime": "2025-05-14T01:58:11.589+0000",
+    "Trigger": {
+        "MetricName": "CPUUtilization",
+        "Dimensions": [{"value": "i-08fb8abe21e6fa058", "name": "InstanceId"}],
+        "Threshold": 90.0,
+    },
+}
+
+
+def alarm_input(**changes):
+    alarm = copy.deepcopy(ALARM)
+    trigger = changes.pop("Trigger", {})
+    alarm.update(changes)
+    alarm["Trigger"].update(trigger)
+    return {"input_type": "cloudwatch", "raw_input": {"raw_data": alarm}, "history": ""}
+
+
+def test_alarm_timestamps_and_datapoints_are_ignored():
+    other = alarm_input(
+        StateChangeTime="2025-05-15T03:00:00.000+0000",
+        NewStateReason="Threshold Crossed: 1 out of the last 1 datapoints [97.5 (15/05/25 02:59:00)] "
+                       "was greater than or equal to the threshold (85.0).",
+        Trigger={"Threshold": 85.0},
+    )
+    assert fingerprint("generate", "gpt-4o", alarm_input()) == fingerprint("generate", "gpt-4o", other)
+
+
+def test_alarm_identity_changes_key():
+    other = alarm_input(Trigger={"Dimensions": [{"value": "i-0aaaaaaaaaaaaaaaa", "name": "InstanceId"}]})
+    assert fingerprint("generate", "gpt-4o", alarm_input()) != fingerprint("generate", "gpt-4o", other)
+    assert fingerprint("generate", "gpt-4o", alarm_input(NewStateValue="OK")) != \
+        fingerprint("generate", "gpt-4o", alarm_input())
+
+
+def test_chat_input_is_keyed_on_exact_text():
+    assert fingerprint("receive", "gpt-4o", "10.0.1.5 서버 디스크 확인") != \
+        fingerprint("receive", "gpt-4o", "10.0.2.7 서버 디스크 확인")
+    assert fingerprint("receive", "gpt-4o", "CPU 확인") != fingerprint("receive", "gpt-4o", "cpu 확인")
+    chat = {"input_type": "streamlit", "raw_input": {"user_input": "load 1.5 이상 서버"}, "history": ""}
+    other = {"input_type": "streamlit", "raw_input": {"user_input": "load 3.0 이상 서버"}, "history": ""}
+    assert fingerprint("generate", "gpt-4o", chat) != fingerprint("generate", "gpt-4o", other)
+
+
+def test_key_includes_namespace_and_model():
+    assert fingerprint("receive", "gpt-4o", "top") != fingerprint("generate", "gpt-4o", "top")
+    assert fingerprint("receive", "gpt-4o", "top") != fingerprint("receive", "gpt-4o-mini", "top")
+
+
+def test_memory_backend_evicts_oldest_and_counts_hits():
+    cache = LLMResponseCache(MemoryBackend(2), ttl=60)
+    cache.set("receive:a", "1")
+    cache.set("receive:b", "2")
+    assert cache.get("receive:a") == "1"
+    cache.set("receive:c", "3")
+    assert cache.get("receive:b") is None
+    assert cache.stats["receive"] == {"memory_hits": 1, "disk_hits": 0, "misses": 1}
+
+
+def test_disabled_cache_never_stores():
+    cache = LLMResponseCache(MemoryBackend(2), enabled=False)
+    cache.set("receive:a", "1")
+    assert cache.get("receive:a") is None
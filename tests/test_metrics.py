@@ -0,0 +1,83 @@
+from agent import metrics
+from agent.metrics import PAGE_SIZE, cpu_percent, read_cpu_times, read_memory, read_processes
+
+MEMINFO = """MemTotal:        8000000 kB
+MemFree:         1000000 kB
+MemAvailable:    6000000 kB
+Buffers:          200000 kB
+Cached:          3000000 kB
+SwapTotal:       2000000 kB
+SwapFree:        1500000 kB
+HugePages_Total:       0
+"""
+
+
+def proc_stat(pid, comm, utime, stime, rss_pages):
+    # pid (comm) state ppid ... utime(14) stime(15) ... rss(24)
+    fields = ["S", "1"] + ["0"] * 9 + [str(utime), str(stime)] + ["0"] * 8 + [str(rss_pages)] + ["0"] * 20
+    return f"{pid} ({comm}) " + " ".join(fields) + "\n"
+
+
+def fake_proc(tmp_path, monkeypatch, processes=(), stat="", meminfo=MEMINFO):
+    (tmp_path / "stat").write_text(stat)
+    (tmp_path / "meminfo").write_text(meminfo)
+    (tmp_path / "self").mkdir()
+    for pid, comm, utime, stime, rss_pages in processes:
+        (tmp_path / str(pid)).mkdir()
+        (tmp_path / str(pid) / "stat").write_text(proc_stat(pid, comm, utime, stime, rss_pages))
+    monkeypatch.setattr(metrics, "PROC", str(tmp_path))
+
+
+def test_read_processes_handles_spaces_and_parens_in_comm(tmp_path, monkeypatch):
+    fake_proc(tmp_path, monkeypatch, [
+        (1, "systemd", 100, 50, 10),
+        (42, "Web Content", 7, 3, 2),
+        (99, "my (weird) proc)", 1, 1, 5),
+    ])
+    assert read_processes() == {
+        1: ("systemd", 150, 10 * PAGE_SIZE),
+        42: ("Web Content", 10, 2 * PAGE_SIZE),
+        99: ("my (weird) proc)", 2, 5 * PAGE_SIZE),
+    }
+
+
+def test_read_processes_skips_exited_process(tmp_path, monkeypatch):
+    fake_proc(tmp_path, monkeypatch, [(1, "init", 1, 1, 1)])
+    (tmp_path / "7").mkdir()  # stat 없이 디렉터리만 남은 종료 프로세스
+    assert list(read_processes()) == [1]
+
+
+def test_cpu_percent_from_two_samples(tmp_path, monkeypatch):
+    fake_proc(tmp_path, monkeypatch, stat="cpu  100 0 50 800 10 0 0 0 0 0\ncpu0 100 0 50 800 10 0 0 0 0 0\n")
+    before = read_cpu_times()
+    assert before == [100, 0, 50, 800, 10, 0, 0, 0]
+    after = [150, 10, 70, 900, 20, 5, 5, 0]
+    assert cpu_percent(before, after) == {
+        "user": 30.0, "system": 15.0, "iowait": 5.0, "steal": 0.0, "idle": 50.0, "used": 45.0,
+    }
+
+
+def test_cpu_percent_without_elapsed_ticks():
+    sample = [1, 2, 3, 4, 5, 6, 7, 8]
+    assert cpu_percent(sample, sample)["used"] == 0.0
+
+
+def test_read_memory(tmp_path, monkeypatch):
+    fake_proc(tmp_path, monkeypatch)
+    assert read_memory() == {
+        "total_kb": 8000000,
+        "available_kb": 6000000,
+        "used_kb": 2000000,
+        "used_percent": 25.0,
+        "buffers_kb": 200000,
+        "cached_kb": 3000000,
+        "swap_total_kb": 2000000,
+        "swap_used_kb": 500000,
+    }
+
+
+def test_read_memory_without_available_or_swap(tmp_path, monkeypatch):
+    fake_proc(tmp_path, monkeypatch, meminfo="MemTotal: 1000 kB\nMemFree: 400 kB\n")
+    memory = read_memory()
+    assert memory["available_kb"] == 400 and memory["used_percent"] == 60.0
+    assert memory["swap_total_kb"] == 0 and memory["swap_used_kb"] == 0
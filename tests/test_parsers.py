@@ -0,0 +1,88 @@
+from server.utils.parsers import parse_output, program_name
+
+PS = """USER         PID %CPU %MEM    VSZ   RSS TTY      STAT START   TIME COMMAND
+root           1  0.0  0.1 167744 11824 ?        Ss   May13   0:05 /sbin/init
+ec2-user    4242 95.3 12.4 4096000 512000 ?      Sl   01:50  10:11 java -Xmx2g -jar app.jar --port 8080
+root         812  2,5  0.3  25000  3000 ?        S    May13   0:00 sshd: ec2-user [priv]
+"""
+
+SAR = """Linux 5.10.0 (ip-10-0-1-5)  05/14/25  _x86_64_  (2 CPU)
+
+01:50:01 AM     CPU     %user     %nice   %system   %iowait    %steal     %idle
+01:51:01 AM     all     90.10      0.00      4.00      0.50      0.10      5.30
+01:52:01 AM     all     92.00      0.00      3.00      0.00      0.00      5.00
+Average:        all     91.05      0.00      3.50      0.25      0.05      5.15
+"""
+
+DF = """Filesystem      Size  Used Avail Use% Mounted on
+devtmpfs        4.0M     0  4.0M   0% /dev
+/dev/nvme0n1p1   20G   19G  1.0G  95% /
+/dev/mapper/very-long-volume-name
+                 50G   10G   40G  20% /data
+"""
+
+FREE = """               total        used        free      shared  buff/cache   available
+Mem:            7858        6120         210          12        1528        1420
+Swap:              0           0           0
+"""
+
+TOP = """top - 01:55:00 up 1 day,  2:03,  1 user,  load average: 3.10, 2.50, 1.90
+Tasks: 120 total,   2 running, 118 sleeping,   0 stopped,   0 zombie
+%Cpu(s): 92.0 us,  4.0 sy,  0.0 ni,  3.5 id,  0.5 wa,  0.0 hi,  0.0 si,  0.0 st
+MiB Mem :   7858.0 total,    210.0 free,   6120.0 used,   1528.0 buff/cache
+
+    PID USER      PR  NI    VIRT    RES    SHR S  %CPU  %MEM     TIME+ COMMAND
+   4242 ec2-user  20   0 4096000 512000  20000 S  95.3  12.4  10:11.00 java
+      1 root      20   0  167744  11824   8000 S   0.0   0.1   0:05.00 systemd
+"""
+
+
+def test_program_name_skips_sudo_and_paths():
+    assert program_name("sudo /usr/bin/ps aux | head") == "ps"
+    assert program_name("LC_ALL=C sar -u 1 3") == "sar"
+    assert program_name("") == ""
+
+
+def test_parse_ps_sorts_by_cpu_and_accepts_comma_decimals():
+    record = parse_output("ps aux", PS)
+    assert record["type"] == "processes" and record["total"] == 3
+    assert [p["pid"] for p in record["processes"]] == [4242, 812, 1]
+    assert record["processes"][1]["cpu"] == 2.5
+    assert record["processes"][0]["command"].startswith("java -Xmx2g")
+
+
+def test_parse_sar_intervals_and_average():
+    record = parse_output("sar -u 60 2", SAR)
+    assert [i["time"] for i in record["intervals"]] == ["01:51:01 AM", "01:52:01 AM"]
+    assert record["intervals"][0]["user"] == 90.1
+    assert record["average"] == {"user": 91.05, "nice": 0.0, "system": 3.5, "iowait": 0.25,
+                                 "steal": 0.05, "idle": 5.15}
+
+
+def test_parse_df_skips_virtual_and_joins_wrapped_device():
+    record = parse_output("df -h", DF)
+    assert [(f["filesystem"], f["use_pct"]) for f in record["filesystems"]] == [
+        ("/dev/nvme0n1p1", 95.0), ("/dev/mapper/very-long-volume-name", 20.0)
+    ]
+
+
+def test_parse_free():
+    record = parse_output("free -m", FREE)
+    assert record["mem"]["available"] == 1420.0
+    assert record["mem"]["buff_cache"] == 1528.0
+    assert record["swap"]["total"] == 0.0
+
+
+def test_parse_top():
+    record = parse_output("top -bn1", TOP)
+    assert record["load_average"] == [3.1, 2.5, 1.9]
+    assert record["tasks"]["running"] == 2
+    assert record["cpu"]["user"] == 92.0 and record["cpu"]["iowait"] == 0.5
+    assert record["mem"]["unit"] == "MiB" and record["mem"]["buff_cache"] == 1528.0
+    assert record["processes"][0]["pid"] == 4242
+
+
+def test_unknown_or_unparseable_output_returns_none():
+    assert parse_output("uptime", "up 1 day") is None
+    assert parse_output("ps aux", "") is None
+    assert parse_output("df -h", "permission denied") is None
@@ -0,0 +1,39 @@
+import pytest
+from server.workflow.router import IntentRouter, classify_intent
+
+
+@pytest.mark.parametrize("text", ["free -h", "top", "ps aux", "ps aux | grep java", "tail -n 50 /var/log/syslog"])
+def test_command_line_goes_to_generate(text):
+    assert classify_intent(text) == ("generate", 0.95)
+
+
+@pytest.mark.parametrize("text", ["last alarm", "cat the latest alarm", "알람을 보여줘", "최근 알람 로그"])
+def test_fetch_requests(text):
+    intent, confidence = classify_intent(text)
+    assert intent == "fetch" and confidence >= 0.8
+
+
+@pytest.mark.parametrize("text", ["CPU사용률 확인", "디스크 용량", "disk usage on i-08fb8abe21e6fa058", "show processes"])
+def test_generate_requests(text):
+    intent, confidence = classify_intent(text)
+    assert intent == "generate" and confidence >= 0.8
+
+
+@pytest.mark.parametrize("text", ["로그인 실패 원인", "download speed slow", "top the list"])
+def test_keywords_inside_other_words_do_not_match(text):
+    assert classify_intent(text) == (None, 0.0)
+
+
+def test_mixed_keywords_fall_below_threshold():
+    intent, confidence = classify_intent("알람 발생한 서버 cpu 확인")
+    assert confidence < 0.8
+
+
+def test_router_counts_paths():
+    router = IntentRouter(0.8)
+    assert router.route("free -h") == "generate"
+    assert router.route("로그인 실패 원인") is None
+    router.record("fetch")
+    stats = router.get_stats()
+    assert (stats["rule"], stats["llm"], stats["fetch"], stats["generate"]) == (1, 1, 1, 1)
+    assert stats["fast_path_ratio"] == 0.5
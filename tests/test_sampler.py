@@ -0,0 +1,54 @@
+from agent.sampler import FIELDS, RingBuffer, downsample, summarize
+
+
+def sample(t, cpu=0.0, top_cpu=0.0, top_pid=0):
+    return {"timestamp": t, "cpu_used": cpu, "top_cpu_percent": top_cpu, "top_pid": top_pid}
+
+
+def test_ring_buffer_overwrites_oldest():
+    buffer = RingBuffer(3)
+    for t in range(5):
+        buffer.append(sample(1000.0 + t, cpu=t), name=f"p{t}")
+    columns = buffer.range()
+    assert buffer.count == 3
+    assert columns["timestamp"] == [1002.0, 1003.0, 1004.0]
+    assert columns["cpu_used"] == [2.0, 3.0, 4.0]
+    assert columns["top_name"] == ["p2", "p3", "p4"]
+    assert buffer.memory_bytes == 8 * 3 * len(FIELDS)
+
+
+def test_ring_buffer_range_is_half_open():
+    buffer = RingBuffer(10)
+    for t in range(6):
+        buffer.append(sample(1000.0 + t, top_pid=t))
+    columns = buffer.range(since=1002.0, until=1004.0)
+    assert columns["timestamp"] == [1002.0, 1003.0]
+    assert columns["top_pid"] == [2, 3]
+    assert buffer.range(since=2000.0)["timestamp"] == []
+
+
+def test_downsample_averages_buckets_and_keeps_peak_process():
+    buffer = RingBuffer(10)
+    for t in range(6):
+        buffer.append(sample(1000.0 + t, cpu=10.0 * t, top_cpu=[5, 50, 1, 2, 90, 3][t], top_pid=100 + t),
+                      name=f"p{t}")
+    columns = downsample(buffer.range(), 2)
+    assert columns["timestamp"] == [1000.0, 1003.0]
+    assert columns["cpu_used"] == [10.0, 40.0]
+    assert columns["top_pid"] == [101, 104]
+    assert columns["top_name"] == ["p1", "p4"]
+    assert columns["top_cpu_percent"] == [50.0, 90.0]
+
+
+def test_downsample_keeps_short_series():
+    columns = RingBuffer(4).range()
+    assert downsample(columns, 30) is columns
+
+
+def test_summarize_reports_peak_time():
+    buffer = RingBuffer(5)
+    for t, cpu in enumerate([10.0, 80.0, 30.0]):
+        buffer.append(sample(1000.0 + t, cpu=cpu))
+    summary = summarize(buffer.range())
+    assert summary["cpu_used"] == {"min": 10.0, "avg": 40.0, "max": 80.0, "max_at": 1001.0}
+    assert "timestamp" not in summary and "top_pid" not in summary
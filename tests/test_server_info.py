@@ -0,0 +1,67 @@
+import pytest
+from fastapi import HTTPException
+from server.utils import server_info
+from server.utils.agent_registry import AgentRegistry
+from server.utils.server_info import list_groups, resolve_targets
+
+SERVERS = [
+    {"uuid": "i-web1", "ip": "10.0.1.1", "name": "web-1", "group": "web"},
+    {"uuid": "i-web2", "ip": "10.0.1.2", "name": "web-2", "group": "web"},
+    {"uuid": "i-db1", "ip": "10.0.2.1", "name": "db-1", "group": "db"},
+]
+
+
+@pytest.fixture(autouse=True)
+def inventory(monkeypatch):
+    monkeypatch.setattr(server_info, "my_server_list", SERVERS)
+    monkeypatch.setattr(server_info, "_static_servers", {server["uuid"]: server for server in SERVERS})
+    monkeypatch.setattr(server_info, "agent_registry", AgentRegistry(30))
+
+
+def test_empty_target():
+    assert resolve_targets(None) == []
+    assert resolve_targets([]) == []
+
+
+def test_known_instance_id_passes_through():
+    assert resolve_targets("i-db1") == ["i-db1"]
+
+
+def test_unresolvable_targets_resolve_to_nothing(monkeypatch):
+    assert resolve_targets("i-unknown") == []
+    assert resolve_targets("wbe") == []
+    assert resolve_targets(["i-db1", "wbe"]) == ["i-db1"]
+    monkeypatch.setattr(server_info, "my_server_list", [])
+    monkeypatch.setattr(server_info, "_static_servers", {})
+    assert resolve_targets("all") == []
+
+
+def test_group_and_all():
+    assert resolve_targets("web") == ["i-web1", "i-web2"]
+    assert resolve_targets("all") == ["i-web1", "i-web2", "i-db1"]
+    assert list_groups() == ["db", "web"]
+
+
+def test_list_is_flattened_without_duplicates():
+    assert resolve_targets(["i-web2", "web", "db", "i-db1"]) == ["i-web2", "i-web1", "i-db1"]
+
+
+def test_registered_agents_take_precedence():
+    registry = server_info.agent_registry
+    registry.upsert({"instance_id": "i-web1", "url": "http://10.9.9.9:9917", "group": "web"})
+    registry.upsert({"instance_id": "i-asg1", "url": "http://10.0.3.1:9917", "group": "web"})
+    assert server_info.get_agent_url("i-web1") == "http://10.9.9.9:9917"
+    assert server_info.get_agent_url("i-db1") == "http://10.0.2.1:9917"
+    assert resolve_targets("web") == ["i-web1", "i-asg1", "i-web2"]
+
+
+def test_unhealthy_or_unknown_agent_fails_fast():
+    registry = server_info.agent_registry
+    registry.upsert({"instance_id": "i-web1", "url": "http://10.9.9.9:9917", "group": "web"})["last_seen"] = 0
+    with pytest.raises(HTTPException) as unhealthy:
+        server_info.get_agent_url("i-web1")
+    assert unhealthy.value.status_code == 503
+    assert "i-web1" not in resolve_targets("all")
+    with pytest.raises(HTTPException) as unknown:
+        server_info.get_agent_url("i-unknown")
+    assert unknown.value.status_code == 400
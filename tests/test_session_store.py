@@ -0,0 +1,75 @@
+import asyncio
+import uuid
+from server.utils import session_store
+from server.utils.session_store import SessionStore
+
+
+def store(max_sessions=2, ttl=60, max_turns=3):
+    dropped = []
+    return SessionStore(max_sessions, ttl, max_turns, on_drop=dropped.append), dropped
+
+
+def test_new_session_gets_server_issued_id():
+    sessions, _ = store()
+    session = sessions.get()
+    assert uuid.UUID(session.session_id)
+    assert sessions.get(session.session_id) is session
+
+
+def test_unknown_client_id_is_not_adopted():
+    sessions, _ = store()
+    session = sessions.get("admin")
+    assert session.session_id != "admin"
+    assert sessions.get("admin") is not session
+    assert sessions.stats["created"] == 2
+
+
+def test_lru_eviction_drops_oldest_idle_session():
+    sessions, dropped = store(max_sessions=2)
+    first, second = sessions.get(), sessions.get()
+    sessions.get(first.session_id)  # first가 최근 사용
+    third = sessions.get()
+    assert dropped == [second.session_id]
+    assert sessions.get(first.session_id) is first and sessions.get(third.session_id) is third
+    assert sessions.stats["evicted"] == 1
+
+
+def test_locked_session_is_not_evicted():
+    async def run():
+        sessions, dropped = store(max_sessions=1)
+        busy = sessions.get()
+        async with busy.lock:
+            other = sessions.get()
+            assert dropped == []
+            assert sessions.get(busy.session_id) is busy
+            assert sessions.get_stats()["active"] == 2
+        # 락 해제 후 다음 생성 시 초과분 정리
+        sessions.get()
+        assert busy.session_id in dropped and other.session_id in dropped
+
+    asyncio.run(run())
+
+
+def test_idle_sessions_expire_unless_locked(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(session_store.time, "time", lambda: now[0])
+
+    async def run():
+        sessions, dropped = store(max_sessions=10, ttl=60)
+        idle, busy = sessions.get(), sessions.get()
+        async with busy.lock:
+            now[0] += 61
+            sessions.get()
+            sessions.append_turn(busy, "q", "a")
+        assert dropped == [idle.session_id]
+        assert sessions.get(busy.session_id) is busy
+
+    asyncio.run(run())
+
+
+def test_append_turn_keeps_last_turns():
+    sessions, _ = store(max_turns=2)
+    session = sessions.get()
+    for n in range(3):
+        sessions.append_turn(session, f"q{n}", f"a{n}")
+    assert [turn["user"]["content"] for turn in session.history] == ["q1", "q2"]
@@ -0,0 +1,54 @@
+import threading
+import time
+from fake_sqs import QUEUE_URL, FakeSQS, sqs_message
+from server import sqs_puller
+from server.sqs_puller import SQSConsumer
+
+
+def test_processed_messages_are_deleted_in_batches():
+    sqs = FakeSQS([sqs_message(i) for i in range(25)])
+    handled = []
+    consumer = SQSConsumer(sqs, QUEUE_URL, handler=lambda alarm: handled.append(alarm) or True,
+                           max_workers=4, max_in_flight=25, wait_time_seconds=0)
+    while sqs.queue:
+        consumer.poll_once()
+    consumer.drain()
+
+    assert len(handled) == 25
+    assert max(sqs.receives) == sqs_puller.SQS_BATCH_SIZE
+    deleted = sqs.deleted()
+    assert sorted(deleted) == sorted(f"m{i}" for i in range(25))
+    assert all(len(batch) <= sqs_puller.SQS_BATCH_SIZE for batch in sqs.deletes)
+
+
+def test_failed_messages_are_not_deleted():
+    sqs = FakeSQS([sqs_message(0), {**sqs_message(1), "Body": "not json"}, sqs_message(2)])
+    consumer = SQSConsumer(sqs, QUEUE_URL, handler=lambda alarm: alarm.raw_data["AlarmName"] != "alarm-2",
+                           max_workers=2, max_in_flight=3, wait_time_seconds=0)
+    consumer.poll_once()
+    consumer.drain()
+    assert sqs.deleted() == ["m0"]
+
+
+def test_heartbeat_extends_visibility_of_in_flight_messages():
+    sqs = FakeSQS([sqs_message(i) for i in range(3)])
+    release = threading.Event()
+    consumer = SQSConsumer(sqs, QUEUE_URL, handler=lambda alarm: release.wait(5),
+                           max_workers=3, max_in_flight=3, visibility_timeout=0.1, wait_time_seconds=0)
+    consumer.poll_once()
+    heartbeat = threading.Thread(target=consumer._heartbeat, daemon=True)
+    heartbeat.start()
+    deadline = time.monotonic() + 2
+    while not sqs.visibility_changes and time.monotonic() < deadline:
+        time.sleep(0.01)
+    release.set()
+    consumer.stop()
+    heartbeat.join(1)
+    consumer.drain()
+
+    assert sqs.visibility_changes[0] == [("m0", 0.1), ("m1", 0.1), ("m2", 0.1)]
+    assert sorted(sqs.deleted()) == ["m0", "m1", "m2"]
+    # 완료된 메시지는 더 이상 연장하지 않음
+    calls = len(sqs.visibility_changes)
+    consumer.extend_visibility()
+    assert len(sqs.visibility_changes) == calls
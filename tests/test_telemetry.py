@@ -0,0 +1,68 @@
+import pytest
+from agent import telemetry as agent_telemetry
+from server.utils.telemetry import Counter, Histogram, MetricsRegistry
+
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = Histogram("stage_seconds", "Stage time", ("node",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 3.0):
+        histogram.observe(value, node="generate")
+    assert histogram.render() == [
+        'stage_seconds_bucket{node="generate",le="0.1"} 1',
+        'stage_seconds_bucket{node="generate",le="1"} 3',
+        'stage_seconds_bucket{node="generate",le="+Inf"} 4',
+        'stage_seconds_sum{node="generate"} 4.05',
+        'stage_seconds_count{node="generate"} 4',
+    ]
+
+
+def test_histogram_without_labels():
+    histogram = Histogram("sample_seconds", "Sample time", buckets=(1.0,))
+    histogram.observe(2)
+    assert histogram.render() == [
+        'sample_seconds_bucket{le="1"} 0',
+        'sample_seconds_bucket{le="+Inf"} 1',
+        "sample_seconds_sum 2",
+        "sample_seconds_count 1",
+    ]
+
+
+def test_time_records_error_outcome():
+    histogram = Histogram("node_seconds", "Node time", ("node", "outcome"), buckets=(60.0,))
+    with pytest.raises(RuntimeError):
+        with histogram.time(node="analyze"):
+            raise RuntimeError("boom")
+    with histogram.time(node="analyze") as labels:
+        labels["outcome"] = "cached"
+    rendered = "\n".join(histogram.render())
+    assert 'node_seconds_count{node="analyze",outcome="error"} 1' in rendered
+    assert 'node_seconds_count{node="analyze",outcome="cached"} 1' in rendered
+
+
+def test_registry_renders_help_type_and_escapes_labels():
+    registry = MetricsRegistry()
+    tokens = registry.counter("tokens_total", "Tokens used", ("model",))
+    tokens.inc(10, model='gpt-"4o"')
+    tokens.inc(5, model='gpt-"4o"')
+    assert registry.render() == (
+        "# HELP tokens_total Tokens used\n"
+        "# TYPE tokens_total counter\n"
+        'tokens_total{model="gpt-\\"4o\\""} 15\n'
+    )
+    with pytest.raises(ValueError):
+        registry.histogram("tokens_total", "Duplicate")
+
+
+def test_agent_histogram_matches_server_format():
+    registry = agent_telemetry.MetricsRegistry()
+    histogram = registry.histogram("agent_seconds", "Agent time", ("path",), buckets=(0.5,))
+    histogram.observe(0.25, path="/execute")
+    assert registry.render().splitlines() == [
+        "# HELP agent_seconds Agent time",
+        "# TYPE agent_seconds histogram",
+        'agent_seconds_bucket{path="/execute",le="0.5"} 1',
+        'agent_seconds_bucket{path="/execute",le="+Inf"} 1',
+        'agent_seconds_sum{path="/execute"} 0.25',
+        'agent_seconds_count{path="/execute"} 1',
+    ]
+    assert agent_telemetry.program_label("/usr/bin/df -h") == "df"